@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Çevrimdışı performans ölçüm betikleri. Depo kökünden çalıştırın: python -m benchmarks.<betik>
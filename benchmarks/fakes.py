@@ -0,0 +1,358 @@
+# benchmarks/fakes.py
+"""
+Ölçüm betikleri için Discord ve veritabanı yerine geçen hafif nesneler.
+
+Sahte Discord nesneleri yalnızca cog'ların mesaj ve komut yollarında okuduğu
+alanları taşır. Veritabanı tarafında iki seçenek vardır: bellek içi
+`FakeDatabase` ya da gerçek bir Postgres'e bağlanan `CountingDatabase`. İkisi de
+her sorguyu o anda çalışan işleyiciye (handler) yazılmış bir gidiş-dönüş olarak sayar.
+"""
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import itertools
+import re
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import discord
+
+from utils.database import Database
+
+_ids = itertools.count(10 ** 17)
+
+# Sorguların hangi işleyiciye yazılacağı; işleyici içinde açılan görevler bağlamı devralır
+current_handler: contextvars.ContextVar[str] = contextvars.ContextVar("current_handler", default="diğer")
+
+
+def next_id() -> int:
+    return next(_ids)
+
+
+# --- Discord ---
+class FakeAsset:
+    def __init__(self, url: str):
+        self.url = url
+        self.key = url.rsplit("/", 1)[-1]
+
+    def replace(self, **kwargs) -> "FakeAsset":
+        return self
+
+    with_size = with_format = with_static_format = replace
+
+
+class FakeRole:
+    def __init__(self, guild: "FakeGuild", name: str, position: int):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.position = position
+        self.mention = f"<@&{self.id}>"
+        self.color = discord.Color.default()
+
+
+class FakeMember:
+    def __init__(self, guild: "FakeGuild", user_id: int, name: str, bot: bool = False):
+        self.id = user_id
+        self.guild = guild
+        self.name = name
+        self.display_name = name
+        self.global_name = name
+        self.discriminator = "0"
+        self.bot = bot
+        self.mention = f"<@{user_id}>"
+        self.display_avatar = FakeAsset(f"https://cdn.discordapp.com/avatars/{user_id}/{user_id:x}.png")
+        self.avatar = self.display_avatar
+        self.created_at = discord.utils.utcnow()
+        self.joined_at = self.created_at
+        self.status = discord.Status.online
+        self.color = discord.Color.default()
+        self.voice = None
+        self.roles: List[FakeRole] = [guild.default_role] if guild.default_role else []
+
+    @property
+    def top_role(self) -> FakeRole:
+        return max(self.roles, key=lambda role: role.position)
+
+    async def add_roles(self, *roles, reason=None):
+        self.roles.extend(roles)
+
+    async def remove_roles(self, *roles, reason=None):
+        self.roles = [role for role in self.roles if role not in roles]
+
+    def __str__(self):
+        return self.name
+
+
+class FakeChannel:
+    def __init__(self, guild: "FakeGuild", channel_id: int, name: str):
+        self.id = channel_id
+        self.guild = guild
+        self.name = name
+        self.mention = f"<#{channel_id}>"
+        self.type = discord.ChannelType.text
+        self.sent = 0
+
+    async def send(self, *args, **kwargs) -> "FakeMessage":
+        self.sent += 1
+        return FakeMessage(self, self.guild.me, kwargs.get("content") or (args[0] if args else ""), None)
+
+    def permissions_for(self, member) -> discord.Permissions:
+        return discord.Permissions.all()
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, name: str):
+        self.id = guild_id
+        self.name = name
+        self.icon = None
+        self.default_role = FakeRole(self, "@everyone", 0)
+        self.roles = [self.default_role]
+        self.me = FakeMember(self, next_id(), "Yata Misaki", bot=True)
+        self.me.roles.append(FakeRole(self, "Bot", 100))
+        self.owner = self.me
+        self.system_channel = None
+        self.chunked = True
+        self._members: Dict[int, FakeMember] = {self.me.id: self.me}
+        self._channels: Dict[int, FakeChannel] = {}
+
+    @property
+    def members(self) -> List[FakeMember]:
+        return list(self._members.values())
+
+    @property
+    def member_count(self) -> int:
+        return len(self._members)
+
+    def add_member(self, user_id: int) -> FakeMember:
+        member = self._members.get(user_id)
+        if member is None:
+            member = self._members[user_id] = FakeMember(self, user_id, f"üye-{user_id % 100000}")
+        return member
+
+    def add_channel(self, channel_id: int, name: str) -> FakeChannel:
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            channel = self._channels[channel_id] = FakeChannel(self, channel_id, name)
+        return channel
+
+    def get_member(self, user_id: int) -> Optional[FakeMember]:
+        return self._members.get(user_id)
+
+    def get_channel(self, channel_id: int) -> Optional[FakeChannel]:
+        return self._channels.get(channel_id)
+
+    def get_role(self, role_id: int) -> Optional[FakeRole]:
+        return next((role for role in self.roles if role.id == role_id), None)
+
+    async def chunk(self, *, cache: bool = True) -> List[FakeMember]:
+        return self.members
+
+    async def query_members(self, *, user_ids=None, limit=5, cache=True, **kwargs) -> List[FakeMember]:
+        return [self._members[user_id] for user_id in user_ids or [] if user_id in self._members]
+
+
+class FakeMessage:
+    """discord.Message yerine geçer; `_state` komut bağlamı (Context) kurulurken okunur."""
+
+    def __init__(self, channel: FakeChannel, author: FakeMember, content: str, state: Any):
+        self.id = next_id()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.created_at = discord.utils.utcnow()
+        self._state = state
+        self.attachments = []
+        self.embeds = []
+        self.mentions = []
+        self.role_mentions = []
+        self.channel_mentions = []
+        self.webhook_id = None
+        self.reference = None
+        self.type = discord.MessageType.default
+        self.reactions_added = 0
+
+    async def add_reaction(self, emoji):
+        self.reactions_added += 1
+
+    async def reply(self, *args, **kwargs):
+        return await self.channel.send(*args, **kwargs)
+
+    async def edit(self, **kwargs):
+        return self
+
+    async def delete(self, *, delay=None):
+        pass
+
+
+# --- Veritabanı ---
+class RoundTripCounter:
+    """İşleyici başına veritabanı gidiş-dönüş sayacı."""
+
+    def __init__(self):
+        self.by_handler: Counter = Counter()
+
+    def hit(self, count: int = 1):
+        self.by_handler[current_handler.get()] += count
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_handler.values())
+
+
+class CountingConnection:
+    """Bir bağlantıyı sarar ve her sorguyu gidiş-dönüş olarak sayar."""
+
+    _QUERY_METHODS = {"execute", "executemany", "fetch", "fetchrow", "fetchval", "copy_records_to_table"}
+
+    def __init__(self, conn, counter: RoundTripCounter):
+        self._conn = conn
+        self._counter = counter
+
+    def transaction(self, *args, **kwargs):
+        self._counter.hit(2)  # BEGIN + COMMIT/ROLLBACK
+        return self._conn.transaction(*args, **kwargs)
+
+    def __getattr__(self, name):
+        attr = getattr(self._conn, name)
+        if name in self._QUERY_METHODS:
+            self._counter.hit()
+        return attr
+
+
+class CountingDatabase(Database):
+    """Gerçek Postgres'e bağlanan, sorguları sayan Database."""
+
+    def __init__(self, dsn: str, counter: RoundTripCounter, **kwargs):
+        super().__init__(dsn, **kwargs)
+        self.counter = counter
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        async with super().acquire(timeout) as conn:
+            yield CountingConnection(conn, self.counter)
+
+
+class _FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    """
+    asyncpg.Connection'ın bellek içi taklidi.
+
+    Seviye ve partner tablolarının sık kullanılan sorgularını anlamlı sonuçlarla
+    yanıtlar; tanımadığı sorgular için boş sonuç döner. Amaç doğruluk değil,
+    gidiş-dönüş sayısını ve Python tarafındaki yükü ölçmektir.
+    """
+
+    def __init__(self, db: "FakeDatabase"):
+        self._db = db
+
+    def transaction(self, *args, **kwargs):
+        return _FakeTransaction()
+
+    async def _round_trip(self):
+        if self._db.latency:
+            await asyncio.sleep(self._db.latency)
+
+    async def execute(self, query: str, *args, timeout=None) -> str:
+        await self._round_trip()
+        self._db.apply(query, args)
+        return "OK"
+
+    async def executemany(self, query: str, args_list, timeout=None):
+        await self._round_trip()
+        for args in args_list:
+            self._db.apply(query, args)
+
+    async def fetch(self, query: str, *args, timeout=None) -> List[Dict]:
+        await self._round_trip()
+        return self._db.select(query, args)
+
+    async def fetchrow(self, query: str, *args, timeout=None) -> Optional[Dict]:
+        rows = await self.fetch(query, *args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout=None) -> Any:
+        row = await self.fetchrow(query, *args)
+        return list(row.values())[column] if row else None
+
+
+class FakeDatabase(Database):
+    """Bellek içi Database; her sorgu isteğe bağlı sabit bir ağ gecikmesi bekler."""
+
+    _USER_ROW = re.compile(r"FROM users WHERE user_id = \$1 AND guild_id = \$2", re.I)
+    _RANK = re.compile(r"SELECT COUNT\(\*\) \+ 1 FROM users", re.I)
+    _TOP = re.compile(r"FROM users WHERE guild_id = \$1 ORDER BY total_xp DESC", re.I)
+    _GUILD_TOTALS = re.compile(r"SELECT user_id, total_xp FROM users WHERE guild_id = \$1\s*$", re.I)
+    _BULK_XP = re.compile(r"unnest\(.*INSERT INTO users", re.I | re.S)
+
+    def __init__(self, counter: RoundTripCounter, latency: float = 0.0):
+        super().__init__("fake://", min_size=1, max_size=1)
+        self.counter = counter
+        self.latency = latency
+        self.users: Dict[Tuple[int, int], Dict[str, int]] = {}
+        self.daily: Dict[Tuple[int, int, Any], int] = {}  # (guild_id, user_id, gün) -> XP
+        self.partners: List[Tuple] = []
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        self._record_wait(0.0)
+        yield CountingConnection(FakeConnection(self), self.counter)
+
+    # --- Sorgu Taklidi ---
+    def apply(self, query: str, args: Tuple):
+        normalized = " ".join(query.split())
+        if normalized.startswith("INSERT INTO users") and len(args) == 5:
+            user_id, guild_id, level, xp, total_xp = args
+            self.users[(user_id, guild_id)] = {"level": level, "xp": xp, "total_xp": total_xp}
+        elif normalized.startswith("INSERT INTO partners"):
+            self.partners.append(args)
+
+    def select(self, query: str, args: Tuple) -> List[Dict]:
+        if self._BULK_XP.search(query):
+            return self._bulk_xp(*args)
+        if self._USER_ROW.search(query):
+            row = self.users.get((args[0], args[1]))
+            return [dict(row)] if row else []
+        if self._RANK.search(query):
+            guild_id, total_xp = args[0], args[1]
+            return [{"rank": 1 + sum(1 for (_, g), row in self.users.items() if g == guild_id and row["total_xp"] > total_xp)}]
+        if self._GUILD_TOTALS.search(query):
+            guild_id = args[0]
+            return [{"user_id": u, "total_xp": row["total_xp"]} for (u, g), row in self.users.items() if g == guild_id]
+        if self._TOP.search(query):
+            guild_id = args[0]
+            rows = [{"user_id": u, **row} for (u, g), row in self.users.items() if g == guild_id]
+            return sorted(rows, key=lambda row: row["total_xp"], reverse=True)[:10]
+        return []
+
+    def _bulk_xp(self, user_ids, guild_ids, gains, thresholds, segments=(), day=None) -> List[Dict]:
+        """LevelingCog'un toplu XP sorgusunun (unnest + width_bucket + xp_daily kovaları) Python karşılığı."""
+        level_ups = []
+        for user_id, guild_id, gained in zip(user_ids, guild_ids, gains):
+            self.daily[(guild_id, user_id, day)] = self.daily.get((guild_id, user_id, day), 0) + gained
+            row = self.users.get((user_id, guild_id))
+            old_total = row["total_xp"] if row else 0
+            old_level = bisect.bisect_right(thresholds, old_total)
+            total_xp = old_total + gained
+            level = bisect.bisect_right(thresholds, total_xp)
+            xp = total_xp - (thresholds[level - 1] if level else 0)
+            self.users[(user_id, guild_id)] = {"level": level, "xp": xp, "total_xp": total_xp}
+            if level > old_level:
+                level_ups.append({"user_id": user_id, "guild_id": guild_id, "level": level, "total_xp": total_xp})
+        return level_ups
+
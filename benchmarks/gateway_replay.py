@@ -0,0 +1,273 @@
+# benchmarks/gateway_replay.py
+"""
+on_message sıcak yolları için çevrimdışı gateway tekrar oynatma ölçümü.
+
+Botu Discord'a bağlanmadan kurar, seçilen eklentileri yükler ve sentetik (veya
+kaydedilmiş) bir mesaj akışını sahte Message/Guild/Member nesneleriyle tüm
+on_message işleyicilerinden geçirir. Sonunda XP önbelleği bir kez boşaltılır.
+
+Rapor: saniyedeki mesaj, işleyici başına gecikme yüzdelikleri ve mesaj başına
+veritabanı gidiş-dönüş sayısı.
+
+Kullanım (depo kökünden):
+    python -m benchmarks.gateway_replay --messages 20000
+    python -m benchmarks.gateway_replay --dsn postgresql://localhost/yata_bench   # gerçek Postgres (tabloları yazar!)
+    python -m benchmarks.gateway_replay --input kayit.jsonl                        # {"guild_id", "channel_id", "author_id", "content"}
+
+Not: --dsn ile verilen veritabanına gerçekten yazılır; atılabilir bir veritabanı kullanın.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Iterator, List
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from discord.ext import commands  # noqa: E402
+
+from benchmarks.fakes import (  # noqa: E402
+    CountingDatabase, FakeDatabase, FakeGuild, FakeMessage, RoundTripCounter, current_handler, next_id,
+)
+
+DEFAULT_EXTENSIONS = "commands.Leveling.leveling,commands.Partner.partner,commands.Genel.kullanici"
+# Sentetik akıştaki komutlar: veritabanına giden ve gitmeyen yolların karışımı
+SYNTHETIC_COMMANDS = ["seviye", "lider", "lider haftalık", "avatar", "zaman"]
+SYNTHETIC_WORDS = "merhaba selam bugün oyun müzik anime nasılsın tamam harika evet hayır belki".split()
+
+
+class BenchContext(commands.Context):
+    """Discord'a gitmeden gönderilen mesajları sayan komut bağlamı."""
+
+    async def send(self, *args, **kwargs):
+        return await self.channel.send(*args, **kwargs)
+
+    async def reply(self, *args, **kwargs):
+        return await self.channel.send(*args, **kwargs)
+
+
+def synthetic_stream(count: int, guild_ids: List[int], users_per_guild: int, partner_channel_id: int,
+                     prefix: str, command_ratio: float, partner_ratio: float, seed: int) -> Iterator[Dict]:
+    rng = random.Random(seed)
+    user_ids = {guild_id: [next_id() for _ in range(users_per_guild)] for guild_id in guild_ids}
+    channel_ids = {guild_id: [next_id() for _ in range(5)] for guild_id in guild_ids}
+    for _ in range(count):
+        guild_id = rng.choice(guild_ids)
+        event = {"guild_id": guild_id, "author_id": rng.choice(user_ids[guild_id])}
+        roll = rng.random()
+        if roll < command_ratio:
+            event["channel_id"] = rng.choice(channel_ids[guild_id])
+            event["content"] = prefix + rng.choice(SYNTHETIC_COMMANDS)
+        elif roll < command_ratio + partner_ratio:
+            event["channel_id"] = partner_channel_id
+            event["content"] = f"Sunucumuza bekleriz! discord.gg/{rng.getrandbits(40):x}"
+        else:
+            event["channel_id"] = rng.choice(channel_ids[guild_id])
+            event["content"] = " ".join(rng.choices(SYNTHETIC_WORDS, k=rng.randint(2, 12)))
+        yield event
+
+
+def recorded_stream(path: Path) -> Iterator[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def handler_name(handler) -> str:
+    owner = getattr(handler, "__self__", None)
+    return f"{type(owner).__name__}.{handler.__name__}" if owner else handler.__name__
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def build_bot(db, extensions: List[str], http_latency: float):
+    os.chdir(BASE_DIR)  # Cog'lar yapılandırma dosyalarını göreli yoldan okur
+    # main.py içe aktarılırken log dosyalarını kurar; ölçüm kayıtları depodaki log dosyalarına karışmasın
+    os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="yata_bench_logs_"))
+    import main  # Yapılandırmayı, get_prefix'i ve bot sınıfını main.py'den al
+
+    bot = main.YataMisakiBot(
+        command_prefix=main.get_prefix,
+        intents=main.intents,
+        help_command=None,
+        case_insensitive=True,
+    )
+    await bot._async_setup_hook()  # Giriş yapmadan olay döngüsünü bağlar
+    bot._connection.user = SimpleNamespace(id=next_id(), mention="<@0>", name="Yata Misaki", bot=True)
+
+    # Komut yanıtları Discord'a değil sahte kanala gider
+    original_get_context = bot.get_context
+    bot.get_context = lambda origin, *, cls=BenchContext: original_get_context(origin, cls=cls)
+
+    # Partner sistemi davet kodlarını Discord'dan doğrular; burada sabit gecikmeli bir taklit kullanılır
+    async def fake_fetch_invite(code, **kwargs):
+        if http_latency:
+            await asyncio.sleep(http_latency)
+        return SimpleNamespace(guild=SimpleNamespace(name=f"Sunucu {code}", id=next_id()), code=code)
+    bot.fetch_invite = fake_fetch_invite
+
+    # XP günlüğü depo yerine geçici bir klasöre yazılır
+    bot.xp_journal_dir = Path(tempfile.mkdtemp(prefix="yata_xp_journal_"))
+    bot.db = db
+    await db.connect()
+    await bot.guild_settings.load(db)
+    for name in extensions:
+        await bot.load_extension(name)
+    await asyncio.sleep(0.1)  # Cog'ların arka planda başlattığı tablo kurulumları bitsin
+    return bot, main
+
+
+async def replay(args):
+    counter = RoundTripCounter()
+    if args.dsn:
+        db = CountingDatabase(args.dsn, counter, min_size=2, max_size=args.pool_size)
+    else:
+        db = FakeDatabase(counter, latency=args.db_latency_ms / 1000)
+
+    token = current_handler.set("kurulum")
+    bot, main = await build_bot(db, [name for name in args.extensions.split(",") if name], args.http_latency_ms / 1000)
+    current_handler.reset(token)
+    logging.getLogger().setLevel(logging.WARNING)  # Ölçüm sırasında log yazımı sonuçları bozmasın
+
+    handlers = [("Bot.on_message (toplam)", bot.on_message)]
+    # Hâlâ kendi on_message dinleyicisi olan cog'lar ayrı görev olarak ölçülür
+    for listener in bot.extra_events.get("on_message", []):
+        handlers.append((handler_name(listener), listener))
+
+    partner_channel_id = bot.settings.bot.partner_channel_id or next_id()
+    if args.input:
+        events = list(recorded_stream(Path(args.input)))
+    else:
+        guild_ids = [next_id() for _ in range(args.guilds)]
+        events = list(synthetic_stream(args.messages, guild_ids, args.users, partner_channel_id, bot.settings.bot.prefix,
+                                       args.command_ratio, args.partner_ratio, args.seed))
+
+    # Sahte nesneleri ölçüm dışında hazırla
+    guilds: Dict[int, FakeGuild] = {}
+    messages = []
+    for event in events:
+        guild = guilds.get(event["guild_id"])
+        if guild is None:
+            guild = guilds[event["guild_id"]] = FakeGuild(event["guild_id"], f"Sunucu {len(guilds) + 1}")
+        channel = guild.add_channel(event["channel_id"], "partner" if event["channel_id"] == partner_channel_id else "sohbet")
+        author = guild.add_member(event["author_id"])
+        messages.append(FakeMessage(channel, author, event["content"], bot._connection))
+    bot.get_guild = guilds.get
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    failures: Dict[str, int] = defaultdict(int)
+
+    # Mesaj hattı abonelerini sarmala: her biri kendi adıyla ölçülür ve DB sorguları ona yazılır
+    def timed_subscriber(name, subscriber):
+        async def wrapper(ctx):
+            token = current_handler.set(name)
+            start = time.perf_counter()
+            try:
+                await subscriber(ctx)
+            finally:
+                latencies[name].append(time.perf_counter() - start)
+                current_handler.reset(token)
+        return wrapper
+
+    pipeline = bot.message_pipeline
+    pipeline.subscribers = [timed_subscriber(f"  └ {handler_name(sub)}", sub) for sub in pipeline.subscribers]
+
+    async def run_handler(name, handler, message):
+        current_handler.set(name)  # Her görev kendi bağlam kopyasında çalışır
+        start = time.perf_counter()
+        try:
+            await handler(message)
+        except Exception:
+            failures[name] += 1
+        latencies[name].append(time.perf_counter() - start)
+
+    async def dispatch(message):
+        # Gerçek gateway'de her dinleyici ayrı bir görev olarak çalışır
+        await asyncio.gather(*(run_handler(name, handler, message) for name, handler in handlers))
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(message):
+        async with semaphore:
+            await dispatch(message)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded(message) for message in messages))
+    elapsed = time.perf_counter() - start
+    replay_round_trips = counter.total
+
+    leveling = bot.get_cog("LevelingCog")
+    flush_elapsed = 0.0
+    if leveling:
+        token = current_handler.set("XP boşaltma")
+        flush_start = time.perf_counter()
+        await leveling.flush_xp_cache_to_db()
+        flush_elapsed = time.perf_counter() - flush_start
+        current_handler.reset(token)
+    await asyncio.sleep(0.1)  # Seviye atlama bildirim görevleri bitsin
+
+    print_report(args, len(messages), elapsed, flush_elapsed, replay_round_trips, counter, latencies, failures, bot, guilds)
+
+    logging.getLogger().setLevel(logging.CRITICAL)
+    await bot.close()
+    main.log_listener.stop()
+
+
+def print_report(args, message_count, elapsed, flush_elapsed, replay_round_trips, counter, latencies, failures, bot, guilds):
+    mode = f"Postgres ({args.dsn})" if args.dsn else f"bellek içi (sorgu başına {args.db_latency_ms:.2f} ms)"
+    print()
+    print(f"Veritabanı: {mode} | Eşzamanlılık: {args.concurrency} | Sunucu: {len(guilds)}")
+    print(f"Mesaj: {message_count} | Süre: {elapsed:.3f} sn | Verim: {message_count / elapsed:,.0f} mesaj/sn")
+    print(f"Mesaj başına DB gidiş-dönüş (boşaltma hariç): {replay_round_trips / max(message_count, 1):.3f}")
+    print()
+    print(f"{'İşleyici':<40} {'Çağrı':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'maks':>9} {'DB/mesaj':>9} {'Hata':>5}")
+    for name, values in latencies.items():
+        values.sort()
+        print(
+            f"{name:<40} {len(values):>7} "
+            f"{percentile(values, 0.50) * 1e6:>7.0f}µs {percentile(values, 0.95) * 1e6:>7.0f}µs "
+            f"{percentile(values, 0.99) * 1e6:>7.0f}µs {values[-1] * 1e6:>7.0f}µs "
+            f"{counter.by_handler.get(name, 0) / max(message_count, 1):>9.3f} {failures.get(name, 0):>5}"
+        )
+    print("(Bot.on_message satırı abonelerin süresini de içerir; DB sütunu yalnızca komut sorgularını sayar.)")
+    print()
+    print(f"XP boşaltma: {flush_elapsed * 1000:.1f} ms, {counter.by_handler.get('XP boşaltma', 0)} gidiş-dönüş")
+    sent = sum(channel.sent for guild in guilds.values() for channel in guild._channels.values())
+    command_errors = sum(sum(stats.errors.values()) for stats in bot.metrics.commands.values())
+    print(f"Gönderilen yanıt: {sent} | Komut hatası: {command_errors}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="on_message sıcak yolları için çevrimdışı tekrar oynatma ölçümü")
+    parser.add_argument("--messages", type=int, default=20000, help="Sentetik akıştaki mesaj sayısı")
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--users", type=int, default=500, help="Sunucu başına kullanıcı")
+    parser.add_argument("--command-ratio", type=float, default=0.05)
+    parser.add_argument("--partner-ratio", type=float, default=0.01)
+    parser.add_argument("--concurrency", type=int, default=64, help="Aynı anda işlenen mesaj sayısı")
+    parser.add_argument("--db-latency-ms", type=float, default=0.3, help="Bellek içi DB için sorgu başına gecikme")
+    parser.add_argument("--http-latency-ms", type=float, default=0.0, help="Sahte Discord API çağrıları için gecikme")
+    parser.add_argument("--pool-size", type=int, default=10, help="--dsn kullanılırken havuz boyutu")
+    parser.add_argument("--extensions", default=DEFAULT_EXTENSIONS)
+    parser.add_argument("--input", help="Kaydedilmiş akış (JSON satırları)")
+    parser.add_argument("--dsn", help="Bellek içi taklit yerine gerçek Postgres kullan")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(replay(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,163 @@
+# benchmarks/rank_card.py
+"""
+Seviye kartı çiziminin ölçümü (konteyner boyutlandırması için).
+
+Önce kartlar süreç içinde tek çekirdekte art arda çizilir (çekirdek başına üst
+sınır). Ardından her işçi sayısı için RankCardRenderer'a aynı anda çok sayıda
+istek gönderilir; çizim önbelleği kapalıdır, her istek gerçekten çizilir. Bu
+sırada olay döngüsünün en uzun tıkanması da ölçülür (çizim süreç havuzunda
+olduğundan milisaniyeler içinde kalmalıdır). Son olarak önbellekten dönen bir
+kartın maliyeti ölçülür.
+
+Rapor: kart/sn, çekirdek başına kart/sn, istek gecikmesi (p50/p95), PNG boyutu.
+
+Kullanım (depo kökünden, Pillow gerekir):
+    python -m benchmarks.rank_card
+    python -m benchmarks.rank_card --renders 500 --workers 1,2,4,8
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import statistics
+import sys
+import time
+from typing import List, Tuple
+
+from utils import rank_card
+from utils.rank_card import PROGRESS_BUCKETS, RankCardData, RankCardRenderer, render_rank_card
+
+
+def make_avatars(rng: random.Random, count: int, size: int) -> List[bytes]:
+    """Gerçek fotoğraflara yakın sıkıştırma maliyeti için gürültülü, renkli avatarlar üretir."""
+    Image = rank_card.Image
+    avatars = []
+    for _ in range(count):
+        noise = Image.effect_noise((size, size), rng.uniform(20, 80)).convert("RGB")
+        tint = Image.new("RGB", (size, size), tuple(rng.randrange(256) for _ in range(3)))
+        output = io.BytesIO()
+        Image.blend(noise, tint, 0.6).save(output, format="PNG")
+        avatars.append(output.getvalue())
+    return avatars
+
+
+def make_cards(rng: random.Random, count: int, avatars: List[bytes]) -> List[RankCardData]:
+    return [
+        RankCardData(
+            name=f"Üye {rng.randrange(10 ** 6)} {'ğüşiöç' * rng.randint(0, 3)}",
+            level=rng.randint(0, 300),
+            progress=rng.randint(0, PROGRESS_BUCKETS),
+            rank=rng.randint(1, 200_000),
+            avatar=rng.choice(avatars),
+            accent=rng.randrange(0x1000000),
+        )
+        for _ in range(count)
+    ]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_inline(cards: List[RankCardData]) -> Tuple[float, List[float], int]:
+    render_rank_card(cards[0])  # Yazı tipi yükleme ölçüm dışında
+    latencies, size = [], 0
+    start = time.perf_counter()
+    for card in cards:
+        started = time.perf_counter()
+        size += len(render_rank_card(card))
+        latencies.append(time.perf_counter() - started)
+    return time.perf_counter() - start, latencies, size // len(cards)
+
+
+async def watch_loop(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """Olay döngüsünün en uzun gecikmesini (saniye) ölçer."""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run_pool(cards: List[RankCardData], workers: int) -> Tuple[float, List[float], float]:
+    renderer = RankCardRenderer(workers, render_cache_size=0)
+    # Süreçlerin açılması ve yazı tiplerinin yüklenmesi ölçüm dışında
+    await asyncio.gather(*(renderer.render_data(("ısınma", i), cards[i % len(cards)]) for i in range(workers * 2)))
+
+    async def timed(index: int, card: RankCardData) -> float:
+        started = time.perf_counter()
+        await renderer.render_data(index, card)
+        return time.perf_counter() - started
+
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stop))
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed(index, card) for index, card in enumerate(cards)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst_stall = await watcher
+    renderer.close()
+    return elapsed, list(latencies), worst_stall
+
+
+async def run_cached(card: RankCardData, repeats: int) -> float:
+    renderer = RankCardRenderer(1)
+    await renderer.render_data("kart", card)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        await renderer.render_data("kart", card)
+    elapsed = time.perf_counter() - start
+    renderer.close()
+    return elapsed / repeats
+
+
+async def run(args):
+    if not rank_card.AVAILABLE:
+        print("Pillow yüklü değil; ölçüm için `pip install Pillow` çalıştırın.")
+        sys.exit(1)
+    rng = random.Random(args.seed)
+    cards = make_cards(rng, args.renders, make_avatars(rng, args.avatars, args.avatar_size))
+    cpus = os.cpu_count() or 1
+
+    elapsed, latencies, png_size = run_inline(cards)
+    rows = [("süreç içi", 1, elapsed, latencies, None)]
+    for workers in [int(value) for value in args.workers.split(",") if value]:
+        elapsed, latencies, stall = await run_pool(cards, workers)
+        rows.append(("havuz", workers, elapsed, latencies, stall))
+    cached = await run_cached(cards[0], 10_000)
+
+    print()
+    print(f"Kart: {args.renders} | Avatar: {args.avatars} ({args.avatar_size} px) | Çekirdek: {cpus} | Ortalama PNG: {png_size / 1024:.1f} KB")
+    print()
+    print(f"{'Mod':<10} {'İşçi':>4} {'Kart/sn':>9} {'Çekirdek başına':>16} {'p50':>9} {'p95':>9} {'Döngü tıkanması':>16}")
+    for mode, workers, elapsed, latencies, stall in rows:
+        rate = len(latencies) / elapsed
+        stall_text = "-" if stall is None else f"{stall * 1000:.1f} ms"
+        print(
+            f"{mode:<10} {workers:>4} {rate:>9,.1f} {rate / min(workers, cpus):>16,.1f} "
+            f"{percentile(latencies, 0.5) * 1000:>6.1f} ms {percentile(latencies, 0.95) * 1000:>6.1f} ms {stall_text:>16}"
+        )
+    print(f"\nÖnbellekten dönen kart: {cached * 1e6:.1f} µs")
+    inline_rate = len(rows[0][3]) / rows[0][2]
+    print(f"Süreç içi ortalama çizim: {statistics.mean(rows[0][3]) * 1000:.1f} ms; "
+          f"1 çekirdek saniyede ~{inline_rate:,.0f} kart çizer.")
+    if any(workers > cpus for _, workers, *_ in rows):
+        print("(Çekirdek sayısından fazla işçi: çekirdek başına değer gerçek çekirdek sayısına bölünmüştür.)")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Seviye kartı çizim ölçümü")
+    parser.add_argument("--renders", type=int, default=200, help="Her modda çizilecek kart sayısı")
+    parser.add_argument("--workers", default=",".join(sorted({"1", str(os.cpu_count() or 1)}, key=int)),
+                        help="Virgülle ayrılmış işçi süreç sayıları")
+    parser.add_argument("--avatars", type=int, default=20, help="Farklı avatar sayısı")
+    parser.add_argument("--avatar-size", type=int, default=128)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
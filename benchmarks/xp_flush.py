@@ -0,0 +1,149 @@
+# benchmarks/xp_flush.py
+"""
+LevelingCog XP boşaltmasının ölçümü.
+
+Verilen her önbellek boyutu için (varsayılan 100, 10.000 ve 100.000 kullanıcı)
+toplu yazımı (`LevelingCog._write_xp`, tek UPSERT) ve karşılaştırma için eski
+kullanıcı başına SELECT + INSERT döngüsünü çalıştırır. Kullanıcıların bir kısmı
+önceden veritabanında bulunur; böylece hem ekleme hem güncelleme yolu ölçülür.
+
+Rapor: süre, veritabanı gidiş-dönüş sayısı, seviye atlayan kullanıcı ve saniyedeki kullanıcı.
+
+Kullanım (depo kökünden):
+    python -m benchmarks.xp_flush
+    python -m benchmarks.xp_flush --sizes 100,10000 --db-latency-ms 1
+    python -m benchmarks.xp_flush --dsn postgresql://localhost/yata_bench   # gerçek Postgres (tabloya yazar!)
+
+Not: --dsn ile verilen veritabanına gerçekten yazılır; atılabilir bir veritabanı kullanın.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List
+
+from benchmarks.fakes import CountingDatabase, FakeDatabase, RoundTripCounter, current_handler, next_id
+from benchmarks.gateway_replay import build_bot
+from utils.leveling_curve import CURVES, DEFAULT_CURVE
+
+Cache = Dict[int, Dict[int, int]]
+
+
+def make_cache(rng: random.Random, users: int, guilds: int) -> Cache:
+    guild_ids = [next_id() for _ in range(guilds)]
+    cache: Cache = {guild_id: {} for guild_id in guild_ids}
+    for _ in range(users):
+        cache[rng.choice(guild_ids)][next_id()] = rng.randint(10, 600)
+    return cache
+
+
+def subset(cache: Cache, ratio: float, rng: random.Random) -> Cache:
+    """Önbellekteki kullanıcıların bir kısmını (önceden var olan satırlar için) seçer."""
+    return {
+        guild_id: {user_id: rng.randint(0, 5000) for user_id in users if rng.random() < ratio}
+        for guild_id, users in cache.items()
+    }
+
+
+async def legacy_write_xp(db, cache: Cache, calculate_xp_for_level) -> int:
+    """Eski yazım yolu: her kullanıcı için bir SELECT ... FOR UPDATE ve bir INSERT ... ON CONFLICT."""
+    level_ups = 0
+    async with db.acquire() as conn:
+        async with conn.transaction():
+            for guild_id, users in cache.items():
+                for user_id, xp_to_add in users.items():
+                    row = await conn.fetchrow(
+                        "SELECT level, xp, total_xp FROM users WHERE user_id = $1 AND guild_id = $2 FOR UPDATE",
+                        user_id, guild_id
+                    )
+                    level, xp, total_xp = (row['level'], row['xp'], row['total_xp']) if row else (0, 0, 0)
+                    xp += xp_to_add
+                    total_xp += xp_to_add
+                    start_level = level
+                    while xp >= calculate_xp_for_level(level + 1):
+                        xp -= calculate_xp_for_level(level + 1)
+                        level += 1
+                    await conn.execute(
+                        """
+                        INSERT INTO users (user_id, guild_id, level, xp, total_xp)
+                        VALUES ($1, $2, $3, $4, $5)
+                        ON CONFLICT (user_id, guild_id) DO UPDATE
+                        SET level = $3, xp = $4, total_xp = $5
+                        """,
+                        user_id, guild_id, level, xp, total_xp
+                    )
+                    level_ups += level > start_level
+    return level_ups
+
+
+async def measure(name: str, counter: RoundTripCounter, coro):
+    token = current_handler.set(name)
+    before = counter.by_handler.get(name, 0)
+    start = time.perf_counter()
+    try:
+        level_ups = await coro
+    finally:
+        current_handler.reset(token)
+    return time.perf_counter() - start, counter.by_handler.get(name, 0) - before, level_ups
+
+
+async def run(args):
+    counter = RoundTripCounter()
+    if args.dsn:
+        db = CountingDatabase(args.dsn, counter, min_size=1, max_size=2)
+    else:
+        db = FakeDatabase(counter, latency=args.db_latency_ms / 1000)
+
+    token = current_handler.set("kurulum")
+    bot, main = await build_bot(db, ["commands.Leveling.leveling"], 0.0)
+    current_handler.reset(token)
+    logging.getLogger().setLevel(logging.WARNING)
+    leveling = bot.get_cog("LevelingCog")
+    rng = random.Random(args.seed)
+
+    results: List[tuple] = []
+    for size in [int(value) for value in args.sizes.split(",") if value]:
+        methods = [("toplu", lambda cache: _count(leveling._write_xp(cache)))]
+        if size <= args.legacy_max:
+            methods.append(("eski", lambda cache: legacy_write_xp(db, cache, CURVES[DEFAULT_CURVE].xp_for_level)))
+        for method, write in methods:
+            # Her yöntem kendi kullanıcılarıyla başlar; önceden var olan satırlar ölçüm dışında yazılır
+            cache = make_cache(rng, size, args.guilds)
+            token = current_handler.set("kurulum")
+            await leveling._write_xp(subset(cache, args.existing_ratio, rng))
+            current_handler.reset(token)
+            elapsed, round_trips, level_ups = await measure(f"{method}-{size}", counter, write(cache))
+            results.append((size, method, elapsed, round_trips, level_ups))
+
+    print()
+    mode = f"Postgres ({args.dsn})" if args.dsn else f"bellek içi (sorgu başına {args.db_latency_ms:.2f} ms)"
+    print(f"Veritabanı: {mode} | Sunucu: {args.guilds} | Önceden var olan kullanıcı oranı: {args.existing_ratio:.0%}")
+    print()
+    print(f"{'Kullanıcı':>10} {'Yöntem':<7} {'Süre':>11} {'Gidiş-dönüş':>12} {'Seviye atlayan':>15} {'Kullanıcı/sn':>13}")
+    for size, method, elapsed, round_trips, level_ups in results:
+        print(f"{size:>10,} {method:<7} {elapsed * 1000:>8.1f} ms {round_trips:>12,} {level_ups:>15,} {size / elapsed:>13,.0f}")
+
+    logging.getLogger().setLevel(logging.CRITICAL)
+    await bot.close()
+    main.log_listener.stop()
+
+
+async def _count(coro) -> int:
+    return len(await coro)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="LevelingCog XP boşaltma ölçümü")
+    parser.add_argument("--sizes", default="100,10000,100000", help="Virgülle ayrılmış önbellek boyutları (kullanıcı)")
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--existing-ratio", type=float, default=0.5, help="Veritabanında önceden bulunan kullanıcı oranı")
+    parser.add_argument("--legacy-max", type=int, default=10000, help="Eski yolun ölçüleceği en büyük boyut")
+    parser.add_argument("--db-latency-ms", type=float, default=0.3, help="Bellek içi DB için sorgu başına gecikme")
+    parser.add_argument("--dsn", help="Bellek içi taklit yerine gerçek Postgres kullan")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,185 @@
+# commands/Genel/ayarlar.py
+import discord
+from discord.ext import commands
+
+from utils.welcome_template import PLACEHOLDERS as WELCOME_PLACEHOLDERS, unknown_placeholders
+
+MAX_PREFIX_LENGTH = 10
+MAX_WELCOME_MESSAGE_LENGTH = 2000
+MAX_LEVEL_UP_DIGEST_LIMIT = 100  # Tebrik özetinde tek tek yazılan en fazla üye
+
+# Kullanıcıya gösterilen ad -> guild_settings sütunları (sıfırlama için)
+RESETTABLE_FIELDS = {
+    "prefix": ("prefix",),
+    "partnerkanal": ("partner_channel_id",),
+    "hosgeldinkanal": ("welcome_channel_id",),
+    "hosgeldinrol": ("welcome_role_id",),
+    "hosgeldinmesaj": ("welcome_message",),
+    "xparalik": ("xp_min", "xp_max"),
+    "xpbekleme": ("xp_cooldown_seconds",),
+    "tebrikkanal": ("congratulations_channel_id",),
+    "tebriksinir": ("level_up_digest_limit",),
+    "seviyerolleri": ("level_roles",),
+    "rolyiginla": ("stack_roles",),
+    "xpkapali": ("blacklisted_channels",),
+    "seviyekarti": ("rank_card",),
+}
+
+class GuildSettingsCog(commands.Cog, name="Sunucu Ayarları"):
+    """Sunucuya özel prefix, kanal ve XP ayarlarını yöneten komutlar (Sunucuyu Yönet izni gerekir)."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @staticmethod
+    def _source(settings, *names: str) -> str:
+        """Değerin sunucuya özel mi yoksa genel ayardan mı geldiğini belirtir."""
+        overridden = any(getattr(settings.overrides, name) is not None for name in names)
+        return "" if overridden else " *(genel)*"
+
+    @commands.group(name="ayar", aliases=["ayarlar", "settings"], invoke_without_command=True)
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def settings_group(self, ctx: commands.Context):
+        """Sunucunun geçerli ayarlarını ve alt komutları gösterir."""
+        settings = await self.bot.guild_settings.get(ctx.guild.id)
+
+        def channel(channel_id):
+            return f"<#{channel_id}>" if channel_id else "Ayarlanmamış"
+
+        embed = discord.Embed(title=f"⚙️ {ctx.guild.name} Ayarları", color=discord.Color.blurple())
+        embed.add_field(name="Prefix", value=f"`{settings.prefix}`" + self._source(settings, "prefix"), inline=True)
+        embed.add_field(name="Partner Kanalı", value=channel(settings.partner_channel_id) + self._source(settings, "partner_channel_id"), inline=True)
+        embed.add_field(name="Tebrik Kanalı", value=channel(settings.congratulations_channel_id) + self._source(settings, "congratulations_channel_id"), inline=True)
+        embed.add_field(name="Hoş Geldin Kanalı", value=channel(settings.welcome_channel_id) + self._source(settings, "welcome_channel_id"), inline=True)
+        embed.add_field(
+            name="Hoş Geldin Rolü",
+            value=(f"<@&{settings.welcome_role_id}>" if settings.welcome_role_id else "Ayarlanmamış") + self._source(settings, "welcome_role_id"),
+            inline=True
+        )
+        embed.add_field(name="Hoş Geldin Mesajı", value="Özel şablon" if settings.welcome_message else "Varsayılan", inline=True)
+        embed.add_field(name="XP Aralığı", value=f"{settings.xp_min}-{settings.xp_max}" + self._source(settings, "xp_min", "xp_max"), inline=True)
+        embed.add_field(name="XP Bekleme", value=f"{settings.cooldown_seconds:g} sn" + self._source(settings, "xp_cooldown_seconds"), inline=True)
+        embed.add_field(name="XP Kapalı Kanal", value=str(len(settings.blacklisted_channels)), inline=True)
+        embed.add_field(name="Tebrik Özeti Sınırı", value=f"{settings.level_up_digest_limit} üye" + self._source(settings, "level_up_digest_limit"), inline=True)
+
+        p = ctx.clean_prefix
+        embed.add_field(
+            name="Komutlar",
+            value=(
+                f"`{p}ayar prefix <yeni>`\n"
+                f"`{p}ayar partnerkanal <#kanal>`\n"
+                f"`{p}ayar hosgeldinkanal <#kanal>`\n"
+                f"`{p}ayar hosgeldinrol <@rol>`\n"
+                f"`{p}ayar hosgeldinmesaj <metin>` ({{uye}}, {{sunucu}}, {{uye_sayisi}})\n"
+                f"`{p}ayar xparalik <min> <max>`\n"
+                f"`{p}ayar xpbekleme <saniye>`\n"
+                f"`{p}ayar tebrikkanal <#kanal>`\n"
+                f"`{p}ayar tebriksinir <sayı>`\n"
+                f"`{p}ayar sifirla <{'|'.join(RESETTABLE_FIELDS)}|hepsi>`"
+            ),
+            inline=False
+        )
+        await ctx.send(embed=embed)
+
+    @settings_group.command(name="prefix")
+    async def set_prefix(self, ctx: commands.Context, yeni_prefix: str):
+        """Sunucunun komut prefix'ini değiştirir."""
+        if len(yeni_prefix) > MAX_PREFIX_LENGTH:
+            await ctx.send(f"❌ Prefix en fazla {MAX_PREFIX_LENGTH} karakter olabilir.")
+            return
+        await self.bot.guild_settings.update(ctx.guild.id, prefix=yeni_prefix)
+        await ctx.send(f"✅ Prefix **`{yeni_prefix}`** olarak ayarlandı.")
+
+    @settings_group.command(name="partnerkanal")
+    async def set_partner_channel(self, ctx: commands.Context, kanal: discord.TextChannel):
+        """Partnerlik metinlerinin izlendiği kanalı ayarlar."""
+        await self.bot.guild_settings.update(ctx.guild.id, partner_channel_id=kanal.id)
+        await ctx.send(f"✅ Partner kanalı {kanal.mention} olarak ayarlandı.")
+
+    @settings_group.command(name="hosgeldinkanal", aliases=["hoşgeldinkanal"])
+    async def set_welcome_channel(self, ctx: commands.Context, kanal: discord.TextChannel):
+        """Hoş geldin mesajlarının gönderileceği kanalı ayarlar."""
+        await self.bot.guild_settings.update(ctx.guild.id, welcome_channel_id=kanal.id)
+        await ctx.send(f"✅ Hoş geldin kanalı {kanal.mention} olarak ayarlandı.")
+
+    @settings_group.command(name="hosgeldinrol", aliases=["hoşgeldinrol"])
+    async def set_welcome_role(self, ctx: commands.Context, rol: discord.Role):
+        """Hoş geldin mesajında etiketlenecek rolü ayarlar."""
+        await self.bot.guild_settings.update(ctx.guild.id, welcome_role_id=rol.id)
+        await ctx.send(f"✅ Hoş geldin rolü **{rol.name}** olarak ayarlandı.")
+
+    @settings_group.command(name="hosgeldinmesaj", aliases=["hoşgeldinmesaj"])
+    async def set_welcome_message(self, ctx: commands.Context, *, mesaj: str):
+        """Hoş geldin mesajı şablonunu ayarlar ({uye}, {sunucu}, {uye_sayisi} kullanılabilir)."""
+        if len(mesaj) > MAX_WELCOME_MESSAGE_LENGTH:
+            await ctx.send(f"❌ Mesaj en fazla {MAX_WELCOME_MESSAGE_LENGTH} karakter olabilir.")
+            return
+        unknown = unknown_placeholders(mesaj)
+        if unknown:
+            await ctx.send(
+                f"❌ Desteklenmeyen yer tutucu: {', '.join(f'`{{{name}}}`' for name in unknown)}. "
+                f"Kullanılabilenler: {', '.join(f'`{{{name}}}`' for name in WELCOME_PLACEHOLDERS)}"
+            )
+            return
+        await self.bot.guild_settings.update(ctx.guild.id, welcome_message=mesaj)
+        await ctx.send("✅ Hoş geldin mesajı şablonu güncellendi.")
+
+    @settings_group.command(name="xparalik", aliases=["xparalık"])
+    async def set_xp_range(self, ctx: commands.Context, en_az: int, en_cok: int):
+        """Mesaj başına kazanılan XP aralığını ayarlar."""
+        if en_az < 0 or en_cok < en_az:
+            await ctx.send("❌ Geçersiz aralık. En az 0 olmalı ve en çok değeri en az değerinden küçük olmamalı.")
+            return
+        await self.bot.guild_settings.update(ctx.guild.id, xp_min=en_az, xp_max=en_cok)
+        await ctx.send(f"✅ XP aralığı **{en_az}-{en_cok}** olarak ayarlandı.")
+
+    @settings_group.command(name="xpbekleme")
+    async def set_xp_cooldown(self, ctx: commands.Context, saniye: float):
+        """İki XP kazanımı arasındaki bekleme süresini ayarlar."""
+        if saniye < 0:
+            await ctx.send("❌ Bekleme süresi negatif olamaz.")
+            return
+        await self.bot.guild_settings.update(ctx.guild.id, xp_cooldown_seconds=saniye)
+        await ctx.send(f"✅ XP bekleme süresi **{saniye:g} saniye** olarak ayarlandı.")
+
+    @settings_group.command(name="tebrikkanal")
+    async def set_congratulations_channel(self, ctx: commands.Context, kanal: discord.TextChannel):
+        """Seviye atlama tebriklerinin gönderileceği kanalı ayarlar."""
+        await self.bot.guild_settings.update(ctx.guild.id, congratulations_channel_id=kanal.id)
+        await ctx.send(f"✅ Tebrik kanalı {kanal.mention} olarak ayarlandı.")
+
+    @settings_group.command(name="tebriksinir", aliases=["tebriksınır"])
+    async def set_level_up_digest_limit(self, ctx: commands.Context, sayi: int):
+        """Seviye atlama özetinde tek tek adı yazılan en fazla üye sayısını ayarlar."""
+        if not 1 <= sayi <= MAX_LEVEL_UP_DIGEST_LIMIT:
+            await ctx.send(f"❌ Sınır 1 ile {MAX_LEVEL_UP_DIGEST_LIMIT} arasında olmalı.")
+            return
+        await self.bot.guild_settings.update(ctx.guild.id, level_up_digest_limit=sayi)
+        await ctx.send(f"✅ Tebrik özetinde en fazla **{sayi}** üye listelenecek.")
+
+    @settings_group.command(name="sifirla", aliases=["sıfırla", "reset"])
+    async def reset_setting(self, ctx: commands.Context, alan: str):
+        """Bir ayarı (veya 'hepsi' ile tüm ayarları) genel değerine döndürür."""
+        alan = alan.lower()
+        if alan == "hepsi":
+            await self.bot.guild_settings.reset(ctx.guild.id)
+            await ctx.send("✅ Tüm sunucu ayarları genel değerlere döndürüldü.")
+            return
+        columns = RESETTABLE_FIELDS.get(alan)
+        if not columns:
+            await ctx.send(f"❌ Bilinmeyen ayar. Geçerli ayarlar: {', '.join(RESETTABLE_FIELDS)}, hepsi")
+            return
+        await self.bot.guild_settings.reset(ctx.guild.id, *columns)
+        await ctx.send(f"✅ **{alan}** ayarı genel değere döndürüldü.")
+
+    # Alt komutlar grup kontrollerini (sunucu içi, Sunucuyu Yönet izni) devralmaz; burada tekrar uygulanır
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage()
+        if not ctx.author.guild_permissions.manage_guild:
+            raise commands.MissingPermissions(["manage_guild"])
+        return True
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(GuildSettingsCog(bot))
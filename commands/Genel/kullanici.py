@@ -32,9 +32,9 @@ class BilgiCog(commands.Cog):
         guild = ctx.guild
         created_at = guild.created_at.strftime("%d %B %Y, %H:%M")
         total_members = guild.member_count
-        online_members = sum(1 for member in guild.members if member.status != discord.Status.offline)
-        humans = sum(1 for member in guild.members if not member.bot)
-        bots = sum(1 for member in guild.members if member.bot)
+        # Üye önbelleği politikası gereği liste eksik olabilir; sayımlar gerektiğinde yüklenen listeden çıkarılır
+        counts = await self.bot.member_resolver.member_counts(guild)
+        online_members, humans, bots = counts.online, counts.humans, counts.bots
         text_channels = len(guild.text_channels)
         voice_channels = len(guild.voice_channels)
         categories = len(guild.categories)
@@ -148,7 +148,8 @@ class BilgiCog(commands.Cog):
         embed.add_field(name="#️⃣ ID", value=role.id, inline=True)
         embed.add_field(name="🎨 Renk (Hex)", value=str(role.color), inline=True)
         embed.add_field(name="📅 Oluşturulma Tarihi", value=created_at, inline=True)
-        embed.add_field(name="👥 Üye Sayısı", value=len(role.members), inline=True)
+        role_members = (await self.bot.member_resolver.member_counts(ctx.guild)).roles.get(role.id, 0)
+        embed.add_field(name="👥 Üye Sayısı", value=role_members, inline=True)
         embed.add_field(name="📌 Pozisyon", value=role.position, inline=True)
         embed.add_field(name="🗣️ Bahsedilebilir mi?", value="Evet" if role.mentionable else "Hayır", inline=True)
         embed.add_field(name="↕️ Ayrı Gösteriliyor mu?", value="Evet" if role.hoist else "Hayır", inline=True)
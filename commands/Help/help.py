@@ -16,7 +16,8 @@ class HelpCog(commands.Cog, name="Yardım Komutları"):
             "Durum Ayarları",
             "Kapatma",
             "Yeniden Başlatma",
-            "Aktiflik Süresi (Sahip)"
+            "Aktiflik Süresi (Sahip)",
+            "İstatistikler (Sahip)"
         }
 
     @commands.command(
@@ -76,7 +77,7 @@ class HelpCog(commands.Cog, name="Yardım Komutları"):
 
         # Seviye Komutları
         seviye_komutlari_str = "\n".join([
-            f"`{prefix}lider` - Seviye sistemin liderlik sistemi",
+            f"`{prefix}lider [haftalık|aylık] [sayfa]` - Seviye sistemin liderlik sistemi",
             f"`{prefix}seviye` - Seviye sistem seviye gösterme"
         ])
 
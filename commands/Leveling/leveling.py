@@ -1,63 +1,248 @@
 import asyncio
-import json
+import contextlib
+import io
 import logging
 import os
 import random
-from typing import Dict, Tuple
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
 
-import asyncpg
 import discord
 from discord.ext import commands, tasks
 
-# --- Loglama Ayarları ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s:%(levelname)s:%(name)s: %(message)s',
-    handlers=[
-        logging.FileHandler('leveling.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-
-# --- Yapılandırma ---
-CONFIG_FILE = "leveling_config.json"
-DEFAULT_CONFIG = {
-    "xp_range": {"min": 5, "max": 10},
-    "xp_cooldown_seconds": 60,
-    "level_roles": {},
-    "blacklisted_channels": [],
-    "xp_boosts": {},
-    "congratulations_channel_id": None,
-    "stack_roles": False # Yeni ayar: Rollerin yığılıp yığılmayacağı
+from utils.cooldowns import DEFAULT_MAX_ENTRIES, CooldownStore
+from utils.leveling_curve import CURVES, LevelCurve
+from utils.message_pipeline import MessageContext
+from utils.rank_card import DEFAULT_WORKERS as DEFAULT_RANK_CARD_WORKERS, RankCardRenderer
+from utils.rank_index import RankIndex
+from utils.role_sync import RolePacer, RoleSyncManager, RoleUpdateQueue, guild_role_plan
+from utils.xp_journal import DEFAULT_SYNC_INTERVAL, XPJournal
+
+# --- Toplu XP Yazımı ---
+FLUSH_BATCH_SIZE = 10000   # Tek sorguda gönderilen en fazla kullanıcı
+
+# XP önbelleğinin veritabanına yazılma aralığı. Artışlar yerel günlükte korunduğundan
+# aralığı uzatmak yalnızca veritabanı yükünü azaltır, çökmede XP kaybettirmez.
+XP_FLUSH_INTERVAL = float(os.getenv("XP_FLUSH_INTERVAL", "60"))
+XP_JOURNAL_SYNC_INTERVAL = float(os.getenv("XP_JOURNAL_SYNC_INTERVAL", str(DEFAULT_SYNC_INTERVAL)))
+
+# Bellekte tutulan en fazla XP bekleme süresi kaydı (sunucu, kullanıcı)
+COOLDOWN_MAX_ENTRIES = int(os.getenv("XP_COOLDOWN_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES)))
+
+# Gerçek veri total_xp'dir; level ve xp sütunları eğriden türetilen önbellektir ($4: eğrinin kümülatif eşikleri).
+# width_bucket toplam XP'nin kaçıncı eşiği geçtiğini (seviyeyi) bulur.
+_NEW_TOTAL = "(u.total_xp + EXCLUDED.total_xp)::bigint"
+FLUSH_XP_QUERY = f"""
+    WITH deltas AS (
+        SELECT * FROM unnest($1::bigint[], $2::bigint[], $3::integer[]) AS d(user_id, guild_id, gained)
+    ),
+    journal AS (
+        INSERT INTO xp_flush_log (segment) SELECT unnest($5::text[])
+        ON CONFLICT (segment) DO NOTHING
+    ),
+    previous AS (
+        SELECT u.user_id, u.guild_id, width_bucket(u.total_xp::bigint, $4::bigint[]) AS level
+        FROM users u JOIN deltas d USING (user_id, guild_id)
+    ),
+    daily AS (
+        INSERT INTO xp_daily AS x (guild_id, user_id, day, xp)
+        SELECT guild_id, user_id, $6::date, gained FROM deltas
+        ON CONFLICT (guild_id, day, user_id) DO UPDATE SET xp = x.xp + EXCLUDED.xp
+    ),
+    upserted AS (
+        INSERT INTO users AS u (user_id, guild_id, level, xp, total_xp)
+        SELECT user_id, guild_id,
+               width_bucket(gained::bigint, $4::bigint[]),
+               gained - COALESCE(($4::bigint[])[width_bucket(gained::bigint, $4::bigint[])], 0),
+               gained
+        FROM deltas
+        ON CONFLICT (user_id, guild_id) DO UPDATE SET
+            level = width_bucket({_NEW_TOTAL}, $4::bigint[]),
+            xp = {_NEW_TOTAL} - COALESCE(($4::bigint[])[width_bucket({_NEW_TOTAL}, $4::bigint[])], 0),
+            total_xp = u.total_xp + EXCLUDED.total_xp
+        RETURNING u.user_id, u.guild_id, u.level, u.total_xp
+    )
+    SELECT up.user_id, up.guild_id, up.level, up.total_xp
+    FROM upserted up LEFT JOIN previous p USING (user_id, guild_id)
+    WHERE up.level > COALESCE(p.level, 0)
+"""
+
+# Günlük parçalarının hangilerinin veritabanına ulaştığı; XP ile aynı sorguda yazılır
+JOURNAL_RETENTION_DAYS = 7
+
+# --- XP Geçmişi ---
+# Her boşaltma artışları (sunucu, kullanıcı, gün) kovalarına da yazar ($6). Kovalar periyodik olarak haftalık ve
+# aylık özet tablolarına işlenir; dönemlik liderlik tabloları yalnızca özetlerden okunur. compacted_xp, günlük
+# kovanın özetlere işlenmiş kısmıdır: her tur yalnızca aradaki farkı ekler, böylece aynı XP iki kez sayılmaz.
+XP_HISTORY_TZ = ZoneInfo(os.getenv("XP_HISTORY_TZ", "Europe/Istanbul"))  # Gün/hafta/ay sınırlarının saat dilimi
+XP_ROLLUP_INTERVAL = float(os.getenv("XP_ROLLUP_INTERVAL", "300"))  # Özetlerin en fazla gecikmesi (saniye, boşaltmaya ek)
+XP_DAILY_RETENTION_DAYS = 14  # Özetlere işlenmiş günlük kovalar bu süreden sonra silinir
+
+COMPACT_XP_HISTORY_QUERY = """
+    WITH pending AS (
+        SELECT guild_id, user_id, day, xp - compacted_xp AS delta
+        FROM xp_daily WHERE xp <> compacted_xp
+        FOR UPDATE
+    ),
+    marked AS (
+        UPDATE xp_daily d SET compacted_xp = d.compacted_xp + p.delta
+        FROM pending p
+        WHERE d.guild_id = p.guild_id AND d.day = p.day AND d.user_id = p.user_id
+    ),
+    weekly AS (
+        INSERT INTO xp_weekly AS w (guild_id, week, user_id, xp)
+        SELECT guild_id, date_trunc('week', day::timestamp)::date, user_id, SUM(delta) FROM pending GROUP BY 1, 2, 3
+        ON CONFLICT (guild_id, week, user_id) DO UPDATE SET xp = w.xp + EXCLUDED.xp
+    ),
+    monthly AS (
+        INSERT INTO xp_monthly AS m (guild_id, month, user_id, xp)
+        SELECT guild_id, date_trunc('month', day::timestamp)::date, user_id, SUM(delta) FROM pending GROUP BY 1, 2, 3
+        ON CONFLICT (guild_id, month, user_id) DO UPDATE SET xp = m.xp + EXCLUDED.xp
+    )
+    SELECT COUNT(*) FROM pending
+"""
+
+# `lider` dönem argümanı -> (özet tablosu, dönem sütunu, başlık, dönemin ilk günü)
+LEADERBOARD_PERIODS = {
+    "haftalık": ("xp_weekly", "week", "Haftalık", lambda today: today - timedelta(days=today.weekday())),
+    "aylık": ("xp_monthly", "month", "Aylık", lambda today: today.replace(day=1)),
+}
+PERIOD_ALIASES = {
+    "haftalık": "haftalık", "haftalik": "haftalık", "hafta": "haftalık", "weekly": "haftalık",
+    "aylık": "aylık", "aylik": "aylık", "ay": "aylık", "monthly": "aylık",
 }
 
+# Eğri değiştiğinde bir sunucunun tüm seviyeleri tek sorguda total_xp'den yeniden türetilir
+RECALCULATE_LEVELS_QUERY = """
+    UPDATE users SET
+        level = width_bucket(total_xp::bigint, $2::bigint[]),
+        xp = total_xp - COALESCE(($2::bigint[])[width_bucket(total_xp::bigint, $2::bigint[])], 0)
+    WHERE guild_id = $1
+"""
+
+# --- Seviye Atlama Tebrikleri ---
+# Bir boşaltmadaki tüm seviye atlamaları sunucu başına tek mesajda özetlenir (kanal hız sınırına takılmamak için)
+DIGEST_LINES_PER_EMBED = 25
+MAX_DIGEST_EMBEDS = 10  # Discord'un mesaj başına embed sınırı
+
+# --- Seviye Kartı ---
+# Görsel kartları çizen süreç sayısı; kart yalnızca `seviyeayar kart ac` ile açılan sunucularda kullanılır
+RANK_CARD_WORKERS = int(os.getenv("RANK_CARD_WORKERS", str(DEFAULT_RANK_CARD_WORKERS)))
+
+# --- Liderlik Tablosu ---
+LEADERBOARD_PAGE_SIZE = 10
+LEADERBOARD_TIMEOUT = 180  # Butonların etkin kaldığı süre (saniye)
+
+# --- Loglama Ayarları ---
+# Handler'lar main.py'deki setup_logging tarafından kurulur (leveling.log dahil).
+
+class LeaderboardView(discord.ui.View):
+    """
+    Liderlik tablosu için önceki/sonraki/ben butonları.
+
+    Her tıklama bellek içi sıralamadan okunur; sayfa, gösterilen ilk ve son kaydın
+    anahtarından (keyset) devam eder, böylece arada XP yazılsa da kayıt atlanmaz.
+    """
+    def __init__(self, cog: "LevelingCog", ctx: commands.Context, keys: List[Tuple[int, int]]):
+        super().__init__(timeout=LEADERBOARD_TIMEOUT)
+        self.cog = cog
+        self.ctx = ctx
+        self.keys = keys  # Şu an gösterilen sayfanın anahtarları
+        self.message: Optional[discord.Message] = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.ctx.author.id:
+            await interaction.response.send_message(
+                f"Bu tablo {self.ctx.author.display_name} için açıldı. Kendi tablon için `{self.ctx.clean_prefix}lider` yaz.",
+                ephemeral=True
+            )
+            return False
+        return True
+
+    async def _show(self, interaction: discord.Interaction, keys: List[Tuple[int, int]]):
+        if keys:
+            self.keys = keys
+        ranking = await self.cog.ranks.get(self.ctx.guild.id)
+        embed = await self.cog.leaderboard_embed(self.ctx.guild, ranking, self.keys, highlight=interaction.user.id)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="Önceki", style=discord.ButtonStyle.grey, emoji="◀️")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        ranking = await self.cog.ranks.get(self.ctx.guild.id)
+        await self._show(interaction, ranking.page_before(self.keys[0], LEADERBOARD_PAGE_SIZE))
+
+    @discord.ui.button(label="Sonraki", style=discord.ButtonStyle.grey, emoji="▶️")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        ranking = await self.cog.ranks.get(self.ctx.guild.id)
+        await self._show(interaction, ranking.page_after(self.keys[-1], LEADERBOARD_PAGE_SIZE))
+
+    @discord.ui.button(label="Ben", style=discord.ButtonStyle.blurple, emoji="📍")
+    async def my_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        ranking = await self.cog.ranks.get(self.ctx.guild.id)
+        key = ranking.key_for(interaction.user.id)
+        if key is None:
+            await interaction.response.send_message("Henüz bir seviye verin yok.", ephemeral=True)
+            return
+        await self._show(interaction, ranking.page_at(ranking.position(key), LEADERBOARD_PAGE_SIZE))
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
 class LevelingCog(commands.Cog):
     """Veritabanı ve komut yapısı geliştirilmiş seviye sistemi."""
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.logger = logging.getLogger(__name__)
-        self.config = DEFAULT_CONFIG.copy()
-        self._load_config()
+        # Ayar komutları sunucu başına oku-değiştir-yaz yapar; aynı sunucudaki eşzamanlı değişiklikler sıraya girer
+        self._settings_locks: Dict[int, asyncio.Lock] = {}
         
-        self.cooldowns = {}
+        # Küme modunda her süreç yalnızca kendi shard'larındaki sunucuları görür. Bu yüzden
+        # süreç içi durum sunucu bazında tutulur; aynı kullanıcı farklı süreçlerdeki
+        # sunucularda birbirinden bağımsız bekleme süresine sahiptir.
+        self.cooldowns = CooldownStore(COOLDOWN_MAX_ENTRIES) # (guild_id, user_id) -> bekleme süresinin bittiği an
         self.db_pool = None
+        self.ranks: RankIndex = None  # Sunucu başına bellek içi sıralama; havuz hazır olunca kurulur
+        # Seviye rolleri değiştiğinde mevcut üyeleri uzlaştıran arka plan işleri; havuz hazır olunca kurulur
+        self.role_pacer = RolePacer()
+        self.role_sync: RoleSyncManager = None
+        # Seviye atlayanların rol güncellemeleri sınırlı bir kuyrukta sabit sayıda işçiyle uygulanır
+        self.role_updates = RoleUpdateQueue(self._update_level_roles)
+        self.rank_cards = RankCardRenderer(RANK_CARD_WORKERS)
         
         # --- PERFORMANS GELİŞTİRMESİ: XP Önbelleği ---
         # Her mesajda DB'ye yazmak yerine XP'yi burada biriktiririz.
         self.xp_cache: Dict[int, Dict[int, int]] = {} # guild_id -> {user_id: xp_to_add}
+        # Önbellekteki her artış önce yerel günlüğe eklenir; çökmede açılışta geri oynatılır
+        self.journal = XPJournal(self.bot.xp_journal_dir, XP_JOURNAL_SYNC_INTERVAL)
+        self._journal_replayed = False  # Geri oynatmadan önce boşaltma yapılmaz (yeni parçalar eski sanılmasın)
         
         self.bot.loop.create_task(self._init_db())
+        self.flush_xp_cache_to_db.change_interval(seconds=XP_FLUSH_INTERVAL)
         self.flush_xp_cache_to_db.start() # Arka plan görevini başlat
+        self.compact_xp_history.change_interval(seconds=XP_ROLLUP_INTERVAL)
+        self.compact_xp_history.start()
 
     async def _init_db(self):
-        """PostgreSQL veritabanına bağlanır ve gerekli tabloları oluşturur."""
+        """Botun merkezi veritabanı havuzunu ödünç alır ve gerekli tabloları oluşturur."""
         try:
-            database_url = os.getenv("DATABASE_URL")
-            if not database_url:
-                self.logger.critical("DATABASE_URL çevresel değişkeni tanımlı değil. Bot başlatılamıyor.")
-                raise ValueError("DATABASE_URL çevresel değişkeni eksik.")
-            
-            self.db_pool = await asyncpg.create_pool(database_url)
+            if not self.bot.db:
+                self.logger.critical("Merkezi veritabanı havuzu (bot.db) hazır değil. Seviye sistemi çalışmayacak.")
+                raise ValueError("bot.db tanımlı değil.")
+
+            self.db_pool = self.bot.db
+            self.ranks = RankIndex(self.db_pool)
+            self.role_sync = RoleSyncManager(
+                self.bot, self.db_pool, self.role_pacer,
+                lambda guild_id, total_xp: self.bot.guild_settings.cached(guild_id).curve.level_for(total_xp)
+            )
             async with self.db_pool.acquire() as conn:
                 await conn.execute("""
                     CREATE TABLE IF NOT EXISTS users (
@@ -69,173 +254,301 @@ class LevelingCog(commands.Cog):
                         PRIMARY KEY (user_id, guild_id)
                     )
                 """)
-            self.logger.info("PostgreSQL veritabanı bağlantısı başarılı.")
+                # Sıralama yükleme ve liderlik tablosu sorguları sunucu içinde total_xp'ye göre okur
+                await conn.execute(
+                    "CREATE INDEX IF NOT EXISTS users_guild_total_xp_idx ON users (guild_id, total_xp DESC)"
+                )
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS xp_flush_log (
+                        segment TEXT PRIMARY KEY,
+                        flushed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                    )
+                """)
+                await conn.execute(
+                    f"DELETE FROM xp_flush_log WHERE flushed_at < now() - interval '{JOURNAL_RETENTION_DAYS} days'"
+                )
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS xp_daily (
+                        guild_id BIGINT,
+                        user_id BIGINT,
+                        day DATE,
+                        xp INTEGER NOT NULL DEFAULT 0,
+                        compacted_xp INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (guild_id, day, user_id)
+                    )
+                """)
+                # Sıkıştırma yalnızca özetlere işlenmemiş kovaları okur; silme eski günleri tarar
+                await conn.execute(
+                    "CREATE INDEX IF NOT EXISTS xp_daily_pending_idx ON xp_daily (day) WHERE xp <> compacted_xp"
+                )
+                await conn.execute("CREATE INDEX IF NOT EXISTS xp_daily_day_idx ON xp_daily (day)")
+                for table, column in (("xp_weekly", "week"), ("xp_monthly", "month")):
+                    await conn.execute(f"""
+                        CREATE TABLE IF NOT EXISTS {table} (
+                            guild_id BIGINT,
+                            {column} DATE,
+                            user_id BIGINT,
+                            xp INTEGER NOT NULL DEFAULT 0,
+                            PRIMARY KEY (guild_id, {column}, user_id)
+                        )
+                    """)
+                    # Dönemlik liderlik tablosu bir sunucunun tek döneminden XP'ye göre sıralı okur
+                    await conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {table}_ranking_idx ON {table} (guild_id, {column}, xp DESC)"
+                    )
+                await RoleSyncManager.ensure_schema(conn)
+            self.logger.info("Seviye sistemi merkezi veritabanı havuzunu kullanıyor.")
         except Exception as e:
             self.logger.critical(f"Veritabanı başlatılamadı: {e}")
             raise
+        await self._replay_journal()
+        self.bot.loop.create_task(self._resume_role_sync())
 
-    def _load_config(self):
+    async def _resume_role_sync(self):
+        """Önceki süreçte yarım kalan rol senkronizasyonlarını sunucular görünür olunca sürdürür."""
+        await self.bot.wait_until_ready()
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    loaded_config = json.load(f)
-                    for key, value in DEFAULT_CONFIG.items():
-                        loaded_config.setdefault(key, value)
-                    self.config = loaded_config
-                self.logger.info(f"Yapılandırma dosyası ({CONFIG_FILE}) başarıyla yüklendi.")
-            else:
-                self._save_config()
-                self.logger.info(f"Varsayılan yapılandırma dosyası ({CONFIG_FILE}) oluşturuldu.")
+            await self.role_sync.resume()
         except Exception as e:
-            self.logger.error(f"Yapılandırma yüklenirken hata: {e}. Varsayılan ayarlar kullanılıyor.")
-            self.config = DEFAULT_CONFIG.copy()
+            self.logger.error(f"Yarım kalan rol senkronizasyonları sürdürülemedi: {e}")
 
-    def _save_config(self):
+    async def _replay_journal(self):
+        """Önceki süreçten kalan, veritabanına ulaşmamış XP artışlarını önbelleğe geri yükler."""
         try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4, ensure_ascii=False)
-            self.logger.info(f"Yapılandırma {CONFIG_FILE} dosyasına kaydedildi.")
-        except Exception as e:
-            self.logger.error(f"Yapılandırma kaydedilemedi: {e}")
-            
-    def _calculate_xp_for_level(self, level: int) -> int:
-        """Belirtilen seviyeye ulaşmak için gereken toplam XP miktarını hesaplar."""
-        return 50 * (level ** 2) + (100 * level) + 200
+            segments = await asyncio.to_thread(self.journal.recover)
+        except OSError as e:
+            self.logger.error(f"XP günlüğü kullanılamıyor, XP yalnızca bellekte tutulacak: {e}")
+            self.journal.enabled = False
+            segments = []
+        self._journal_replayed = True
+        self.journal.start()
+        if not segments:
+            return
+        # Onaylanıp silinmeden önce çöken parçalar zaten yazılmıştır; ikinci kez uygulanmaz
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT segment FROM xp_flush_log WHERE segment = ANY($1::text[])", [name for name, _ in segments]
+            )
+        flushed = {row['segment'] for row in rows}
+        self.journal.confirm(flushed)
+
+        replayed = 0
+        for name, deltas in segments:
+            if name in flushed:
+                continue
+            for guild_id, users in deltas.items():
+                guild_cache = self.xp_cache.setdefault(guild_id, {})
+                for user_id, xp in users.items():
+                    guild_cache[user_id] = guild_cache.get(user_id, 0) + xp
+                    replayed += 1
+        self.logger.info(
+            f"XP günlüğü geri oynatıldı: {len(segments) - len(flushed)} parça ({replayed} kayıt) önbelleğe alındı, "
+            f"{len(flushed)} parça zaten yazılmıştı."
+        )
+
+    # --- Yapılandırma ---
+    # Ayarlar sunucu başına guild_settings tablosunda tutulur ve bot.guild_settings'ten hazır yapılar olarak
+    # okunur (XP kapalı kanallar frozenset, seviye rolleri seviyeye göre sıralı). leveling_config.json
+    # yalnızca özel ayarı olmayan sunucuların varsayılanıdır ve komutlarla değiştirilmez.
+    def _settings_lock(self, guild_id: int) -> asyncio.Lock:
+        lock = self._settings_locks.get(guild_id)
+        if lock is None:
+            lock = self._settings_locks[guild_id] = asyncio.Lock()
+        return lock
 
     @tasks.loop(seconds=60.0)
     async def flush_xp_cache_to_db(self):
         """Önbellekte biriken XP'leri periyodik olarak veritabanına yazar."""
-        if not self.xp_cache:
+        if not self.xp_cache or not self._journal_replayed:
             return
 
         local_cache = self.xp_cache.copy()
         self.xp_cache.clear()
+        # Arada await olmadan mühürlenir: parçalar tam olarak bu önbellekteki (ve önceki başarısız turlardaki) artışlardır
+        segments = await self.journal.seal()
         
         self.logger.info(f"{len(local_cache)} sunucudan XP verileri veritabanına yazılıyor...")
 
-        async with self.db_pool.acquire() as conn:
-            async with conn.transaction():
-                for guild_id, users in local_cache.items():
-                    guild = self.bot.get_guild(guild_id)
-                    if not guild:
-                        continue
-                        
-                    for user_id, xp_to_add in users.items():
-                        user_data = await conn.fetchrow(
-                            "SELECT level, xp, total_xp FROM users WHERE user_id = $1 AND guild_id = $2",
-                            user_id, guild_id
-                        )
+        # Yazım süresince bu sunucuların sıralaması yüklenirse saklanmaz (artışlar iki kez eklenmesin)
+        self.ranks.begin(local_cache)
+        try:
+            rows = await self._write_xp(local_cache, segments)
+        except Exception as e:
+            self.ranks.abort(local_cache)
+            # Yazılamayan XP kaybolmasın; bir sonraki turda (veya anlık görüntüyle) yeniden denenir.
+            self.logger.error(f"XP önbelleği veritabanına yazılamadı, veriler önbelleğe geri alındı: {e}")
+            for guild_id, users in local_cache.items():
+                guild_cache = self.xp_cache.setdefault(guild_id, {})
+                for user_id, xp in users.items():
+                    guild_cache[user_id] = guild_cache.get(user_id, 0) + xp
+            return
+        self.journal.confirm(segments)
+        self.ranks.apply(local_cache)
 
-                        if user_data:
-                            level, xp, total_xp = user_data['level'], user_data['xp'], user_data['total_xp']
-                        else:
-                            level, xp, total_xp = 0, 0, 0
-
-                        xp += xp_to_add
-                        total_xp += xp_to_add
-                        
-                        xp_for_next = self._calculate_xp_for_level(level + 1)
-                        level_up = False
-                        while xp >= xp_for_next:
-                            level += 1
-                            xp -= xp_for_next
-                            xp_for_next = self._calculate_xp_for_level(level + 1)
-                            level_up = True
-                        
-                        await conn.execute(
-                            """
-                            INSERT INTO users (user_id, guild_id, level, xp, total_xp)
-                            VALUES ($1, $2, $3, $4, $5)
-                            ON CONFLICT (user_id, guild_id) DO UPDATE
-                            SET level = $3, xp = $4, total_xp = $5
-                            """,
-                            user_id, guild_id, level, xp, total_xp
-                        )
+        # XP yazılmıştır; bildirimlerdeki bir hata artışları önbelleğe geri almamalı
+        try:
+            await self._dispatch_level_ups(rows)
+        except Exception as e:
+            self.logger.error(f"Seviye atlama bildirimleri işlenemedi: {e}")
 
-                        if level_up:
-                            member = guild.get_member(user_id)
-                            if member:
-                                self.bot.loop.create_task(self._handle_level_up(member, level, total_xp))
+    @tasks.loop(seconds=300.0)
+    async def compact_xp_history(self):
+        """Günlük XP kovalarındaki yeni artışları haftalık ve aylık özetlere işler, eski kovaları siler."""
+        if not self._journal_replayed:  # Tablolar _init_db tamamlanınca hazırdır
+            return
+        try:
+            async with self.db_pool.acquire() as conn:
+                compacted = await conn.fetchval(COMPACT_XP_HISTORY_QUERY)
+                cutoff = datetime.now(XP_HISTORY_TZ).date() - timedelta(days=XP_DAILY_RETENTION_DAYS)
+                await conn.execute("DELETE FROM xp_daily WHERE day < $1 AND xp = compacted_xp", cutoff)
+        except Exception as e:
+            self.logger.error(f"XP geçmişi özetlere işlenemedi: {e}")
+            return
+        if compacted:
+            self.logger.debug(f"XP geçmişi: {compacted} günlük kova haftalık/aylık özetlere işlendi.")
+
+    async def _write_xp(self, local_cache: Dict[int, Dict[int, int]], segments: List[str] = ()) -> List:
+        """
+        Biriken XP'yi kullanıcı başına sorgu yerine tek bir toplu UPSERT ile yazar ve seviye atlayanları bildirir.
+
+        Tüm artışlar dizi parametreleri olarak gönderilir; seviye hesabı satır
+        güncellenirken veritabanında yapılır, böylece başka bir süreç aynı satırı
+        yazıyor olsa bile artış kaybolmaz. FLUSH_BATCH_SIZE'dan büyük önbellekler
+        parçalara bölünür ve tek bir işlemde yazılır. Sunucular seviye eğrilerine göre
+        gruplanır; genelde tüm sunucular aynı eğriyi kullandığından tek grup oluşur.
+        Günlük parça adları (`segments`) ilk sorguda xp_flush_log'a aynı işlemle yazılır;
+        artışlar aynı sorguda bugünün xp_daily kovasına da eklenir. Seviye atlayan satırları
+        döndürür; bildirimler çağıranın işidir (`_dispatch_level_ups`).
+        """
+        # Eğri adı -> (user_ids, guild_ids, gains)
+        groups: Dict[str, Tuple[List[int], List[int], List[int]]] = {}
+        for guild_id, users in local_cache.items():
+            curve = self.bot.guild_settings.cached(guild_id).curve
+            user_ids, guild_ids, gains = groups.setdefault(curve.name, ([], [], []))
+            for user_id, xp_to_add in users.items():
+                user_ids.append(user_id)
+                guild_ids.append(guild_id)
+                gains.append(xp_to_add)
+        batches = [
+            (name, start)
+            for name, (_, _, gains) in groups.items()
+            for start in range(0, len(gains), FLUSH_BATCH_SIZE)
+        ]
+
+        today = datetime.now(XP_HISTORY_TZ).date()
+        rows = []
+        async with self.db_pool.acquire() as conn:
+            async with contextlib.AsyncExitStack() as stack:
+                if len(batches) > 1:
+                    await stack.enter_async_context(conn.transaction())
+                for index, (name, start) in enumerate(batches):
+                    user_ids, guild_ids, gains = groups[name]
+                    end = start + FLUSH_BATCH_SIZE
+                    rows.extend(await conn.fetch(
+                        FLUSH_XP_QUERY, user_ids[start:end], guild_ids[start:end], gains[start:end],
+                        list(CURVES[name].thresholds), list(segments) if index == 0 else [], today
+                    ))
+        return rows
+
+    async def _dispatch_level_ups(self, rows: List):
+        """Seviye atlayan satırlar için rol güncellemelerini kuyruğa koyar ve sunucu başına tebrik gönderir."""
+        # Yalnızca bir eşiği geçen satırlar döner. Bildirimler işlem tamamlandıktan sonra gönderilir;
+        # sunucu henüz önbellekte olmasa da (ör. yeniden başlatma sonrası) XP yazılmıştır, yalnızca bildirim atlanır.
+        level_ups: Dict[int, List] = {}
+        for row in rows:
+            level_ups.setdefault(row['guild_id'], []).append(row)
+        for guild_id, guild_rows in level_ups.items():
+            guild = self.bot.get_guild(guild_id)
+            if not guild:
+                continue
+            members = await self.bot.member_resolver.resolve(guild, [row['user_id'] for row in guild_rows])
+            announced = []
+            for row in guild_rows:
+                member = members.get(row['user_id'])
+                if member:
+                    self.role_updates.submit(member, row['level'])
+                    announced.append((member, row['level'], row['total_xp']))
+            if announced:
+                self.bot.loop.create_task(self._announce_level_ups(guild, announced))
+
+    async def _announce_level_ups(self, guild: discord.Guild, level_ups: List[Tuple[discord.Member, int, int]]):
+        """Bir boşaltmadaki seviye atlamalarını tebrik kanalına tek mesajla bildirir."""
+        settings = await self.bot.guild_settings.get(guild.id)
+        channel = guild.get_channel(settings.congratulations_channel_id) if settings.congratulations_channel_id else None
+        channel = channel or guild.system_channel
+        if not channel or not channel.permissions_for(guild.me).send_messages:
+            return
 
-    async def _handle_level_up(self, member: discord.Member, new_level: int, total_xp: int):
-        """Seviye atlama durumunda tebrik mesajı gönderir ve rolleri günceller."""
-        await self._update_level_roles(member, new_level)
-        
-        channel_id = self.config.get("congratulations_channel_id")
-        channel = self.bot.get_channel(channel_id) if channel_id else member.guild.system_channel
-        
-        if channel and channel.permissions_for(member.guild.me).send_messages:
-            embed = discord.Embed(
+        if len(level_ups) == 1:
+            member, new_level, total_xp = level_ups[0]
+            embeds = [discord.Embed(
                 title="🎉 Seviye Atladın!",
                 description=f"Tebrikler {member.mention}, **{new_level}** seviyesine ulaştın!",
                 color=discord.Color.gold()
-            ).set_thumbnail(url=member.display_avatar.url).set_footer(text=f"Yeni Toplam XP: {total_xp}")
-            await channel.send(embed=embed)
+            ).set_thumbnail(url=member.display_avatar.url).set_footer(text=f"Yeni Toplam XP: {total_xp}")]
+        else:
+            embeds = self._level_up_digest(guild, level_ups, settings.level_up_digest_limit)
+
+        try:
+            await channel.send(embeds=embeds)
+        except discord.HTTPException as e:
+            self.logger.warning(f"{guild.name} sunucusuna seviye atlama tebriği gönderilemedi: {e}")
+
+    @staticmethod
+    def _level_up_digest(guild: discord.Guild, level_ups: List[Tuple[discord.Member, int, int]], limit: int) -> List[discord.Embed]:
+        """En yüksek seviyeler başta olmak üzere en fazla `limit` üyeyi listeleyen özet embed'leri."""
+        ordered = sorted(level_ups, key=lambda entry: (-entry[1], -entry[2]))
+        shown = ordered[:min(limit, DIGEST_LINES_PER_EMBED * MAX_DIGEST_EMBEDS)]
+        lines = [f"{member.mention} → **{level}**. seviye" for member, level, _ in shown]
+
+        embeds = []
+        for start in range(0, len(lines), DIGEST_LINES_PER_EMBED):
+            embeds.append(discord.Embed(
+                description="\n".join(lines[start:start + DIGEST_LINES_PER_EMBED]),
+                color=discord.Color.gold()
+            ))
+        embeds[0].title = f"🎉 {len(level_ups)} Üye Seviye Atladı!"
+        if guild.icon:
+            embeds[0].set_thumbnail(url=guild.icon.url)
+        if len(ordered) > len(shown):
+            embeds[-1].set_footer(text=f"...ve {len(ordered) - len(shown)} üye daha. Tebrikler!")
+        return embeds
 
     async def _update_level_roles(self, member: discord.Member, level: int):
         """Kullanıcının seviyesine göre rollerini ekler veya kaldırır."""
         guild = member.guild
-        level_roles = self.config.get("level_roles", {})
-        stack_roles = self.config.get("stack_roles", False)
-        
-        roles_to_add = []
-        roles_to_remove = []
-        highest_role_reached = None
-
-        for level_str, role_id_str in sorted(level_roles.items(), key=lambda x: int(x[0])):
-            level_threshold = int(level_str)
-            role_id = int(role_id_str)
-            role = guild.get_role(role_id)
-
-            if not role or role.position >= guild.me.top_role.position:
-                continue
+        settings = await self.bot.guild_settings.get(guild.id)
+        # Plan aynı ayarlar için önbellekten gelir; üyenin rolleri hedef kümeyle tek geçişte karşılaştırılır
+        plan = guild_role_plan(guild, settings.level_roles, settings.stack_roles)
+        add_ids, remove_ids = plan.diff((role.id for role in member.roles), level)
+
+        if add_ids or remove_ids:
+            # Toplu seviye atlamalarında da hız sınırına takılmamak için değişiklikler aynı jeton kovasından geçer
+            await self.role_pacer.apply(
+                member, map(guild.get_role, add_ids), map(guild.get_role, remove_ids), reason=f"{level}. seviyeye ulaşıldı."
+            )
 
-            has_role = role in member.roles
-            
-            if level >= level_threshold:
-                highest_role_reached = role
-                if not has_role:
-                    roles_to_add.append(role)
-            elif has_role:
-                roles_to_remove.append(role)
-        
-        if not stack_roles and highest_role_reached:
-            for level_str, role_id_str in level_roles.items():
-                role_id = int(role_id_str)
-                role = guild.get_role(role_id)
-                if role and role != highest_role_reached and role in member.roles:
-                    roles_to_remove.append(role)
-
-        if roles_to_add:
-            await member.add_roles(*roles_to_add, reason=f"{level}. seviyeye ulaşıldı.")
-        if roles_to_remove:
-            await member.remove_roles(*roles_to_remove, reason="Seviye rolü güncellendi.")
-
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
+    async def on_pipeline_message(self, ctx: MessageContext):
         """Her mesajda XP'yi veritabanı yerine önbelleğe ekler."""
-        if not message.guild or message.author.bot or message.channel.id in self.config.get("blacklisted_channels", []):
-            return
-            
-        prefix = await self.bot.get_prefix(message)
-        if message.content.startswith(tuple(prefix) if isinstance(prefix, list) else prefix):
+        # Bot/DM kontrolü ve prefix çözümlemesi mesaj hattında bir kez yapılmıştır
+        if ctx.is_command or ctx.xp_blacklisted:
             return
 
+        message = ctx.message
         user_id = message.author.id
         guild_id = message.guild.id
         current_time = asyncio.get_event_loop().time()
-        cooldown = self.config.get("xp_cooldown_seconds", 60)
+        settings = ctx.settings  # Sunucunun XP aralığı ve bekleme süresi
         
-        if current_time - self.cooldowns.get(user_id, 0) > cooldown:
-            self.cooldowns[user_id] = current_time
-            xp_range = self.config.get("xp_range", {"min": 5, "max": 10})
-            xp_to_add = random.randint(xp_range['min'], xp_range['max'])
+        if self.cooldowns.try_acquire(guild_id, user_id, settings.cooldown_seconds, current_time):
+            xp_to_add = random.randint(settings.xp_min, settings.xp_max)
             
             if guild_id not in self.xp_cache:
                 self.xp_cache[guild_id] = {}
             if user_id not in self.xp_cache[guild_id]:
                 self.xp_cache[guild_id][user_id] = 0
             self.xp_cache[guild_id][user_id] += xp_to_add
+            self.journal.append(guild_id, user_id, xp_to_add)
 
     # --- KULLANICI KOMUTLARI ---
     @commands.command(name="seviye", aliases=["level", "rank"])
@@ -243,19 +556,31 @@ class LevelingCog(commands.Cog):
         """Bir üyenin seviye, XP ve sunucu sıralamasını gösterir."""
         target = member or ctx.author
         
-        async with self.db_pool.acquire() as conn:
-            user_data = await conn.fetchrow("SELECT level, xp, total_xp FROM users WHERE user_id = $1 AND guild_id = $2", target.id, ctx.guild.id)
-            if not user_data:
-                await ctx.send(f"{target.display_name} kullanıcısının henüz bir seviye verisi yok.")
+        # Toplam XP ve sıra bellek içi sıralamadan okunur; sunucu yüklendikten sonra veritabanına gidilmez
+        ranking = await self.ranks.get(ctx.guild.id)
+        total_xp = ranking.total(target.id)
+        if total_xp is None:
+            await ctx.send(f"{target.display_name} kullanıcısının henüz bir seviye verisi yok.")
+            return
+        rank = ranking.rank(total_xp)
+        top_percent = max(100 - ranking.percentile(total_xp), 100 / len(ranking))
+
+        # Seviye ve ilerleme sunucunun eğrisine göre toplam XP'den türetilir
+        settings = await self.bot.guild_settings.get(ctx.guild.id)
+        level, xp, xp_needed = settings.curve.progress(total_xp)
+
+        if settings.rank_card and self.rank_cards.available:
+            try:
+                image = await self.rank_cards.render(target, level, xp / xp_needed, rank)
+            except Exception as e:
+                self.logger.error(f"Seviye kartı çizilemedi, metin kartı gönderiliyor: {e}")
+            else:
+                # Kart ilerlemeyi %1 adımlarla gösterir; kesin sayılar altbilgide
+                embed = discord.Embed(color=discord.Color.gold()).set_image(url="attachment://seviye.png")
+                embed.set_footer(text=f"{xp} / {xp_needed} XP • Toplam {total_xp} XP • Üst %{top_percent:.1f}")
+                await ctx.send(embed=embed, file=discord.File(io.BytesIO(image), filename="seviye.png"))
                 return
-            
-            level, xp, total_xp = user_data['level'], user_data['xp'], user_data['total_xp']
-            rank = await conn.fetchval(
-                "SELECT COUNT(*) + 1 FROM users WHERE guild_id = $1 AND total_xp > $2",
-                ctx.guild.id, total_xp
-            ) or 1
 
-        xp_needed = self._calculate_xp_for_level(level + 1)
         progress = (xp / xp_needed) * 100
         progress_bar = f"[{'█' * int(progress / 5)}{'─' * (20 - int(progress / 5))}]"
 
@@ -264,7 +589,7 @@ class LevelingCog(commands.Cog):
             color=discord.Color.gold()
         )
         embed.set_thumbnail(url=target.display_avatar.url)
-        embed.add_field(name="Sıralama", value=f"#{rank}", inline=True)
+        embed.add_field(name="Sıralama", value=f"#{rank} / {len(ranking)}\nÜst %{top_percent:.1f}", inline=True)
         embed.add_field(name="Seviye", value=str(level), inline=True)
         embed.add_field(name="Toplam XP", value=str(total_xp), inline=True)
         embed.add_field(
@@ -275,34 +600,94 @@ class LevelingCog(commands.Cog):
         await ctx.send(embed=embed)
 
     @commands.command(name="lider", aliases=["leaderboard", "top"])
-    async def leaderboard(self, ctx: commands.Context):
-        """Sunucudaki en yüksek XP'ye sahip kullanıcıları listeler."""
-        async with self.db_pool.acquire() as conn:
-            top_users = await conn.fetch(
-                "SELECT user_id, level, total_xp FROM users WHERE guild_id = $1 ORDER BY total_xp DESC LIMIT 10",
-                ctx.guild.id
-            )
+    async def leaderboard(self, ctx: commands.Context, donem: str = None, sayfa: int = 1):
+        """Sunucudaki en yüksek XP'ye sahip kullanıcıları (tüm zamanlar, haftalık veya aylık) sayfa sayfa listeler."""
+        if donem is not None:
+            if donem.isdigit():  # `lider 3`: tüm zamanlar tablosunun 3. sayfası
+                sayfa = int(donem)
+            elif donem.lower() in PERIOD_ALIASES:
+                await self.period_leaderboard(ctx, PERIOD_ALIASES[donem.lower()], sayfa)
+                return
+            else:
+                await ctx.send(f"❌ Geçersiz dönem. Kullanım: `{ctx.clean_prefix}lider [haftalık|aylık] [sayfa]`")
+                return
 
-        if not top_users:
+        # Tablo, her XP boşaltmasında güncellenen bellek içi sıralamadan okunur
+        ranking = await self.ranks.get(ctx.guild.id)
+        if not len(ranking):
             await ctx.send("Bu sunucuda henüz kimse sıralamaya girmemiş.")
             return
 
+        keys = ranking.page_at((max(sayfa, 1) - 1) * LEADERBOARD_PAGE_SIZE, LEADERBOARD_PAGE_SIZE)
+        view = LeaderboardView(self, ctx, keys)
+        embed = await self.leaderboard_embed(ctx.guild, ranking, keys, highlight=ctx.author.id)
+        view.message = await ctx.send(embed=embed, view=view)
+
+    async def period_leaderboard(self, ctx: commands.Context, period: str, sayfa: int = 1):
+        """Bu hafta/ay en çok XP kazananları özet tablolarından listeler (ham günlük kovalara dokunmaz)."""
+        table, column, title, period_start = LEADERBOARD_PERIODS[period]
+        start = period_start(datetime.now(XP_HISTORY_TZ).date())
+        offset = (max(sayfa, 1) - 1) * LEADERBOARD_PAGE_SIZE
+        # Sıra ve üye sayısı yalnızca bu sunucunun bu dönemine ait özet satırlarından hesaplanır
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT user_id, xp, rank, members FROM (
+                    SELECT user_id, xp, RANK() OVER (ORDER BY xp DESC) AS rank, COUNT(*) OVER () AS members
+                    FROM {table} WHERE guild_id = $1 AND {column} = $2
+                ) ranked
+                ORDER BY rank, user_id LIMIT $3 OFFSET $4
+                """,
+                ctx.guild.id, start, LEADERBOARD_PAGE_SIZE, offset
+            )
+        if not rows:
+            await ctx.send(f"Bu dönemde{' bu sayfada' if offset else ''} henüz kimse XP kazanmamış.")
+            return
+
+        members = await self.bot.member_resolver.resolve(ctx.guild, [row['user_id'] for row in rows])
+        description = []
+        for row in rows:
+            member = members.get(row['user_id'])
+            display_name = member.display_name if member else f"Bilinmeyen Üye (ID: {row['user_id']})"
+            line = f"**{row['rank']}.** {display_name} - **{row['xp']} XP**"
+            description.append(f"__{line}__" if row['user_id'] == ctx.author.id else line)
+
+        total = rows[0]['members']
         embed = discord.Embed(
-            title=f"🏆 {ctx.guild.name} Liderlik Tablosu",
+            title=f"🏆 {ctx.guild.name} {title} Liderlik Tablosu",
+            description="\n".join(description),
             color=discord.Color.gold()
         )
-        
-        description = []
-        for i, user_data in enumerate(top_users, 1):
-            member = ctx.guild.get_member(user_data['user_id'])
-            display_name = member.display_name if member else f"Bilinmeyen Üye (ID: {user_data['user_id']})"
-            description.append(
-                f"**{i}.** {display_name} - **Seviye {user_data['level']}** ({user_data['total_xp']} XP)"
-            )
-        
-        embed.description = "\n".join(description)
+        embed.set_footer(
+            text=f"Sayfa {offset // LEADERBOARD_PAGE_SIZE + 1}/{(total - 1) // LEADERBOARD_PAGE_SIZE + 1} • "
+                 f"{total} üye • {start:%d.%m.%Y} itibarıyla • Birkaç dakika gecikmeli güncellenir"
+        )
         await ctx.send(embed=embed)
 
+    async def leaderboard_embed(self, guild: discord.Guild, ranking, keys: List[Tuple[int, int]], highlight: int = None) -> discord.Embed:
+        """Bir liderlik sayfasının embed'ini oluşturur; sıralar eşit XP'de paylaşılır."""
+        embed = discord.Embed(
+            title=f"🏆 {guild.name} Liderlik Tablosu",
+            color=discord.Color.gold()
+        )
+
+        members = await self.bot.member_resolver.resolve(guild, [user_id for _, user_id in keys])
+        curve = (await self.bot.guild_settings.get(guild.id)).curve
+        levels = curve.levels_for(-negative_total for negative_total, _ in keys)
+        description = []
+        for (negative_total, user_id), level in zip(keys, levels):
+            member = members.get(user_id)
+            display_name = member.display_name if member else f"Bilinmeyen Üye (ID: {user_id})"
+            line = f"**{ranking.rank(-negative_total)}.** {display_name} - **Seviye {level}** ({-negative_total} XP)"
+            description.append(f"__{line}__" if user_id == highlight else line)
+
+        embed.description = "\n".join(description) or "Bu sayfada kimse yok."
+        if keys:
+            page = ranking.position(keys[0]) // LEADERBOARD_PAGE_SIZE + 1
+            pages = (len(ranking) - 1) // LEADERBOARD_PAGE_SIZE + 1
+            embed.set_footer(text=f"Sayfa {page}/{pages} • {len(ranking)} üye")
+        return embed
+
     @commands.command(name="seviyesifirla", aliases=["levelreset"])
     @commands.has_permissions(manage_guild=True)
     async def reset_level(self, ctx: commands.Context, member: discord.Member):
@@ -312,6 +697,10 @@ class LevelingCog(commands.Cog):
                 "UPDATE users SET level = 0, xp = 0, total_xp = 0 WHERE user_id = $1 AND guild_id = $2",
                 member.id, ctx.guild.id
             )
+            # Dönemlik tablolar da sıfırlanan üyeyi göstermesin
+            for table in ("xp_daily", "xp_weekly", "xp_monthly"):
+                await conn.execute(f"DELETE FROM {table} WHERE guild_id = $1 AND user_id = $2", ctx.guild.id, member.id)
+        self.ranks.set(ctx.guild.id, member.id, 0)
         
         await self._update_level_roles(member, 0)
         await ctx.send(f"✅ {member.mention} kullanıcısının tüm seviye verileri sıfırlandı.")
@@ -319,63 +708,240 @@ class LevelingCog(commands.Cog):
 
     # --- YÖNETİCİ KOMUT GRUBU ---
     @commands.group(name="seviyeayar", aliases=["levelsettings"], invoke_without_command=True)
+    @commands.guild_only()
     @commands.has_permissions(manage_guild=True)
     async def level_settings(self, ctx: commands.Context):
         """Seviye sistemi ayarlarını yönetmek için ana komut."""
+        settings = await self.bot.guild_settings.get(ctx.guild.id)
         embed = discord.Embed(
             title="Seviye Sistemi Ayarları",
             description="Aşağıdaki alt komutları kullanarak seviye sistemini yapılandırabilirsiniz:",
             color=discord.Color.gold()
         )
+        roles = "\n".join(f"Seviye {level}: <@&{role_id}>" for level, role_id in settings.level_roles) or "Ayarlanmamış"
+        channels = " ".join(f"<#{channel_id}>" for channel_id in sorted(settings.blacklisted_channels)) or "Yok"
+        embed.add_field(name="Seviye Rolleri", value=roles[:1024], inline=True)
+        embed.add_field(name="Rol Yığınlama", value="Açık" if settings.stack_roles else "Kapalı", inline=True)
+        embed.add_field(name="XP Kapalı Kanallar", value=channels[:1024], inline=False)
         embed.add_field(name=f"`{ctx.prefix}seviyeayar rolver <seviye> <@rol>`", value="Seviye ödül rolü belirler.", inline=False)
         embed.add_field(name=f"`{ctx.prefix}seviyeayar rolkaldir <seviye>`", value="Bir seviye ödül rolünü kaldırır.", inline=False)
         embed.add_field(name=f"`{ctx.prefix}seviyeayar rolyiginla <ac/kapat>`", value="Seviye rolleri yığılsın mı yoksa sadece en yükseği mi kalsın.", inline=False)
+        embed.add_field(name=f"`{ctx.prefix}seviyeayar rolsenkron [iptal]`", value="Tüm üyelerin seviye rollerini yeniden eşitler veya ilerlemeyi gösterir.", inline=False)
         embed.add_field(name=f"`{ctx.prefix}seviyeayar kanalkapat <#kanal>`", value="Bir kanalda XP kazanımını kapatır.", inline=False)
         embed.add_field(name=f"`{ctx.prefix}seviyeayar kanalac <#kanal>`", value="Bir kanalda XP kazanımını açar.", inline=False)
+        embed.add_field(name=f"`{ctx.prefix}seviyeayar egri [ad]`", value="Sunucunun seviye eğrisini gösterir veya değiştirir.", inline=False)
+        embed.add_field(name=f"`{ctx.prefix}seviyeayar kart <ac/kapat>`", value="`seviye` komutunun görsel kartla yanıt vermesini açar veya kapatır.", inline=False)
         await ctx.send(embed=embed)
 
     @level_settings.command(name="rolver")
+    @commands.guild_only()
     @commands.has_permissions(manage_guild=True)
     async def set_level_role(self, ctx: commands.Context, level: int, role: discord.Role):
         if role.position >= ctx.guild.me.top_role.position:
             await ctx.send(f"❌ '{role.name}' rolünü yönetemem. Lütfen botun rolünü bu rolün üzerine taşıyın.")
             return
-        self.config["level_roles"][str(level)] = role.id
-        self._save_config()
+        async with self._settings_lock(ctx.guild.id):
+            # Sunucunun özel ayarı yoksa genel roller başlangıç noktası olur
+            level_roles = dict((await self.bot.guild_settings.get(ctx.guild.id)).level_roles)
+            level_roles[level] = role.id
+            await self.bot.guild_settings.update(ctx.guild.id, level_roles=tuple(sorted(level_roles.items())))
         await ctx.send(f"✅ Seviye **{level}** için ödül rolü **{role.name}** olarak ayarlandı.")
+        await self._start_role_sync(ctx)
 
     @level_settings.command(name="rolkaldir")
+    @commands.guild_only()
     @commands.has_permissions(manage_guild=True)
     async def remove_level_role(self, ctx: commands.Context, level: int):
-        if str(level) in self.config["level_roles"]:
-            del self.config["level_roles"][str(level)]
-            self._save_config()
-            await ctx.send(f"✅ Seviye **{level}** için ayarlanmış ödül rolü kaldırıldı.")
-        else:
-            await ctx.send(f"❌ Bu seviye için zaten bir ödül rolü ayarlanmamış.")
+        async with self._settings_lock(ctx.guild.id):
+            level_roles = dict((await self.bot.guild_settings.get(ctx.guild.id)).level_roles)
+            if level not in level_roles:
+                await ctx.send(f"❌ Bu seviye için zaten bir ödül rolü ayarlanmamış.")
+                return
+            del level_roles[level]
+            await self.bot.guild_settings.update(ctx.guild.id, level_roles=tuple(sorted(level_roles.items())))
+        await ctx.send(f"✅ Seviye **{level}** için ayarlanmış ödül rolü kaldırıldı.")
+        await self._start_role_sync(ctx)
 
     @level_settings.command(name="rolyiginla")
+    @commands.guild_only()
     @commands.has_permissions(manage_guild=True)
     async def set_role_stacking(self, ctx: commands.Context, durum: str):
         durum = durum.lower()
         if durum in ["aç", "ac", "on", "true", "evet"]:
-            self.config["stack_roles"] = True
-            self._save_config()
+            await self.bot.guild_settings.update(ctx.guild.id, stack_roles=True)
             await ctx.send("✅ Rol yığınlama **aktif**. Kullanıcılar kazandıkları tüm seviye rollerini koruyacak.")
         elif durum in ["kapat", "off", "false", "hayir"]:
-            self.config["stack_roles"] = False
-            self._save_config()
+            await self.bot.guild_settings.update(ctx.guild.id, stack_roles=False)
             await ctx.send("✅ Rol yığınlama **devre dışı**. Kullanıcılar sadece ulaştıkları en yüksek seviye rolünü taşıyacak.")
         else:
             await ctx.send("❌ Geçersiz durum. Lütfen `ac` veya `kapat` kullanın.")
+            return
+        await self._start_role_sync(ctx)
+
+    @level_settings.command(name="rolsenkron", aliases=["rolsync"])
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def sync_level_roles(self, ctx: commands.Context, islem: str = None):
+        """Tüm üyelerin seviye rollerini yeniden eşitler; çalışan bir iş varsa ilerlemesini gösterir."""
+        if islem and islem.lower() in ["iptal", "durdur", "cancel"]:
+            if not self.role_sync.is_running(ctx.guild.id):
+                await ctx.send("❌ Çalışan bir rol senkronizasyonu yok.")
+                return
+            await self.role_sync.cancel(ctx.guild.id)
+            await ctx.send("✅ Rol senkronizasyonu durduruldu.")
+            return
+        if self.role_sync.is_running(ctx.guild.id):
+            await ctx.send(self._role_sync_status(self.role_sync.progress(ctx.guild.id)))
+            return
+        await self._start_role_sync(ctx)
+
+    async def _start_role_sync(self, ctx: commands.Context):
+        """Seviye rolleri değişince mevcut üyeler arka planda yeni ayarlara göre eşitlenir."""
+        if not (await self.bot.guild_settings.get(ctx.guild.id)).level_roles:
+            return
+        progress = await self.role_sync.start(ctx.guild)
+        await ctx.send(
+            f"🔄 {progress.total} üyenin seviye rolleri arka planda eşitleniyor. "
+            f"İlerleme için `{ctx.prefix}seviyeayar rolsenkron` yazabilirsiniz."
+        )
+        self.logger.info(f"{ctx.author.display_name}, {ctx.guild.name} sunucusunda rol senkronizasyonu başlattı.")
+
+    @staticmethod
+    def _role_sync_status(progress) -> str:
+        return (
+            f"🔄 Rol senkronizasyonu sürüyor: **%{progress.percent:.0f}** "
+            f"({progress.processed}/{progress.total} üye, {progress.changed} güncellendi, {progress.failed} hata)."
+        )
+
+    @level_settings.command(name="kanalkapat")
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def disable_channel_xp(self, ctx: commands.Context, kanal: discord.TextChannel):
+        """Bir kanalda XP kazanımını kapatır."""
+        async with self._settings_lock(ctx.guild.id):
+            blacklisted = (await self.bot.guild_settings.get(ctx.guild.id)).blacklisted_channels
+            if kanal.id in blacklisted:
+                await ctx.send(f"❌ {kanal.mention} kanalında XP kazanımı zaten kapalı.")
+                return
+            await self.bot.guild_settings.update(ctx.guild.id, blacklisted_channels=blacklisted | {kanal.id})
+        await ctx.send(f"✅ {kanal.mention} kanalında XP kazanımı **kapatıldı**.")
+
+    @level_settings.command(name="kanalac", aliases=["kanalaç"])
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def enable_channel_xp(self, ctx: commands.Context, kanal: discord.TextChannel):
+        """Bir kanalda XP kazanımını yeniden açar."""
+        async with self._settings_lock(ctx.guild.id):
+            blacklisted = (await self.bot.guild_settings.get(ctx.guild.id)).blacklisted_channels
+            if kanal.id not in blacklisted:
+                await ctx.send(f"❌ {kanal.mention} kanalında XP kazanımı zaten açık.")
+                return
+            await self.bot.guild_settings.update(ctx.guild.id, blacklisted_channels=blacklisted - {kanal.id})
+        await ctx.send(f"✅ {kanal.mention} kanalında XP kazanımı **açıldı**.")
+
+    @level_settings.command(name="egri", aliases=["eğri", "curve"])
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def set_level_curve(self, ctx: commands.Context, ad: str = None):
+        """Sunucunun seviye eğrisini değiştirir ve tüm seviyeleri toplam XP'den yeniden hesaplar."""
+        current = (await self.bot.guild_settings.get(ctx.guild.id)).curve
+        if ad is None:
+            lines = [
+                f"{'▶️' if curve.name == current.name else '▫️'} `{curve.name}` - {curve.description} "
+                f"(Seviye 10: {curve.cumulative(10)} XP)"
+                for curve in CURVES.values()
+            ]
+            await ctx.send("**Seviye Eğrileri**\n" + "\n".join(lines))
+            return
+
+        curve = CURVES.get(ad.lower())
+        if not curve:
+            await ctx.send(f"❌ Bilinmeyen eğri. Geçerli eğriler: {', '.join(CURVES)}")
+            return
+        # Bekleyen XP önce eski eğriyle yazılır; ardından tüm satırlar yeni eğriyle yeniden türetilir
+        await self.flush_xp_cache_to_db()
+        await self.bot.guild_settings.update(ctx.guild.id, level_curve=curve.name)
+        updated = await self.recalculate_levels(ctx.guild.id, curve)
+        await ctx.send(f"✅ Seviye eğrisi **{curve.name}** olarak ayarlandı, {updated} üyenin seviyesi yeniden hesaplandı.")
+        self.logger.info(f"{ctx.author.display_name}, {ctx.guild.name} sunucusunun seviye eğrisini {curve.name} yaptı.")
+        # Seviyeler değiştiği için üyelerin hedef rolleri de değişti
+        await self._start_role_sync(ctx)
+
+    @level_settings.command(name="kart", aliases=["card"])
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def set_rank_card(self, ctx: commands.Context, durum: str):
+        """`seviye` komutunun görsel seviye kartıyla yanıt verip vermeyeceğini ayarlar."""
+        durum = durum.lower()
+        if durum in ["aç", "ac", "on", "true", "evet"]:
+            await self.bot.guild_settings.update(ctx.guild.id, rank_card=True)
+            if not self.rank_cards.available:
+                await ctx.send("⚠️ Seviye kartı açıldı ancak botta Pillow yüklü değil; yüklenene kadar metin kartı kullanılacak.")
+                return
+            await ctx.send("✅ Seviye kartı **aktif**. `seviye` komutu artık görsel kartla yanıt verecek.")
+        elif durum in ["kapat", "off", "false", "hayir"]:
+            await self.bot.guild_settings.update(ctx.guild.id, rank_card=False)
+            await ctx.send("✅ Seviye kartı **devre dışı**. `seviye` komutu metin kartıyla yanıt verecek.")
+        else:
+            await ctx.send("❌ Geçersiz durum. Lütfen `ac` veya `kapat` kullanın.")
+
+    async def recalculate_levels(self, guild_id: int, curve: LevelCurve) -> int:
+        """Bir sunucunun level/xp sütunlarını total_xp'den tek bir UPDATE ile yeniden türetir."""
+        async with self.db_pool.acquire() as conn:
+            status = await conn.execute(RECALCULATE_LEVELS_QUERY, guild_id, list(curve.thresholds))
+        return int(status.split()[-1]) if status else 0
+
+    async def cog_load(self):
+        # XP kapalı kanallar mesaj hattında sunucu ayarlarından kontrol edilir
+        self.bot.message_pipeline.subscribe(self.on_pipeline_message)
+        self.role_updates.start()
 
     async def cog_unload(self):
-        """Cog kapatıldığında önbelleği veritabanına yaz ve bağlantıyı kapat."""
+        """Cog kapatıldığında önbelleği veritabanına yaz. Havuz bota aittir, burada kapatılmaz."""
+        self.bot.message_pipeline.unsubscribe(self.on_pipeline_message)
         self.flush_xp_cache_to_db.cancel()
+        self.compact_xp_history.cancel()
+        await self.flush_xp_cache_to_db()
+        await self.journal.stop()
+        await self.role_updates.stop()
+        self.rank_cards.close()
+        if self.role_sync:
+            # İşler 'running' olarak kalır; bir sonraki açılışta kaldıkları yerden sürer
+            await self.role_sync.stop()
+        self.logger.info("LevelingCog kaldırıldı, XP önbelleği veritabanına yazıldı.")
+
+    # --- Sıcak Yeniden Başlatma ---
+    async def snapshot_state(self) -> dict:
+        """XP önbelleğini boşaltır ve bekleme sürelerini anlık görüntüye verir."""
         await self.flush_xp_cache_to_db()
-        if self.db_pool:
-            await self.db_pool.close()
-            self.logger.info("LevelingCog kaldırıldı, PostgreSQL bağlantısı kapatıldı.")
+        # Yazılamayan XP anlık görüntüye konmaz; günlükte durur ve yeni süreç açılışta geri oynatır
+        await self.journal.sync()
+
+        # Döngü saati süreçten sürece değiştiği için bekleme süreleri duvar saatine çevrilir
+        loop_now = asyncio.get_event_loop().time()
+        wall_now = time.time()
+        cooldowns = [
+            [guild_id, user_id, wall_now + (expires_at - loop_now)]
+            for guild_id, user_id, expires_at in self.cooldowns.items(loop_now)
+        ]
+        return {"cooldown_expiries": cooldowns}
+
+    async def restore_state(self, state: dict):
+        loop_now = asyncio.get_event_loop().time()
+        wall_now = time.time()
+        for guild_id, user_id, wall_expiry in state.get("cooldown_expiries", []):
+            self.cooldowns.restore(guild_id, user_id, loop_now + (wall_expiry - wall_now))
+        # Eski biçim: son XP zamanı; bitiş anı sunucunun bekleme süresinden hesaplanır
+        for guild_id, user_id, wall_last in state.get("cooldowns", []):
+            cooldown = self.bot.guild_settings.cached(guild_id).cooldown_seconds
+            self.cooldowns.restore(guild_id, user_id, loop_now - (wall_now - wall_last) + cooldown)
+        # Eski biçim: günlükten önceki anlık görüntüler bekleyen XP'yi kendisi taşırdı
+        for guild_id, user_id, xp in state.get("pending_xp", []):
+            guild_cache = self.xp_cache.setdefault(guild_id, {})
+            guild_cache[user_id] = guild_cache.get(user_id, 0) + xp
+            self.journal.append(guild_id, user_id, xp)
+        restored = len(state.get('cooldown_expiries', [])) + len(state.get('cooldowns', []))
+        self.logger.info(f"{restored} bekleme süresi ve {len(state.get('pending_xp', []))} bekleyen XP kaydı geri yüklendi.")
 
 async def setup(bot: commands.Bot):
     """Bot'a LevelingCog'u ekler."""
@@ -0,0 +1,52 @@
+# commands/Owner/config.py
+import datetime
+
+import discord
+from discord.ext import commands
+
+from utils.config import ConfigError
+
+class ConfigCog(commands.Cog, name="Yapılandırma (Sahip)"): # Yardım komutunun tanıması için Cog adı
+    """config.json ve leveling_config.json'ı yeniden başlatmadan yenileyen komutlar (Sadece Sahip)."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @commands.command(name="ayaryenile", aliases=["configreload", "reloadconfig"])
+    @commands.is_owner() # Sadece sahip kullanabilir
+    async def reload_config(self, ctx: commands.Context):
+        """Yapılandırma dosyalarını yeniden okur ve ayarları yeniden başlatmadan uygular (Sadece Sahip)."""
+        try:
+            settings = await self.bot.config_manager.reload()
+        except ConfigError as e:
+            await ctx.send(f"❌ Yapılandırma yenilenemedi, mevcut ayarlar korunuyor: {e}")
+            return
+
+        embed = discord.Embed(
+            title="🔄 Yapılandırma Yenilendi",
+            color=discord.Color.orange() if settings.problems else discord.Color.green(),
+            timestamp=datetime.datetime.fromtimestamp(settings.loaded_at, datetime.timezone.utc)
+        )
+        embed.add_field(name="Prefix", value=f"`{settings.bot.prefix}`", inline=True)
+        embed.add_field(name="Seviye Rolü", value=str(len(settings.leveling.level_roles)), inline=True)
+        embed.add_field(name="XP Kapalı Kanal", value=str(len(settings.leveling.blacklisted_channels)), inline=True)
+        if settings.problems:
+            problems = "\n".join(f"• {problem}" for problem in settings.problems[:10])
+            if len(settings.problems) > 10:
+                problems += f"\n... ve {len(settings.problems) - 10} uyarı daha"
+            embed.add_field(name="⚠️ Varsayılana Düşülen Alanlar", value=problems[:1024], inline=False)
+        embed.set_footer(text="Log kanalı değişikliği yeniden başlatmada geçerli olur.")
+        await ctx.send(embed=embed)
+        print(f"Yapılandırma {ctx.author} tarafından yenilendi ({len(settings.problems)} uyarı).") # logger yerine print
+
+    # Komut hatası yakalama
+    @reload_config.error
+    async def reload_config_error(self, ctx: commands.Context, error):
+        if isinstance(error, commands.NotOwner):
+            await ctx.send("❌ Bu komutu sadece bot sahibi kullanabilir!")
+        else:
+            print(f"[HATA] 'ayaryenile' komutunda beklenmedik hata: {error}") # logger yerine print
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(ConfigCog(bot))
+    print("✅ Owner/Config Cog yüklendi!")
@@ -0,0 +1,181 @@
+# commands/Owner/metrics.py
+import datetime
+
+import discord
+from discord.ext import commands
+
+from utils.loop_monitor import loop_implementation
+from utils.members import process_rss_bytes
+
+class MetricsCog(commands.Cog, name="İstatistikler (Sahip)"): # Yardım komutunun tanıması için Cog adı
+    """Botun iç önbellek ve performans istatistiklerini gösteren komutlar (Sadece Sahip)."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @commands.command(name="önbellek", aliases=["onbellek", "cache"])
+    @commands.is_owner() # Sadece sahip kullanabilir
+    async def cache_stats(self, ctx: commands.Context):
+        """Sunucu ayarları önbelleğinin isabet/ıskalama sayaçlarını gösterir (Sadece Sahip)."""
+        stats = self.bot.guild_settings.stats()
+        total = stats["hits"] + stats["misses"]
+        hit_rate = (stats["hits"] / total * 100) if total else 0.0
+
+        embed = discord.Embed(title="🗃️ Önbellek İstatistikleri", color=discord.Color.blurple())
+        embed.add_field(
+            name="Sunucu Ayarları Önbelleği",
+            value=(
+                f"İsabet: **{stats['hits']}**\n"
+                f"Iskalama: **{stats['misses']}**\n"
+                f"İsabet Oranı: **%{hit_rate:.2f}**\n"
+                f"Geçersiz Kılma: **{stats['invalidations']}**\n"
+                f"Yazım: **{stats['writes']}**\n"
+                f"Özel Ayarlı Sunucu: **{stats['cached_guilds']}**"
+            ),
+            inline=False
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name="veritabanı", aliases=["veritabani", "db"])
+    @commands.is_owner() # Sadece sahip kullanabilir
+    async def db_stats(self, ctx: commands.Context):
+        """Merkezi veritabanı havuzunun boyut ve bekleme metriklerini gösterir (Sadece Sahip)."""
+        if not self.bot.db:
+            await ctx.send("❌ Merkezi veritabanı havuzu hazır değil.")
+            return
+        stats = self.bot.db.stats()
+
+        embed = discord.Embed(title="🐘 Veritabanı Havuzu", color=discord.Color.blurple())
+        embed.add_field(
+            name="Havuz",
+            value=(
+                f"Boyut: **{stats['size']}** (min {stats['min_size']} / max {stats['max_size']})\n"
+                f"Kullanımda: **{stats['in_use']}**\n"
+                f"Boşta: **{stats['idle']}**"
+            ),
+            inline=True
+        )
+        embed.add_field(
+            name="Bağlantı Bekleme",
+            value=(
+                f"Toplam Ödünç: **{stats['acquisitions']}**\n"
+                f"Çekişmeli: **{stats['contended_acquisitions']}**\n"
+                f"Zaman Aşımı: **{stats['acquire_timeouts']}**\n"
+                f"Ortalama: **{stats['avg_wait_ms']:.2f}ms**\n"
+                f"En Yüksek: **{stats['max_wait_ms']:.2f}ms**"
+            ),
+            inline=True
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name="komutstat", aliases=["komutistatistik", "cmdstats"])
+    @commands.is_owner() # Sadece sahip kullanabilir
+    async def command_stats(self, ctx: commands.Context):
+        """Komut başına çağrı sayısı ve p50/p95/p99 gecikmelerini gösterir (Sadece Sahip)."""
+        rows = sorted(self.bot.metrics.commands.items(), key=lambda item: item[1].latency.count, reverse=True)
+        if not rows:
+            await ctx.send("ℹ️ Henüz hiç komut çalıştırılmadı.")
+            return
+
+        lines = [f"{'Komut':<20} {'Adet':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'Hata':>5} {'Eşz.':>4}"]
+        for name, stats in rows[:20]:
+            hist = stats.latency
+            lines.append(
+                f"{name[:20]:<20} {hist.count:>6} "
+                f"{hist.quantile(0.50) * 1000:>6.0f}ms {hist.quantile(0.95) * 1000:>6.0f}ms {hist.quantile(0.99) * 1000:>6.0f}ms "
+                f"{sum(stats.errors.values()):>5} {stats.max_in_flight:>4}"
+            )
+        embed = discord.Embed(
+            title="⏱️ Komut Gecikmeleri",
+            description="```\n" + "\n".join(lines) + "\n```",
+            color=discord.Color.blurple()
+        )
+        embed.set_footer(text="Yüzdelikler histogram kovalarından tahmin edilir. Eşz. = en yüksek eşzamanlı çalışma.")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="döngü", aliases=["dongu", "looplag"])
+    @commands.is_owner() # Sadece sahip kullanabilir
+    async def loop_stats(self, ctx: commands.Context):
+        """Olay döngüsü gecikmesini ve en kötü tıkanmaların yığın örneklerini gösterir (Sadece Sahip)."""
+        monitor = self.bot.loop_monitor
+        stats = monitor.stats()
+
+        embed = discord.Embed(title="⚙️ Olay Döngüsü", color=discord.Color.blurple())
+        embed.add_field(
+            name=f"Gecikme ({loop_implementation()})",
+            value=(
+                f"Son: **{stats['last_lag_ms']:.2f}ms**\n"
+                f"p50: **{stats['p50_ms']:.2f}ms** / p99: **{stats['p99_ms']:.2f}ms**\n"
+                f"En Yüksek: **{stats['max_lag_ms']:.2f}ms**\n"
+                f"Tıkanma (>{stats['threshold_ms']:.0f}ms): **{stats['stalls']}**"
+            ),
+            inline=False
+        )
+        for stall in monitor.worst[:3]:
+            when = datetime.datetime.fromtimestamp(stall.started_at).strftime("%d.%m %H:%M:%S")
+            stack = "".join(stall.stack[-4:]) if stall.stack else "Yığın örneği alınamadı (tıkanma çok kısa sürdü)."
+            embed.add_field(
+                name=f"{stall.duration * 1000:.0f}ms — {when}",
+                value=f"```py\n{stack[-1000:]}\n```",
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
+    @commands.command(name="bellek", aliases=["memory", "mem"])
+    @commands.is_owner() # Sadece sahip kullanabilir
+    async def memory_stats(self, ctx: commands.Context):
+        """Üye önbelleği politikasını, açılış süresini ve bellek kullanımını gösterir (Sadece Sahip)."""
+        resolver = self.bot.member_resolver
+        resolver_stats = resolver.stats()
+        rss = process_rss_bytes()
+        ready = f"{self.bot.ready_seconds:.1f} sn" if self.bot.ready_seconds is not None else "henüz hazır değil"
+        chunked = sum(1 for guild in self.bot.guilds if guild.chunked)
+
+        embed = discord.Embed(title="🧠 Bellek ve Üye Önbelleği", color=discord.Color.blurple())
+        embed.add_field(
+            name=f"Politika: {resolver.policy}",
+            value=(
+                f"Hazır Olma Süresi: **{ready}**\n"
+                f"Önbellekteki Üye: **{self.bot.cached_member_count()}**\n"
+                f"Tam Yüklü Sunucu: **{chunked}/{len(self.bot.guilds)}**\n"
+                f"Bellek (RSS): **{f'{rss / 1024 / 1024:.1f} MB' if rss else 'bilinmiyor'}**"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="İsteğe Bağlı Getirme",
+            value=(
+                f"Sunucu Yükleme İsteği: **{resolver_stats['chunk_requests']}**\n"
+                f"Sorgulanan Üye: **{resolver_stats['queried_members']}**"
+            ),
+            inline=False
+        )
+        leveling = self.bot.get_cog("LevelingCog")
+        if leveling:
+            cooldowns = leveling.cooldowns.stats()
+            embed.add_field(
+                name="XP Bekleme Süreleri",
+                value=(
+                    f"Kayıt: **{cooldowns['size']}** / {cooldowns['max_entries']}\n"
+                    f"Süresi Dolan: **{cooldowns['expired']}**\n"
+                    f"Sınır Nedeniyle Atılan: **{cooldowns['evicted']}**"
+                ),
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
+    @cache_stats.error
+    @db_stats.error
+    @command_stats.error
+    @loop_stats.error
+    @memory_stats.error
+    async def metrics_error(self, ctx: commands.Context, error):
+        if isinstance(error, commands.NotOwner):
+            await ctx.send("❌ Bu komutu sadece bot sahibi kullanabilir!")
+        else:
+            print(f"[HATA] '{ctx.command.name}' komutunda beklenmedik hata: {error}")
+            await ctx.send("❓ İstatistik komutunda bir hata oluştu.")
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(MetricsCog(bot))
+    print("✅ Owner/Metrics Cog yüklendi!")
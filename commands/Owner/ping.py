@@ -20,9 +20,11 @@ class PingCog(commands.Cog, name="Ping Komutu (Sahip)"): # Yardım komutunun tan
         end_monotonic = time.monotonic()
         websocket_latency = self.bot.latency * 1000
         roundtrip_latency = (end_monotonic - start_monotonic) * 1000
+        loop_stats = self.bot.loop_monitor.stats()
         await msg.edit(content=f"🏓 Pong!\n"
                                f"🔹 WebSocket Gecikmesi: **{websocket_latency:.2f}ms**\n"
-                               f"🔸 Mesaj Gidiş-Geliş Süresi: **{roundtrip_latency:.2f}ms**")
+                               f"🔸 Mesaj Gidiş-Geliş Süresi: **{roundtrip_latency:.2f}ms**\n"
+                               f"⚙️ Olay Döngüsü Gecikmesi: **{loop_stats['last_lag_ms']:.2f}ms** (p99 {loop_stats['p99_ms']:.2f}ms)")
 
     @ping.error
     async def ping_error(self, ctx: commands.Context, error):
@@ -1,8 +1,6 @@
 # commands/Owner/restart.py
 import discord
 from discord.ext import commands
-import os     # os.execv için
-import sys    # sys.executable ve sys.argv için
 
 class RestartCog(commands.Cog, name="Yeniden Başlatma"): # Yardım komutunun tanıması için Cog adı
     """Botu yeniden başlatma komutunu içerir."""
@@ -10,6 +8,19 @@ class RestartCog(commands.Cog, name="Yeniden Başlatma"): # Yardım komutunun ta
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def _restart(self):
+        """
+        Küme modunda tüm süreçleri launcher.py üzerinden, tek süreçte ise bu süreci yeniden başlatır.
+
+        Her iki durumda da süreç önce XP önbelleğini veritabanına yazar ve bekleme süreleri,
+        müzik kuyrukları gibi bellek içi durumu diske kaydeder; yeni süreç buradan devam eder.
+        """
+        cluster = getattr(self.bot, 'cluster', None)
+        if cluster:
+            await cluster.broadcast("restart", requested_by=cluster.cluster_id)
+        else:
+            await self.bot.restart_process()
+
     @commands.command(name="restart", aliases=["reboot", "yenidenbaslat"])
     @commands.is_owner() # Sadece sahip kullanabilir
     async def restart_command(self, ctx: commands.Context): # Komut adı sınıf adıyla karışmasın diye değiştirdim
@@ -18,12 +29,11 @@ class RestartCog(commands.Cog, name="Yeniden Başlatma"): # Yardım komutunun ta
             await ctx.message.add_reaction("🔄")
             await ctx.send("Bot yeniden başlatılıyor...")
             print(f"Bot yeniden başlatma komutu {ctx.author} tarafından kullanıldı.") # logger yerine print
-            # Python script'ini yeniden çalıştır
-            os.execv(sys.executable, ['python'] + sys.argv)
+            await self._restart()
         except discord.Forbidden:
              await ctx.send("Yeniden başlatılıyor...")
              print(f"Bot yeniden başlatma komutu {ctx.author} tarafından kullanıldı (tepki izni yok).") # logger yerine print
-             os.execv(sys.executable, ['python'] + sys.argv)
+             await self._restart()
         except Exception as e:
             await ctx.send(f"Yeniden başlatma sırasında bir hata oluştu: {e}")
             print(f"[HATA] Yeniden başlatma hatası: {e}") # logger yerine print
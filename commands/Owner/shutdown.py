@@ -9,6 +9,14 @@ class ShutdownCog(commands.Cog, name="Kapatma"): # Yardım komutunun tanıması
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def _shutdown(self):
+        """Küme modunda tüm süreçleri, tek süreçte ise bu botu kapatır."""
+        cluster = getattr(self.bot, 'cluster', None)
+        if cluster:
+            await cluster.broadcast("shutdown", requested_by=cluster.cluster_id)
+        else:
+            await self.bot.close()
+
     @commands.command(name="kapat", aliases=["shutdown"])
     @commands.is_owner() # Sadece bot sahibi kullanabilir
     async def shutdown_command(self, ctx: commands.Context): # Komut adı sınıf adıyla karışmasın diye değiştirdim
@@ -18,12 +26,12 @@ class ShutdownCog(commands.Cog, name="Kapatma"): # Yardım komutunun tanıması
             await ctx.send("Bot kapatılıyor... Hoşçakal!")
             print(f"Bot kapatma komutu {ctx.author} tarafından kullanıldı.") # logger yerine print
             # Botu güvenli bir şekilde kapat
-            await self.bot.close()
+            await self._shutdown()
         except discord.Forbidden:
              # Tepki ekleme izni yoksa mesaj gönderip kapat
              await ctx.send("Bot kapatılıyor...")
              print(f"Bot kapatma komutu {ctx.author} tarafından kullanıldı (tepki izni yok).") # logger yerine print
-             await self.bot.close()
+             await self._shutdown()
         except Exception as e:
             await ctx.send(f"Kapatma sırasında bir hata oluştu: {e}")
             print(f"[HATA] Kapatma hatası: {e}") # logger yerine print
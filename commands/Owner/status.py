@@ -9,6 +9,25 @@ class StatusCog(commands.Cog, name="Durum Ayarları"):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # Küme modunda 'durum' tüm süreçlere iletilir, her süreç kendi shard'larına uygular
+        if getattr(self.bot, 'cluster', None):
+            self.bot.cluster.on("presence", self._apply_cluster_presence)
+
+    def cog_unload(self):
+        if getattr(self.bot, 'cluster', None):
+            self.bot.cluster.off("presence", self._apply_cluster_presence)
+
+    async def _apply_cluster_presence(self, data: dict):
+        """Koordinasyon kanalından gelen durum değişikliğini bu sürecin shard'larına uygular."""
+        status = discord.Status(data["status"])
+        activity = None
+        if data.get("activity_type") is not None:
+            activity_type = discord.ActivityType(data["activity_type"])
+            if activity_type == discord.ActivityType.playing:
+                activity = discord.Game(name=data["activity_name"])
+            else:
+                activity = discord.Activity(type=activity_type, name=data["activity_name"])
+        await self.bot.change_presence(status=status, activity=activity)
 
     @commands.command(name="durum")
     @commands.is_owner() # Sadece bot sahibi kullanabilir
@@ -54,22 +73,22 @@ class StatusCog(commands.Cog, name="Durum Ayarları"):
         # Aktivite Tipini Ayarla
         if tip == "oynuyor":
             if not aktivite and tip != "temizle": # Temizle değilse aktivite metni zorunlu
-                 await ctx.send(f"❓ Lütfen oynadığı aktivitenin adını girin. Kullanım: `{self.bot.config['PREFIX']}durum oynuyor {discord_durumu} [oyun adı]`")
+                 await ctx.send(f"❓ Lütfen oynadığı aktivitenin adını girin. Kullanım: `{self.bot.settings.bot.prefix}durum oynuyor {discord_durumu} [oyun adı]`")
                  return
             new_activity = discord.Game(name=aktivite)
         elif tip == "dinliyor":
             if not aktivite and tip != "temizle":
-                 await ctx.send(f"❓ Lütfen dinlediği aktivitenin adını girin. Kullanım: `{self.bot.config['PREFIX']}durum dinliyor {discord_durumu} [şarkı/podcast adı]`")
+                 await ctx.send(f"❓ Lütfen dinlediği aktivitenin adını girin. Kullanım: `{self.bot.settings.bot.prefix}durum dinliyor {discord_durumu} [şarkı/podcast adı]`")
                  return
             new_activity = discord.Activity(type=discord.ActivityType.listening, name=aktivite)
         elif tip == "izliyor":
             if not aktivite and tip != "temizle":
-                 await ctx.send(f"❓ Lütfen izlediği aktivitenin adını girin. Kullanım: `{self.bot.config['PREFIX']}durum izliyor {discord_durumu} [film/video adı]`")
+                 await ctx.send(f"❓ Lütfen izlediği aktivitenin adını girin. Kullanım: `{self.bot.settings.bot.prefix}durum izliyor {discord_durumu} [film/video adı]`")
                  return
             new_activity = discord.Activity(type=discord.ActivityType.watching, name=aktivite)
         elif tip == "yarısıyor":
             if not aktivite and tip != "temizle":
-                 await ctx.send(f"❓ Lütfen yarıştığı aktivitenin adını girin. Kullanım: `{self.bot.config['PREFIX']}durum yarısıyor {discord_durumu} [yarışma adı]`")
+                 await ctx.send(f"❓ Lütfen yarıştığı aktivitenin adını girin. Kullanım: `{self.bot.settings.bot.prefix}durum yarısıyor {discord_durumu} [yarışma adı]`")
                  return
             new_activity = discord.Activity(type=discord.ActivityType.competing, name=aktivite)
         elif tip == "temizle":
@@ -82,7 +101,15 @@ class StatusCog(commands.Cog, name="Durum Ayarları"):
 
         # Değişikliği Uygula
         try:
-            await self.bot.change_presence(status=selected_status, activity=new_activity)
+            if getattr(self.bot, 'cluster', None):
+                await self.bot.cluster.broadcast(
+                    "presence",
+                    status=selected_status.value,
+                    activity_type=new_activity.type.value if new_activity else None,
+                    activity_name=new_activity.name if new_activity else None
+                )
+            else:
+                await self.bot.change_presence(status=selected_status, activity=new_activity)
             await ctx.message.add_reaction("✅")
             print(f"Bot durumu değiştirildi: Durum={selected_status.name}, Tip={tip}, Aktivite='{aktivite}'")
         except Exception as e:
@@ -104,7 +131,7 @@ class StatusCog(commands.Cog, name="Durum Ayarları"):
              elif error.param.name == 'aktivite':
                   await ctx.send(f"❌ Aktivite metnini belirtmediniz!")
              else:
-                  await ctx.send(f"❌ Eksik argüman! Kullanım: `{self.bot.config['PREFIX']}durum [tip] [discord_durumu] [aktivite metni]`")
+                  await ctx.send(f"❌ Eksik argüman! Kullanım: `{self.bot.settings.bot.prefix}durum [tip] [discord_durumu] [aktivite metni]`")
          else:
             print(f"'durum' komutunda beklenmedik hata: {error}")
             await ctx.send(f"❓ Durum komutunda bir hata oluştu.")
@@ -6,26 +6,17 @@ import asyncpg # PostgreSQL için
 import logging
 import datetime
 import re
-import os
-import pytz 
 import asyncio # <-- BU SATIR BURADA OLMALI!
 from typing import Optional, List, Tuple, Union, Dict
+from zoneinfo import ZoneInfo # pytz yerine standart kütüphane (daha hafif import)
 
-# --- Configuration & Constants ---
-LOG_FILE = "partner_system.log"
+from utils.message_pipeline import MessageContext
 
 # --- Logging Setup ---
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Handlers are configured once by setup_logging in main.py (partner_system.log included).
 
 # Türkiye zaman dilimini tanımla (UTC+3)
-TURKEY_TZ = pytz.timezone("Europe/Istanbul")
+TURKEY_TZ = ZoneInfo("Europe/Istanbul")
 
 class PartnershipCog(commands.Cog):
     """Partnerlik ile ilgili komutları ve olayları yönetir."""
@@ -33,21 +24,17 @@ class PartnershipCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.logger = logging.getLogger("PartnershipCog")
-        self.db_pool: Optional[asyncpg.Pool] = None
+        self.db_pool = None # Botun merkezi veritabanı havuzu (bot.db); bu cog'a ait değil
         self.bot.loop.create_task(self._async_init_db())
 
     async def _async_init_db(self):
-        """Asenkron PostgreSQL veritabanını başlat ve tabloyu oluştur."""
-        await self.bot.wait_until_ready() # Bot hazır olana kadar bekle
+        """Botun merkezi veritabanı havuzunu ödünç al ve tabloyu oluştur."""
         try:
-            database_url = os.getenv("DATABASE_URL")
-            if not database_url:
-                self.logger.critical("DATABASE_URL çevresel değişkeni tanımlı değil. Veritabanı bağlantısı kurulamadı.")
-                raise ValueError("DATABASE_URL çevresel değişkeni eksik.")
-            
-            self.db_pool = await asyncpg.create_pool(database_url)
+            if not self.bot.db:
+                self.logger.critical("Merkezi veritabanı havuzu (bot.db) hazır değil. Partner sistemi çalışmayacak.")
+                raise ValueError("bot.db tanımlı değil.")
 
-            async with self.db_pool.acquire() as conn:
+            async with self.bot.db.acquire() as conn:
                 await conn.execute("""
                     CREATE TABLE IF NOT EXISTS partners (
                         id SERIAL PRIMARY KEY,
@@ -63,7 +50,8 @@ class PartnershipCog(commands.Cog):
                 await conn.execute("""
                     CREATE INDEX IF NOT EXISTS idx_partner_timestamp ON partners (timestamp);
                 """)
-                self.logger.info(f"PostgreSQL veritabanına bağlandı ve 'partners' tablosu kontrol edildi.")
+            self.db_pool = self.bot.db
+            self.logger.info(f"Merkezi veritabanı havuzu kullanılıyor, 'partners' tablosu kontrol edildi.")
         except asyncpg.exceptions.InvalidCatalogNameError:
             self.logger.critical("Geçersiz veritabanı adı. DATABASE_URL çevresel değişkenini kontrol edin.")
             raise
@@ -72,7 +60,6 @@ class PartnershipCog(commands.Cog):
             raise
         except Exception as e:
             self.logger.critical(f"Kritik veritabanı başlatma hatası: {type(e).__name__}: {e}")
-            self.db_pool = None
             raise
 
     async def _add_partner_record(self, user_id: int, guild_id: int, invite_link: str, timestamp_utc: datetime.datetime):
@@ -270,27 +257,13 @@ class PartnershipCog(commands.Cog):
             self.logger.error(f"Davet linkinden sunucu adı alınırken beklenmeyen hata: {type(e).__name__}: {e}")
             return "Hata"
 
-    # --- Event Listener ---
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
+    # --- Mesaj Hattı Abonesi ---
+    async def on_pipeline_message(self, ctx: MessageContext):
         """Partner kanalındaki davet linklerini tespit eder ve partnerlik kaydını tutar."""
-
-        if message.author.bot or message.guild is None:
-            return
-
-        partner_channel_id = self.bot.config.get("PARTNER_CHANNEL_ID")
-        if not partner_channel_id:
-            self.logger.error("[Partner Sistemi] Yapılandırmada 'PARTNER_CHANNEL_ID' bulunamadı. Lütfen ana bot yapılandırmasına ekleyin.")
-            return
-
-        try:
-            partner_channel_id = int(partner_channel_id)
-        except ValueError:
-            self.logger.error(f"[Partner Sistemi] 'PARTNER_CHANNEL_ID' değeri geçersiz bir sayı değil: {partner_channel_id}")
-            return
-
-        if message.channel.id != partner_channel_id:
+        # Kanal ID'si yapılandırmadan bir kez ayrıştırılır; bot/DM kontrolü mesaj hattında yapılmıştır
+        if not ctx.in_partner_channel:
             return
+        message = ctx.message
 
         # Daha katı regex: Sadece geçerli davet kodu karakterlerini yakalar
         invite_pattern = r"(?:https?://)?discord\.gg/([a-zA-Z0-9-]{6,})" 
@@ -300,6 +273,11 @@ class PartnershipCog(commands.Cog):
         if not found_codes:
             return
 
+        # Davet sorgusu ve kayıt ayrı görevde: mesaj hattı (XP, komutlar) Discord API'sini beklemez
+        self.bot.loop.create_task(self._record_invites(message, found_codes))
+
+    async def _record_invites(self, message: discord.Message, found_codes: List[str]):
+        """Davet kodlarını doğrular, partnerlik kaydını ekler ve bildirimi gönderir."""
         for invite_code in found_codes: # Yakalanan her davet kodu için
             invite_guild_name = "Bilinmiyor"
             guild_id_from_invite = None
@@ -338,7 +316,7 @@ class PartnershipCog(commands.Cog):
             if message.guild.icon:
                 embed.set_thumbnail(url=message.guild.icon.url)
 
-            partner_image_url = self.bot.config.get("PARTNER_IMAGE_URL", "")
+            partner_image_url = self.bot.settings.bot.partner_image_url
             if partner_image_url:
                 embed.set_image(url=partner_image_url)
 
@@ -389,12 +367,13 @@ class PartnershipCog(commands.Cog):
 
         async def format_partner_records(records: List[asyncpg.Record]):
             formatted_list = []
+            members = await self.bot.member_resolver.resolve(ctx.guild, [record['user_id'] for record in records])
             for record in records:
                 user_id = record['user_id']
                 invite_link = record['invite_link']
                 timestamp_utc = record['timestamp'] 
                 
-                member = ctx.guild.get_member(user_id)
+                member = members.get(user_id)
                 user_name = member.display_name if member else f"Ayrılmış Üye (ID: {user_id})"
                 
                 timestamp_tr = timestamp_utc.astimezone(TURKEY_TZ)
@@ -493,10 +472,11 @@ class PartnershipCog(commands.Cog):
             embed.description = f"Bu {period} döneminde henüz kimse partnerlik yapmamış."
         else:
             description = ""
+            members = await self.bot.member_resolver.resolve(ctx.guild, [record['user_id'] for record in top_partners])
             for rank, record in enumerate(top_partners, start=1):
                 user_id = record['user_id']
                 count = record['count']
-                member = ctx.guild.get_member(user_id)
+                member = members.get(user_id)
                 member_name = member.display_name if member else f"Ayrılmış Üye (ID: {user_id})"
                 description += f"**{rank}.** {member_name} - **{count}** partnerlik\n"
             embed.description = description
@@ -547,12 +527,13 @@ class PartnershipCog(commands.Cog):
 
         async def format_partner_records(records: List[asyncpg.Record]):
             formatted_list = []
+            members = await self.bot.member_resolver.resolve(ctx.guild, [record['user_id'] for record in records])
             for record in records:
                 user_id = record['user_id']
                 invite_link = record['invite_link']
                 timestamp_utc = record['timestamp']
                 
-                member = ctx.guild.get_member(user_id)
+                member = members.get(user_id)
                 user_name = member.display_name if member else f"Ayrılmış Üye (ID: {user_id})"
                 
                 timestamp_tr = timestamp_utc.astimezone(TURKEY_TZ)
@@ -717,24 +698,26 @@ class PartnershipCog(commands.Cog):
 
 
     # --- Cog Lifecycle ---
+    async def cog_load(self):
+        self.bot.message_pipeline.subscribe(self.on_pipeline_message)
+
     async def cog_unload(self):
-        """Clean up when the cog is unloaded."""
-        if self.db_pool:
-            await self.db_pool.close()
-            self.logger.info("Cog kaldırıldı, DB bağlantı havuzu kapatıldı.")
+        """Clean up when the cog is unloaded. The pool belongs to the bot, so it is not closed here."""
+        self.bot.message_pipeline.unsubscribe(self.on_pipeline_message)
+        self.db_pool = None
+        self.logger.info("Cog kaldırıldı, merkezi DB havuzu bırakıldı.")
 
 async def setup(bot: commands.Bot):
     """Setup function to load the cog."""
     try:
         import asyncpg
-        import pytz
         import asyncio # Bu satırın burada olduğundan emin olun!
     except ImportError as e:
-        logging.error(f"Gerekli modüllerden biri bulunamadı: {e}. Partner sistemi ÇALIŞMAYACAK. Lütfen 'pip install asyncpg pytz' komutunu çalıştırın.")
+        logging.error(f"Gerekli modüllerden biri bulunamadı: {e}. Partner sistemi ÇALIŞMAYACAK. Lütfen 'pip install asyncpg' komutunu çalıştırın.")
         return
     
-    if not hasattr(bot, 'config') or not isinstance(bot.config, dict) or "PARTNER_CHANNEL_ID" not in bot.config:
-        logging.critical("Botun ana yapılandırmasında 'PARTNER_CHANNEL_ID' bulunamadı. Partner sistemi düzgün çalışmayabilir.")
+    if bot.settings.bot.partner_channel_id is None:
+        logging.critical("Botun ana yapılandırmasında geçerli bir 'PARTNER_CHANNEL_ID' bulunamadı. Partner sistemi düzgün çalışmayabilir.")
 
     await bot.add_cog(PartnershipCog(bot))
     print("✅ Partnership Cog yüklendi!")
\ No newline at end of file
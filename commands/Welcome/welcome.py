@@ -3,39 +3,16 @@ import discord
 from discord.ext import commands
 # import asyncio # Rol atamada nadiren gerekebilecek gecikme için
 
+from utils.welcome_template import render_welcome_template
+
 class WelcomeCog(commands.Cog, name="Hoş Geldin"):
     """Yeni üyelere hoş geldin mesajı gönderen ve botlara rol atayan Cog."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        if not hasattr(self.bot, 'config') or not self.bot.config:
-            print("[HATA] WelcomeCog: Bot yapılandırması (self.bot.config) yüklenmemiş!")
-
-    def get_config_value(self, key: str, default_value=None):
-        """Config'den değeri alır, yoksa None veya belirtilen varsayılanı döner."""
-        if not hasattr(self.bot, 'config') or not self.bot.config:
-            return default_value
-        return self.bot.config.get(key, default_value)
-
-    def get_id_from_config(self, key: str, id_type: str = "Öğe") -> int | None:
-        """Config'den ID (string) alır ve integer'a çevirir, hata/eksiklik durumunda None döner."""
-        item_id_str = self.get_config_value(key)
-
-        if not item_id_str:
-            return None
-        
-        if not isinstance(item_id_str, str):
-            print(f"[UYARI] Yapılandırmada '{key}' için beklenen string ID yerine '{type(item_id_str)}' tipi bulundu. Değer: '{item_id_str}'.")
-            return None
-
-        try:
-            return int(item_id_str)
-        except ValueError:
-            print(f"[HATA] Yapılandırmadaki '{key}' ('{item_id_str}') geçerli bir sayısal ID değil ({id_type} ID'si için).")
-            return None
 
     async def assign_bot_role(self, member: discord.Member):
-        bot_role_id = self.get_id_from_config("BOT_ROLE_ID", "Bot Rolü")
+        bot_role_id = self.bot.settings.bot.bot_role_id
         if not bot_role_id:
             return
 
@@ -56,21 +33,22 @@ class WelcomeCog(commands.Cog, name="Hoş Geldin"):
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
-        if not hasattr(self.bot, 'config') or not self.bot.config:
-            print("[HATA] WelcomeCog (on_member_join): Bot yapılandırması yüklenmemiş. İşlem yapılamıyor.")
-            return
+        # Ayarlar başlangıçta ayrıştırılmıştır (ID'ler int, renk discord.Color, kanal bahisleri hazır)
+        settings = self.bot.settings.bot
+        guild_settings = await self.bot.guild_settings.get(member.guild.id)
 
         if member.bot:
             print(f"[BİLGİ] Bir bot katıldı: {member.display_name} ({member.id}). Hoş geldin mesajı gönderilmeyecek.")
             await self.assign_bot_role(member)
             return
 
-        welcome_channel_id = self.get_id_from_config("WELCOME_CHANNEL_ID", "Hoş Geldin Kanalı")
+        welcome_channel_id = guild_settings.welcome_channel_id
         if not welcome_channel_id:
             print("[BİLGİ] WELCOME_CHANNEL_ID yapılandırılmamış, hoş geldin mesajı gönderilmeyecek.")
             return
 
-        kanal = self.bot.get_channel(welcome_channel_id)
+        # Genel ayardaki kanal başka bir sunucuya ait olabilir; yalnızca üyenin sunucusunda aranır
+        kanal = member.guild.get_channel(welcome_channel_id)
         if not kanal:
             print(f"[HATA] Hoş geldin kanalı (ID: {welcome_channel_id}) bulunamadı veya botun erişimi yok.")
             return
@@ -82,59 +60,44 @@ class WelcomeCog(commands.Cog, name="Hoş Geldin"):
         sunucu = member.guild
         uye_sayisi = sunucu.member_count
 
-        welcome_role_id = self.get_id_from_config("WELCOME_ROLE_ID", "Karşılama Rolü")
+        welcome_role_id = guild_settings.welcome_role_id
         role_ping_text = ""
         if welcome_role_id:
             role_ping_text = f"<@&{welcome_role_id}> "
 
         # --- İstenen Embed Tasarımı (SADECE GİRİŞ METNİ VE KANAL ID) ---
 
-        def get_channel_mention_or_default(key_name, default_text_if_no_id_in_config="#?"):
-            ch_id_str = self.get_config_value(key_name) 
-            if ch_id_str and isinstance(ch_id_str, str) and ch_id_str.isdigit():
-                return f"<#{ch_id_str}>"
-            elif ch_id_str and isinstance(ch_id_str, str) and not ch_id_str.isdigit() and ch_id_str.startswith("#"):
-                 return ch_id_str 
-            # print(f"[BİLGİ] '{key_name}' için geçerli bir kanal ID'si bulunamadı, varsayılan metin kullanılıyor: '{default_text_if_no_id_in_config}'")
-            return default_text_if_no_id_in_config
-
-        rules_ch_mention = get_channel_mention_or_default("RULES_CHANNEL_ID")
-        color_role_ch_mention = get_channel_mention_or_default("COLOR_ROLE_CHANNEL_ID")
-        general_roles_ch_mention = get_channel_mention_or_default("GENERAL_ROLES_CHANNEL_ID")
-        events_ch_mention = get_channel_mention_or_default("EVENTS_CHANNEL_ID")
-        giveaways_ch_mention = get_channel_mention_or_default("GIVEAWAYS_CHANNEL_ID")
-        partnership_rules_ch_mention = get_channel_mention_or_default("PARTNERSHIP_RULES_CHANNEL_ID")
-
-        embed_description = (
-            f"Hoş geldin! Kuralları okumayı unutma {rules_ch_mention}\n"
-            f"Kendine bir renk rolü al {color_role_ch_mention}\n"
-            f"Rollerimizden uygun olanları almayı unutma {general_roles_ch_mention}\n"
-            f"Etkinliklerimize göz at, belki eğlenirsin {events_ch_mention}\n"
-            f"Çekilişlerimize katılmayı unutma {giveaways_ch_mention}\n"
-            f"Partnerlik şartlarını oku {partnership_rules_ch_mention}"
-        )
+        if guild_settings.welcome_message:
+            # Sunucuya özel şablon: {uye}, {sunucu} ve {uye_sayisi} yer tutucuları desteklenir
+            embed_description = render_welcome_template(guild_settings.welcome_message, member, uye_sayisi)
+        else:
+            links = settings.welcome_links
+            rules_ch_mention = links["RULES_CHANNEL_ID"]
+            color_role_ch_mention = links["COLOR_ROLE_CHANNEL_ID"]
+            general_roles_ch_mention = links["GENERAL_ROLES_CHANNEL_ID"]
+            events_ch_mention = links["EVENTS_CHANNEL_ID"]
+            giveaways_ch_mention = links["GIVEAWAYS_CHANNEL_ID"]
+            partnership_rules_ch_mention = links["PARTNERSHIP_RULES_CHANNEL_ID"]
+
+            embed_description = (
+                f"Hoş geldin! Kuralları okumayı unutma {rules_ch_mention}\n"
+                f"Kendine bir renk rolü al {color_role_ch_mention}\n"
+                f"Rollerimizden uygun olanları almayı unutma {general_roles_ch_mention}\n"
+                f"Etkinliklerimize göz at, belki eğlenirsin {events_ch_mention}\n"
+                f"Çekilişlerimize katılmayı unutma {giveaways_ch_mention}\n"
+                f"Partnerlik şartlarını oku {partnership_rules_ch_mention}"
+            )
         # --- Embed Tasarımı Sonu ---
         
-        embed_color_hex = self.get_config_value("WELCOME_EMBED_COLOR", "0xFF0000")
-        embed_color = discord.Color.red() 
-        if isinstance(embed_color_hex, str) and embed_color_hex.startswith("0x"):
-            try:
-                embed_color = discord.Color(int(embed_color_hex, 16))
-            except ValueError:
-                print(f"[UYARI] Config'deki 'WELCOME_EMBED_COLOR' ('{embed_color_hex}') geçersiz hex. Varsayılan kırmızı kullanılacak.")
-        elif embed_color_hex != "0xFF0000":
-            print(f"[UYARI] Config'deki 'WELCOME_EMBED_COLOR' ('{embed_color_hex}') '0x' ile başlamıyor. Varsayılan kırmızı kullanılacak.")
-
         embed = discord.Embed(
             description=embed_description,
-            color=embed_color
+            color=settings.welcome_embed_color
         )
 
         embed.set_footer(text=f"👥 Şu anda sunucumuzda toplam {uye_sayisi} üye bulunuyor!")
 
-        welcome_image_url = self.get_config_value("WELCOME_IMAGE_URL", "")
-        if welcome_image_url and isinstance(welcome_image_url, str):
-            embed.set_image(url=welcome_image_url)
+        if settings.welcome_image_url:
+            embed.set_image(url=settings.welcome_image_url)
 
         try:
             content_message = f"{role_ping_text}Heyy {member.mention}! Yooo! Sen Hoş geldin!"
@@ -147,11 +110,7 @@ class WelcomeCog(commands.Cog, name="Hoş Geldin"):
             print(f"[HATA] Hoş geldin mesajı gönderilirken beklenmedik bir hata oluştu: {e}")
 
 async def setup(bot: commands.Bot):
-    if not hasattr(bot, 'config') or not bot.config:
-        print("❌ Welcome Cog yüklenemedi: Bot yapılandırması (bot.config) bulunamadı veya boş.")
-        return
-
-    if not bot.config.get("WELCOME_CHANNEL_ID"):
+    if not bot.settings.bot.welcome_channel_id:
         print("⚠️ Welcome Cog: 'WELCOME_CHANNEL_ID' yapılandırmada bulunamadı. Cog bazı işlevleri yerine getiremeyebilir.")
 
     await bot.add_cog(WelcomeCog(bot))
\ No newline at end of file
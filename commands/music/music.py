@@ -3,7 +3,6 @@ from discord.ext import commands
 from discord import FFmpegPCMAudio, PCMVolumeTransformer
 import logging
 import os
-import yt_dlp
 import asyncio
 from collections import deque
 from typing import Optional, Dict, List, Union # Union eklendi
@@ -36,7 +35,15 @@ FFMPEG_OPTIONS = {
     'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
     'options': '-vn'
 }
-ytdl = yt_dlp.YoutubeDL(YTDL_FORMAT_OPTIONS)
+_ytdl = None
+
+def get_ytdl():
+    """yt_dlp'yi ilk kullanımda içe aktarır; ağır import bot açılışını yavaşlatmaz."""
+    global _ytdl
+    if _ytdl is None:
+        import yt_dlp
+        _ytdl = yt_dlp.YoutubeDL(YTDL_FORMAT_OPTIONS)
+    return _ytdl
 
 class Song:
     """Çalınacak bir şarkıyı temsil eden sınıf."""
@@ -48,6 +55,17 @@ class Song:
         self.webpage_url = data.get('webpage_url')
         self.requester = requester
 
+    def to_dict(self) -> Dict:
+        """Yeniden başlatma anlık görüntüsü için Song(data, requester) ile geri kurulabilen veri."""
+        return {
+            'url': self.source_url,
+            'title': self.title,
+            'duration': self.duration,
+            'thumbnail': self.thumbnail,
+            'webpage_url': self.webpage_url,
+            'requester_id': self.requester.id,
+        }
+
     def format_duration(self) -> str:
         """Süreyi MM:SS formatına çevirir."""
         if not self.duration:
@@ -62,6 +80,9 @@ class MusicQueue:
         self.current_song: Optional[Song] = None
         self.loop = False
         self.volume = 0.5  # Varsayılan ses seviyesi
+        self.ctx: Optional[commands.Context] = None  # Son çalmayı başlatan komutun bağlamı
+        self.started_at: Optional[float] = None    # Mevcut şarkının başladığı döngü zamanı (konum hesabı için)
+        self.resume_at = 0.0                       # Bir sonraki şarkı bu saniyeden başlatılır (geri yükleme)
 
     def add(self, song: Song):
         self._queue.append(song)
@@ -174,10 +195,16 @@ class MusicCog(commands.Cog, name="Müzik"):
                 return
 
             queue.current_song = next_song
+            queue.ctx = ctx
+            offset, queue.resume_at = queue.resume_at, 0.0
+            ffmpeg_options = dict(FFMPEG_OPTIONS)
+            if offset:
+                ffmpeg_options['before_options'] = f"-ss {offset:.1f} {ffmpeg_options['before_options']}"
+            queue.started_at = self.bot.loop.time() - offset
             
             # DÜZELTİLDİ: executable=FFMPEG_PATH artık doğru şekilde "ffmpeg" komutunu kullanacak.
             try:
-                source = PCMVolumeTransformer(FFmpegPCMAudio(next_song.source_url, executable=FFMPEG_PATH, **FFMPEG_OPTIONS), volume=queue.volume)
+                source = PCMVolumeTransformer(FFmpegPCMAudio(next_song.source_url, executable=FFMPEG_PATH, **ffmpeg_options), volume=queue.volume)
             except Exception as e:
                 log.error(f"FFmpegPCMAudio oluşturulurken hata oluştu: {e}", exc_info=True)
                 await ctx.send(f"⚠️ **{next_song.title}** çalınırken bir kaynak hatası oluştu. Şarkı atlanıyor.")
@@ -204,6 +231,58 @@ class MusicCog(commands.Cog, name="Müzik"):
 
             await ctx.send(embed=embed, view=PlayerControls(self, ctx))
 
+    # --- Sıcak Yeniden Başlatma ---
+    async def snapshot_state(self) -> dict:
+        """Çalan kuyrukları (şarkı konumu dahil) anlık görüntüye yazar."""
+        players = []
+        for guild_id, queue in self.queues.items():
+            ctx = queue.ctx
+            if not ctx or not ctx.voice_client or not ctx.voice_client.is_connected() or not queue.current_song:
+                continue
+            position = self.bot.loop.time() - queue.started_at if queue.started_at else 0.0
+            players.append({
+                'guild_id': guild_id,
+                'voice_channel_id': ctx.voice_client.channel.id,
+                'text_channel_id': ctx.channel.id,
+                'message_id': ctx.message.id,
+                'position': position,
+                'loop': queue.loop,
+                'volume': queue.volume,
+                'current': queue.current_song.to_dict(),
+                'queue': [song.to_dict() for song in queue.queue_list],
+            })
+        return {'players': players}
+
+    async def restore_state(self, state: dict):
+        """Ses kanallarına yeniden bağlanır ve her kuyruğu kaldığı saniyeden sürdürür."""
+        await self.bot.wait_until_ready()
+        for player in state.get('players', []):
+            guild = self.bot.get_guild(player['guild_id'])
+            voice_channel = guild and guild.get_channel(player['voice_channel_id'])
+            text_channel = guild and guild.get_channel(player['text_channel_id'])
+            if not voice_channel or not text_channel:
+                continue
+            try:
+                # Butonlar ve bildirimler bir komut bağlamı bekler; orijinal komut mesajından yeniden kurulur.
+                message = await text_channel.fetch_message(player['message_id'])
+                ctx = await self.bot.get_context(message)
+                if not guild.voice_client:
+                    await voice_channel.connect()
+            except Exception as e:
+                log.warning(f"{guild.id}: Müzik kuyruğu geri yüklenemedi: {e}")
+                continue
+
+            queue = self.get_queue(guild.id)
+            queue.loop = player['loop']
+            queue.volume = player['volume']
+            songs = [player['current']] + player['queue']
+            requesters = await self.bot.member_resolver.resolve(guild, {data['requester_id'] for data in songs})
+            for data in songs:
+                queue.add(Song(data, requesters.get(data['requester_id'], guild.me)))
+            queue.resume_at = player['position']
+            log.info(f"{guild.id}: {len(player['queue']) + 1} şarkılık kuyruk {player['position']:.0f}. saniyeden sürdürülüyor.")
+            await self._play_next(ctx)
+
     @commands.command(name='çal', aliases=['p', 'play'], help="Bir şarkıyı çalar veya sıraya ekler.")
     async def play(self, ctx: commands.Context, *, query: str):
         """YouTube veya Spotify linkinden/arama teriminden şarkı çalar."""
@@ -228,7 +307,7 @@ class MusicCog(commands.Cog, name="Müzik"):
             processing_msg = await ctx.send(f"🔎 **`{query}`** aranıyor, lütfen bekleyin...")
 
             loop = self.bot.loop or asyncio.get_event_loop()
-            data = await loop.run_in_executor(None, lambda: ytdl.extract_info(query, download=False))
+            data = await loop.run_in_executor(None, lambda: get_ytdl().extract_info(query, download=False))
             
             if 'entries' in data: # Bu bir çalma listesi
                 song_list = data['entries']
@@ -0,0 +1,189 @@
+# launcher.py
+"""
+Yata Misaki çoklu süreç (küme) başlatıcısı.
+
+Toplam shard sayısını N sürece böler; her süreç main.py'yi AutoShardedBot
+modunda kendi shard aralığıyla çalıştırır. Süreçler yerel bir TCP kanalı
+üzerinden başlatıcıya bağlanır; sahip komutları (durum, restart, kapat)
+bu kanal üzerinden tüm kümelere iletilir.
+
+Kullanım:
+    python launcher.py --clusters 4            # shard sayısını Discord'dan öğrenir
+    python launcher.py --clusters 2 --shards 8
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiohttp
+from dotenv import load_dotenv
+
+from utils.cluster import DEFAULT_IPC_HOST, DEFAULT_IPC_PORT, RESTART_EXIT_CODE, encode
+
+BASE_DIR = Path(__file__).parent
+RESPAWN_DELAY = 5.0
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - launcher - %(message)s')
+log = logging.getLogger("launcher")
+
+
+async def fetch_recommended_shards(token: str) -> int:
+    """Discord'un önerdiği shard sayısını /gateway/bot uç noktasından alır."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            "https://discord.com/api/v10/gateway/bot",
+            headers={"Authorization": f"Bot {token}"}
+        ) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+            return int(data["shards"])
+
+
+def split_shards(shard_count: int, cluster_count: int) -> List[List[int]]:
+    """Shard'ları kümelere ardışık aralıklar halinde, olabildiğince eşit dağıtır."""
+    cluster_count = max(1, min(cluster_count, shard_count))
+    base, extra = divmod(shard_count, cluster_count)
+    ranges, start = [], 0
+    for i in range(cluster_count):
+        size = base + (1 if i < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+class Launcher:
+    def __init__(self, shard_ranges: List[List[int]], shard_count: int, host: str, port: int):
+        self.shard_ranges = shard_ranges
+        self.shard_count = shard_count
+        self.host = host
+        self.port = port
+        self.processes: Dict[int, asyncio.subprocess.Process] = {}
+        self.clients: Dict[int, asyncio.StreamWriter] = {}
+        self.stopped: set = set()
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._shutting_down = False
+
+    # --- Koordinasyon Kanalı ---
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        cluster_id = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if message.get("op") == "hello":
+                    cluster_id = int(message["data"]["cluster_id"])
+                    self.clients[cluster_id] = writer
+                    log.info(f"Küme #{cluster_id} koordinasyon kanalına bağlandı.")
+                elif message.get("op") == "broadcast":
+                    await self.broadcast(message["target_op"], message.get("data", {}), origin=message.get("origin"))
+        finally:
+            if cluster_id is not None and self.clients.get(cluster_id) is writer:
+                del self.clients[cluster_id]
+            writer.close()
+
+    async def broadcast(self, op: str, data: dict, origin: Optional[int] = None):
+        log.info(f"'{op}' mesajı {len(self.clients)} kümeye iletiliyor (gönderen: {origin}).")
+        payload = encode(op, data, origin=origin)
+        for writer in list(self.clients.values()):
+            try:
+                writer.write(payload)
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    # --- Süreç Yönetimi ---
+    async def _spawn(self, cluster_id: int) -> asyncio.subprocess.Process:
+        env = dict(os.environ)
+        env.update({
+            "CLUSTER_ID": str(cluster_id),
+            "CLUSTER_COUNT": str(len(self.shard_ranges)),
+            "SHARD_COUNT": str(self.shard_count),
+            "SHARD_IDS": ",".join(map(str, self.shard_ranges[cluster_id])),
+            "CLUSTER_IPC_HOST": self.host,
+            "CLUSTER_IPC_PORT": str(self.port),
+        })
+        process = await asyncio.create_subprocess_exec(sys.executable, str(BASE_DIR / "main.py"), env=env, cwd=str(BASE_DIR))
+        log.info(f"Küme #{cluster_id} başlatıldı (PID {process.pid}, shard'lar {self.shard_ranges[cluster_id]}).")
+        return process
+
+    async def _supervise(self, cluster_id: int):
+        while not self._shutting_down:
+            process = await self._spawn(cluster_id)
+            self.processes[cluster_id] = process
+            code = await process.wait()
+            if self._shutting_down:
+                break
+            if code == 0:
+                log.info(f"Küme #{cluster_id} kapatıldı, yeniden başlatılmayacak.")
+                break
+            if code == RESTART_EXIT_CODE:
+                log.info(f"Küme #{cluster_id} yeniden başlatma isteğiyle çıktı.")
+                continue
+            log.error(f"Küme #{cluster_id} beklenmedik şekilde çıktı (kod {code}). {RESPAWN_DELAY:.0f} sn sonra yeniden başlatılacak.")
+            await asyncio.sleep(RESPAWN_DELAY)
+        self.stopped.add(cluster_id)
+
+    def _terminate_all(self):
+        self._shutting_down = True
+        for process in self.processes.values():
+            if process.returncode is None:
+                process.terminate()
+
+    async def run(self):
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        log.info(f"Koordinasyon kanalı {self.host}:{self.port} üzerinde dinleniyor. {len(self.shard_ranges)} küme, {self.shard_count} shard.")
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._terminate_all)
+            except NotImplementedError:  # Windows
+                pass
+
+        # Shard'ların aynı anda bağlanıp IDENTIFY sınırına takılmaması için kümeleri kademeli başlat
+        supervisors = []
+        for cluster_id in range(len(self.shard_ranges)):
+            supervisors.append(asyncio.create_task(self._supervise(cluster_id)))
+            await asyncio.sleep(RESPAWN_DELAY)
+        await asyncio.gather(*supervisors)
+
+        self.server.close()
+        await self.server.wait_closed()
+        log.info("Tüm kümeler kapandı, başlatıcı çıkıyor.")
+
+
+async def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Yata Misaki küme başlatıcısı")
+    parser.add_argument("--clusters", type=int, default=int(os.getenv("CLUSTER_COUNT", os.cpu_count() or 1)))
+    parser.add_argument("--shards", type=int, default=int(os.getenv("SHARD_COUNT", "0")) or None)
+    parser.add_argument("--host", default=os.getenv("CLUSTER_IPC_HOST", DEFAULT_IPC_HOST))
+    parser.add_argument("--port", type=int, default=int(os.getenv("CLUSTER_IPC_PORT", str(DEFAULT_IPC_PORT))))
+    args = parser.parse_args()
+
+    shard_count = args.shards
+    if not shard_count:
+        token = os.getenv("DISCORD_TOKEN")
+        if not token:
+            log.critical("DISCORD_TOKEN bulunamadı ve --shards verilmedi!")
+            return
+        shard_count = await fetch_recommended_shards(token)
+        log.info(f"Discord'un önerdiği shard sayısı: {shard_count}")
+
+    launcher = Launcher(split_shards(shard_count, args.clusters), shard_count, args.host, args.port)
+    await launcher.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,44 +1,174 @@
 import asyncio
-import json
+import collections
 import logging
 import os
+import queue
+import sys
 import time
 import traceback
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
 
-import asyncpg
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
+from utils.cluster import RESTART_EXIT_CODE, ClusterClient
+from utils.config import ConfigManager, Settings
+from utils.database import Database
+from utils.guild_settings import GuildSettingsStore
+from utils.loop_monitor import LoopMonitor, install_loop_policy, loop_implementation
+from utils.members import MEMBER_CACHE_POLICIES, MemberResolver, member_cache_options, process_rss_bytes
+from utils.message_pipeline import MessagePipeline
+from utils.metrics import MetricsRegistry, MetricsServer
+from utils.snapshot import consume_snapshot, write_snapshot
+
 # --- Temel Ayarlar ---
 load_dotenv()
 BASE_DIR = Path(__file__).parent
 
-# --- Yapılandırma Yükleme ---
+# --- Yapılandırma Dosyaları ---
 CONFIG_FILE_PATH = BASE_DIR / "config.json"
-try:
-    with open(CONFIG_FILE_PATH, 'r', encoding='utf-8') as f:
-        config = json.load(f)
-except (FileNotFoundError, json.JSONDecodeError):
-    config = {"PREFIX": "!"}
-    print("UYARI: config.json bulunamadı veya bozuk. Varsayılan prefix '!' kullanılıyor.")
+LEVELING_CONFIG_FILE_PATH = BASE_DIR / "leveling_config.json"
 
 BOT_TOKEN = os.getenv("DISCORD_TOKEN")
-DEFAULT_PREFIX = config.get("PREFIX", "!")
-BOT_LOG_CHANNEL_ID = config.get("BOT_LOG_CHANNEL_ID")
+
+# --- Shard / Küme Ayarları ---
+# launcher.py her süreç için CLUSTER_ID, SHARD_COUNT ve SHARD_IDS değişkenlerini ayarlar.
+# SHARDED=1 tek süreçte otomatik shard kullanımını açar.
+CLUSTER_ID = os.getenv("CLUSTER_ID")
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0")) or None
+SHARD_IDS = [int(s) for s in os.getenv("SHARD_IDS", "").split(",") if s.strip()] or None
+SHARDED = bool(SHARD_COUNT) or os.getenv("SHARDED", "").strip().lower() in ("1", "true", "yes", "evet")
+# Yeniden başlatmada cog durumlarının yazıldığı dosya (küme modunda süreç başına ayrı)
+SNAPSHOT_FILE = BASE_DIR / ("restart_snapshot.json" if CLUSTER_ID is None else f"restart_snapshot.cluster{CLUSTER_ID}.json")
+# Veritabanına yazılmamış XP artışlarının yerel günlüğü (küme modunda süreç başına ayrı klasör)
+XP_JOURNAL_DIR = Path(os.getenv("XP_JOURNAL_DIR", BASE_DIR / "xp_journal")) / ("main" if CLUSTER_ID is None else f"cluster{CLUSTER_ID}")
+
+# --- Metrik Ayarları ---
+# METRICS_PORT ayarlıysa Prometheus /metrics uç noktası açılır. Küme modunda her süreç port + CLUSTER_ID kullanır.
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0")) or None
+
+# --- Üye Önbelleği Ayarları ---
+# MEMBER_CACHE_POLICY: full (açılışta tüm üyeler), on_demand (sunucu gerektiğinde yüklenir), voice (yalnızca ses kanalındakiler)
+MEMBER_CACHE_POLICY = os.getenv("MEMBER_CACHE_POLICY", "full").lower()
+if MEMBER_CACHE_POLICY not in MEMBER_CACHE_POLICIES:
+    print(f"UYARI: Geçersiz MEMBER_CACHE_POLICY '{MEMBER_CACHE_POLICY}'. 'full' kullanılıyor.")
+    MEMBER_CACHE_POLICY = "full"
+
+# --- Olay Döngüsü Ayarları ---
+# LOOP_IMPL=uvloop daha hızlı uvloop döngüsünü kullanır (yüklü değilse asyncio'ya düşülür).
+LOOP_IMPL = os.getenv("LOOP_IMPL", "asyncio").lower()
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100"))
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+# Log dosyalarının yazıldığı klasör (varsayılan: depo kökü)
+LOG_DIR = Path(os.getenv("LOG_DIR", BASE_DIR))
+# Birbirine bağımlı eklentiler: eklenti -> kendisinden önce yüklenmesi gerekenler.
+# Burada listelenmeyen eklentiler aynı anda yüklenir.
+EXTENSION_DEPENDENCIES: Dict[str, Set[str]] = {}
+# Nadiren kullanılan eklentiler: başlangıcı bekletmez, bot hazır olduktan sonra arka planda yüklenir.
+DEFERRED_EXTENSIONS = {"commands.music.music"}
+
+# Dosya adı -> o dosyaya yazılacak logger adı ("" = tüm kayıtlar)
+LOG_FILES = {
+    "bot.log": "",
+    "leveling.log": "commands.Leveling",
+    "partner_system.log": "PartnershipCog",
+}
 
 # --- Loglama Sistemi ---
 class DiscordLogHandler(logging.Handler):
-    """Logları belirli bir Discord kanalına gönderen özel handler."""
-    def __init__(self, bot_instance, log_channel_id):
+    """
+    Logları toplu halde belirli bir Discord kanalına gönderen özel handler.
+
+    Kayıtlar kısa bir bekleme penceresi boyunca biriktirilir ve mümkün olan en az
+    sayıda 2000 karakterlik mesajda gönderilir. Kuyruk sınırlıdır; dolduğunda en
+    eski kayıt atılır ve sayılır. Discord 429 döndürdüğünde gönderim yavaşlatılır.
+    """
+    MESSAGE_LIMIT = 2000
+    CODE_BLOCK_OVERHEAD = len("```\n\n```")
+    MIN_SEND_INTERVAL = 1.0  # Kanal başına 5 mesaj / 5 sn sınırının altında kal
+    MAX_BACKOFF = 60.0
+
+    def __init__(self, bot_instance, log_channel_id, max_queue_size: int = 1000, flush_interval: float = 2.0):
         super().__init__()
         self.bot = bot_instance
         self.log_channel_id = log_channel_id
-        self.queue = asyncio.Queue()
+        self.flush_interval = flush_interval
+        self.queue = collections.deque(maxlen=max_queue_size)  # Dolunca en eski kayıt düşer
         self.task = None
+        self.loop = None
+        self._wakeup = None
+        self._closing = False
+        self._backoff = 0.0
+        self._last_reported_drops = 0
+        # İstatistikler
+        self.dropped = 0
+        self.sent_messages = 0
+        self.sent_records = 0
+        self.rate_limited = 0
         self.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s'))
 
+    def _next_message(self) -> str:
+        """Kuyruğun başından 2000 karakter sınırına sığan kadar kaydı tek bir mesajda birleştirir."""
+        budget = self.MESSAGE_LIMIT - self.CODE_BLOCK_OVERHEAD
+        lines = []
+        used = 0
+
+        if self.dropped > self._last_reported_drops:
+            lines.append(f"[{self.dropped - self._last_reported_drops} log kaydı kuyruk dolduğu için atıldı]")
+            used = len(lines[0]) + 1
+            self._last_reported_drops = self.dropped
+
+        while self.queue:
+            msg = self.queue[0]
+            needed = len(msg) + (1 if lines else 0)
+            if used + needed <= budget:
+                lines.append(self.queue.popleft())
+                used += needed
+                self.sent_records += 1
+                continue
+            if not lines:
+                # Tek başına sınırı aşan kayıt: sığan kısmı gönder, kalanını kuyrukta bırak
+                self.queue[0] = msg[budget:]
+                lines.append(msg[:budget])
+            break
+        return "```\n" + "\n".join(lines) + "\n```"
+
+    async def _send(self, channel, content: str) -> bool:
+        try:
+            await channel.send(content)
+            self.sent_messages += 1
+            if self._backoff:
+                self._backoff = self._backoff / 2 if self._backoff > 1 else 0.0
+            return True
+        except discord.RateLimited as e:
+            self._register_rate_limit(e.retry_after)
+        except discord.HTTPException as e:
+            if e.status != 429:
+                print(f"Log gönderme hatası: {e}")
+                return True  # Kalıcı hata; aynı mesajı tekrar denemenin anlamı yok
+            self._register_rate_limit(None)
+        except Exception as e:
+            # Ağ kesintisi, zaman aşımı vb.: gönderici görevi ölmesin, geri çekilip aynı mesajı tekrar dene
+            self._increase_backoff(None)
+            print(f"Log gönderme hatası, {self._backoff:.1f} sn sonra tekrar denenecek: {type(e).__name__}: {e}")
+        await asyncio.sleep(self._backoff)
+        return False
+
+    def _increase_backoff(self, retry_after):
+        self._backoff = min(max(self._backoff * 2, retry_after or 1.0), self.MAX_BACKOFF)
+
+    def _register_rate_limit(self, retry_after):
+        self.rate_limited += 1
+        self._increase_backoff(retry_after)
+        print(f"Log kanalı hız sınırına takıldı, gönderim {self._backoff:.1f} sn yavaşlatılıyor.")
+
     async def _log_sender(self):
         await self.bot.wait_until_ready()
         channel = self.bot.get_channel(self.log_channel_id)
@@ -46,95 +176,443 @@ class DiscordLogHandler(logging.Handler):
             print(f"HATA: Log kanalı (ID: {self.log_channel_id}) bulunamadı. Kanal loglama devre dışı.")
             return
 
-        while not self.bot.is_closed():
-            try:
-                record = await self.queue.get()
-                if record is None:  # Kapatma sinyali
-                    break
-                msg = self.format(record)
-                # Mesajları 2000 karakter limitine göre böl
-                for chunk in [msg[i:i+1990] for i in range(0, len(msg), 1990)]:
-                    await channel.send(f"```{chunk}```")
-            except Exception as e:
-                print(f"Log gönderme hatası: {e}")
+        while True:
+            await self._wakeup.wait()
+            if not self._closing:
+                # Kısa pencere boyunca gelen kayıtları biriktir
+                await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+
+            while self.queue and not self.bot.is_closed():
+                content = self._next_message()
+                while not await self._send(channel, content):
+                    if self._closing:
+                        break
+                await asyncio.sleep(max(self.MIN_SEND_INTERVAL, self._backoff))
+
+            if self._closing or self.bot.is_closed():
+                break
 
     def start(self):
-        self.task = self.bot.loop.create_task(self._log_sender())
+        self.loop = self.bot.loop
+        self._wakeup = asyncio.Event()
+        self.task = self.loop.create_task(self._log_sender())
 
     def emit(self, record):
-        if self.bot.loop.is_running():
-            self.queue.put_nowait(record)
+        if self.loop is None or self.loop.is_closed():
+            return
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(msg)
+        if not self._wakeup.is_set():
+            # emit başka bir thread'den çağrılabilir; Event'i yalnızca döngü üzerinde ayarla
+            self.loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def drain(self, timeout: float = 5.0):
+        """Kuyrukta kalan logları göndermeyi dener ve gönderici görevini sonlandırır."""
+        self._closing = True
+        if self.task and not self.task.done():
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self.task, timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                self.task.cancel()
+
+    def stats(self):
+        return {
+            "queued": len(self.queue),
+            "dropped": self.dropped,
+            "sent_messages": self.sent_messages,
+            "sent_records": self.sent_records,
+            "rate_limited": self.rate_limited,
+        }
+
+def setup_logging() -> QueueListener:
+    """
+    Tüm loglamayı tek noktadan kurar.
+
+    Kök logger'a yalnızca bir QueueHandler eklenir; olay döngüsündeki kod kaydı
+    kuyruğa bırakıp devam eder. Konsol ve dosya yazımı QueueListener'ın arka plan
+    thread'inde yapılır. Her modülün kendi dosyası vardır ve dosyalar boyuta göre döndürülür.
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
+
+    for filename, logger_name in LOG_FILES.items():
+        if CLUSTER_ID is not None:
+            # Her küme süreci kendi dosyasını döndürür; aynı dosyayı paylaşmak döndürmeyi bozar.
+            stem, ext = os.path.splitext(filename)
+            filename = f"{stem}.cluster{CLUSTER_ID}{ext}"
+        file_handler = RotatingFileHandler(
+            LOG_DIR / filename, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+            encoding='utf-8', delay=True
+        )
+        file_handler.setFormatter(formatter)
+        if logger_name:
+            file_handler.addFilter(logging.Filter(logger_name))
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
 
-    def close(self):
-        super().close()
-        if self.task:
-            self.queue.put_nowait(None) # Sinyal göndererek döngüyü sonlandır
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+def add_log_handler(handler: logging.Handler):
+    """Arka plan log thread'ine yeni bir handler ekler."""
+    log_listener.handlers = (*log_listener.handlers, handler)
+
+def remove_log_handler(handler: logging.Handler):
+    log_listener.handlers = tuple(h for h in log_listener.handlers if h is not handler)
 
 # Logger'ı kur
+log_listener = setup_logging()
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
 
-# Konsol handler'ı
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s'))
-logger.addHandler(console_handler)
+# --- Yapılandırma Yükleme ---
+# Ayarlar bir kez ayrıştırılır; dosya değiştiğinde veya 'ayaryenile' ile çalışırken yenilenir.
+config_manager = ConfigManager(CONFIG_FILE_PATH, LEVELING_CONFIG_FILE_PATH)
+config_manager.load()
 
 # --- Dinamik Prefix Fonksiyonu ---
 async def get_prefix(bot, message):
     if not message.guild:
-        return commands.when_mentioned_or(DEFAULT_PREFIX)(bot, message)
-    if not bot.db:
-        return commands.when_mentioned_or(DEFAULT_PREFIX)(bot, message)
-    prefix = await bot.db.fetchval("SELECT prefix FROM guild_settings WHERE guild_id = $1", message.guild.id)
-    return commands.when_mentioned_or(prefix or DEFAULT_PREFIX)(bot, message)
+        return commands.when_mentioned_or(bot.settings.bot.prefix)(bot, message)
+    # Prefix'ler bellekten okunur; mesaj başına veritabanına gidilmez.
+    guild_settings = await bot.guild_settings.get(message.guild.id)
+    return commands.when_mentioned_or(guild_settings.prefix)(bot, message)
 
 # --- Ana Bot Sınıfı ---
-class YataMisakiBot(commands.Bot):
+_BotBase = commands.AutoShardedBot if SHARDED else commands.Bot
+
+class YataMisakiBot(_BotBase):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.config = config
+        # Doğrulanmış, değişmez ayarlar `settings` üzerinden okunur; `config` ham sözlüktür
+        self.config_manager = config_manager
+        self.config = config_manager.current.bot.raw
+        self.config_manager.add_listener(self._apply_settings)
         self.start_time = time.time()
         self.db = None
+        # Sunucu başına ayarlar (prefix, kanallar, XP ayarları); boş alanlar genel ayarlardan gelir
+        self.guild_settings = GuildSettingsStore(self.settings)
         self.discord_log_handler = None
+        # Küme modunda launcher.py ile konuşan koordinasyon kanalı (tek süreçte None)
+        self.cluster = ClusterClient.from_env()
+        self.exit_code = 0
+        # Önceki süreçten devralınan cog durumları (cog adı -> durum)
+        self.restart_snapshot: Dict[str, dict] = {}
+        # Önbellekte olmayan üyeleri politikaya göre Discord'dan getirir
+        self.member_resolver = MemberResolver(MEMBER_CACHE_POLICY)
+        self.xp_journal_dir = XP_JOURNAL_DIR
+        self.ready_seconds: Optional[float] = None
+        # Mesajlar bir kez sınıflandırılıp abone cog'lara dağıtılır
+        self.message_pipeline = MessagePipeline()
+        self._message_prefixes: Dict[int, List[str]] = {}
+        # Komut başına gecikme/hata/eşzamanlılık metrikleri
+        self.loop_monitor = LoopMonitor(threshold=LOOP_LAG_THRESHOLD_MS / 1000)
+        self.metrics = MetricsRegistry()
+        self.metrics.register_collector(self._collect_runtime_metrics)
+        self.metrics.register_histogram("event_loop_lag_seconds", "Olay döngüsü zamanlama gecikmesi.", self.loop_monitor.lag)
+        self.metrics_server = None
+        self.before_invoke(self._metrics_before_invoke)
+        self.after_invoke(self._metrics_after_invoke)
 
     async def setup_hook(self):
-        # Discord log handler'ını kur
-        if BOT_LOG_CHANNEL_ID:
-            self.discord_log_handler = DiscordLogHandler(self, int(BOT_LOG_CHANNEL_ID))
-            logger.addHandler(self.discord_log_handler)
+        # Olay döngüsü gecikme izleyicisini başlat
+        self.loop_monitor.start()
+
+        # Yapılandırma dosyalarını değişikliklere karşı izle
+        self.config_manager.start()
+
+        # Discord log handler'ını kur (log kanalı değişikliği yeniden başlatmada geçerli olur)
+        log_channel_id = self.settings.bot.bot_log_channel_id
+        if log_channel_id:
+            self.discord_log_handler = DiscordLogHandler(self, log_channel_id)
+            add_log_handler(self.discord_log_handler)
             self.discord_log_handler.start()
-            logger.info(f"Discord log handler'ı {BOT_LOG_CHANNEL_ID} kanalı için ayarlandı.")
+            logger.info(f"Discord log handler'ı {log_channel_id} kanalı için ayarlandı.")
 
-        # Merkezi veritabanı havuzunu oluştur
+        # Merkezi veritabanı havuzunu oluştur (tüm cog'lar bu havuzu ödünç alır)
         try:
-            self.db = await asyncpg.create_pool(dsn=os.getenv("DATABASE_URL"))
+            self.db = Database.from_env()
+            await self.db.connect()
             logger.info("Merkezi veritabanı havuzu başarıyla oluşturuldu.")
         except Exception as e:
             logger.critical(f"Merkezi veritabanı havuzu oluşturulamadı: {e}")
+            self.db = None
             await self.close()
             return
 
+        # Küme modundaysak başlatıcıya bağlan ve ortak işlemleri dinle
+        if self.cluster:
+            try:
+                await self.cluster.connect()
+                self.cluster.on("restart", self._on_cluster_restart)
+                self.cluster.on("shutdown", self._on_cluster_shutdown)
+            except Exception as e:
+                logger.error(f"Küme koordinasyon kanalına bağlanılamadı: {e}")
+                self.cluster = None
+
+        # Sunucu ayarlarını tek sorguyla belleğe al ve değişiklik bildirimlerini dinlemeye başla
+        try:
+            async with self.db.acquire() as conn:
+                await GuildSettingsStore.ensure_schema(conn)
+            await self.guild_settings.load(self.db)
+            await self.guild_settings.start_listener(self.db.dsn)
+        except Exception as e:
+            logger.error(f"Sunucu ayarları yüklenemedi, genel ayarlar kullanılacak: {e}")
+
+        # Prometheus metrik uç noktasını başlat
+        if METRICS_PORT:
+            port = METRICS_PORT + (int(CLUSTER_ID) if CLUSTER_ID is not None else 0)
+            try:
+                self.metrics_server = MetricsServer(self.metrics, METRICS_HOST, port)
+                await self.metrics_server.start()
+            except Exception as e:
+                logger.error(f"Metrik uç noktası başlatılamadı: {e}")
+                self.metrics_server = None
+
+        # Sıcak yeniden başlatmadan kalan durum varsa cog'lar eklendikçe geri yüklenir
+        self.restart_snapshot = consume_snapshot(SNAPSHOT_FILE)
+
         # Cog'ları yükle
         await self.load_all_extensions()
 
     async def close(self):
         logger.info("Bot kapatılıyor...")
+        # Cog'lar önce kaldırılır: kapanışta son XP boşaltması ve rol eşitleme kaydı
+        # merkezi havuzu, kümeyi ve sunucu ayarlarını kullanır
+        for name in tuple(self.extensions):
+            try:
+                await self.unload_extension(name)
+            except Exception as e:
+                logger.error(f"Eklenti kapatılırken hata ({name}): {type(e).__name__}: {e}")
         if self.discord_log_handler:
+            remove_log_handler(self.discord_log_handler)
+            await self.discord_log_handler.drain()
             self.discord_log_handler.close()
+        await self.guild_settings.close()
+        await self.config_manager.stop()
+        await self.loop_monitor.stop()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        if self.cluster:
+            await self.cluster.close()
+        await super().close()
+        # Havuz en son kapatılır
         if self.db:
             await self.db.close()
             logger.info("Merkezi veritabanı havuzu kapatıldı.")
-        await super().close()
 
     async def on_ready(self):
         logger.info("-" * 30)
         logger.info(f"Giriş yapıldı: {self.user.name} (ID: {self.user.id})")
         logger.info(f"Discord.py versiyonu: {discord.__version__}")
+        logger.info(f"Olay döngüsü: {loop_implementation()}")
         logger.info(f"{len(self.guilds)} sunucuda aktif.")
+        if self.ready_seconds is None:
+            # Yalnızca ilk hazır oluşta: yeniden bağlanmalar açılış süresini bozmasın
+            self.ready_seconds = time.time() - self.start_time
+            rss = process_rss_bytes()
+            logger.info(
+                f"Üye önbelleği politikası: {MEMBER_CACHE_POLICY} | Hazır olma süresi: {self.ready_seconds:.1f} sn | "
+                f"Önbellekteki üye: {self.cached_member_count()} | Bellek (RSS): {f'{rss / 1024 / 1024:.1f} MB' if rss else 'bilinmiyor'}"
+            )
+        if self.cluster:
+            logger.info(f"Küme #{self.cluster.cluster_id}/{self.cluster.cluster_count}, shard'lar: {self.cluster.shard_ids} (toplam {self.cluster.shard_count})")
         logger.info("-" * 30)
         await self.change_presence(activity=discord.Game(name=f"Yata Misaki"))
 
+    # --- Küme Koordinasyonu ---
+    async def stop_process(self, exit_code: int = 0):
+        """Botu kapatır ve süreç verilen çıkış koduyla sonlanır (launcher.py bu koda göre karar verir)."""
+        self.exit_code = exit_code
+        await self.close()
+
+    async def _on_cluster_restart(self, data: dict):
+        logger.info(f"Küme yeniden başlatma isteği alındı (gönderen küme: {data.get('requested_by')}).")
+        await self.restart_process()
+
+    # --- Sıcak Yeniden Başlatma ---
+    async def restart_process(self):
+        """Cog durumlarını diske yazar ve süreci yeniden başlatma koduyla kapatır."""
+        await self.save_restart_snapshot()
+        await self.stop_process(RESTART_EXIT_CODE)
+
+    async def save_restart_snapshot(self):
+        """
+        `snapshot_state` tanımlayan her cog'un durumunu toplar ve dosyaya yazar.
+
+        Cog'lar bu sırada yazma önbelleklerini boşaltır; yeni süreç aynı durumu
+        `restore_state` ile geri yükler.
+        """
+        states = {}
+        for name, cog in self.cogs.items():
+            snapshot_state = getattr(cog, "snapshot_state", None)
+            if snapshot_state is None:
+                continue
+            try:
+                states[name] = await snapshot_state()
+            except Exception:
+                logger.error(f"'{name}' cog'unun durumu kaydedilemedi.", exc_info=True)
+        try:
+            await asyncio.to_thread(write_snapshot, SNAPSHOT_FILE, states)
+            logger.info(f"Yeniden başlatma anlık görüntüsü yazıldı: {sorted(states)}")
+        except Exception:
+            logger.error("Yeniden başlatma anlık görüntüsü yazılamadı.", exc_info=True)
+
+    async def add_cog(self, cog: commands.Cog, /, **kwargs):
+        await super().add_cog(cog, **kwargs)
+        state = self.restart_snapshot.pop(cog.qualified_name, None)
+        if state is not None and hasattr(cog, "restore_state"):
+            self.loop.create_task(self._restore_cog_state(cog, state))
+
+    async def _restore_cog_state(self, cog: commands.Cog, state: dict):
+        try:
+            await cog.restore_state(state)
+            logger.info(f"'{cog.qualified_name}' cog'unun durumu önceki süreçten geri yüklendi.")
+        except Exception:
+            logger.error(f"'{cog.qualified_name}' cog'unun durumu geri yüklenemedi.", exc_info=True)
+
+    async def _on_cluster_shutdown(self, data: dict):
+        logger.info(f"Küme kapatma isteği alındı (gönderen küme: {data.get('requested_by')}).")
+        await self.stop_process(0)
+
+    # --- Yapılandırma ---
+    @property
+    def settings(self) -> Settings:
+        """Geçerli doğrulanmış ayarlar. Yeniden yüklemede nesne bütünüyle değişir."""
+        return self.config_manager.current
+
+    def _apply_settings(self, settings: Settings):
+        """Yeniden yüklenen ayarları botun ortak bileşenlerine uygular."""
+        self.config = settings.bot.raw
+        self.guild_settings.set_defaults(settings)
+
+    # --- Mesaj İşleme ---
+    async def get_prefix(self, message: discord.Message):
+        # on_message'da çözümlenen prefix, komut işlenirken yeniden hesaplanmaz
+        prefixes = self._message_prefixes.get(message.id)
+        if prefixes is not None:
+            return prefixes
+        return await super().get_prefix(message)
+
+    async def on_message(self, message: discord.Message):
+        """Mesajı bir kez sınıflandırır, abonelere dağıtır ve komutsa işler."""
+        if message.author.bot:
+            return
+        if message.guild:
+            # Sunucu ayarları bir kez okunur; prefix de buradan çözülür (get_prefix ile aynı sonuç)
+            guild_settings = await self.guild_settings.get(message.guild.id)
+            prefixes = commands.when_mentioned_or(guild_settings.prefix)(self, message)
+        else:
+            guild_settings = None
+            prefixes = await self.get_prefix(message)
+            if isinstance(prefixes, str):
+                prefixes = [prefixes]
+        ctx = self.message_pipeline.classify(message, prefixes, guild_settings)
+
+        if message.guild:
+            await self.message_pipeline.dispatch(ctx)
+        if ctx.is_command:
+            self._message_prefixes[message.id] = prefixes
+            try:
+                await self.process_commands(message)
+            finally:
+                self._message_prefixes.pop(message.id, None)
+
+    # --- Komut Metrikleri ---
+    async def _metrics_before_invoke(self, ctx: commands.Context):
+        # Grup komutlarında kanca hem grup hem alt komut için çalışır; başlangıçları komut adına göre tut.
+        if not hasattr(ctx, "metrics_started"):
+            ctx.metrics_started = {}
+        ctx.metrics_started[ctx.command.qualified_name] = time.perf_counter()
+        self.metrics.command_started(ctx.command.qualified_name)
+
+    async def _metrics_after_invoke(self, ctx: commands.Context):
+        started = getattr(ctx, "metrics_started", {}).pop(ctx.command.qualified_name, None)
+        if started is not None:
+            self.metrics.command_finished(ctx.command.qualified_name, time.perf_counter() - started)
+
+    def cached_member_count(self) -> int:
+        return sum(len(guild.members) for guild in self.guilds)
+
+    def _collect_runtime_metrics(self):
+        """Önbellek, veritabanı havuzu ve log kuyruğu sayaçlarını Prometheus örneklerine çevirir."""
+        cache = self.guild_settings.stats()
+        yield ("guild_settings_cache_hits_total", "counter", "Sunucu ayarları önbelleği isabetleri.", [({}, cache["hits"])])
+        yield ("guild_settings_cache_misses_total", "counter", "Sunucu ayarları önbelleği ıskalamaları.", [({}, cache["misses"])])
+        yield ("guild_settings_writes_total", "counter", "Sunucu ayarı yazımları.", [({}, cache["writes"])])
+        config_stats = self.config_manager.stats()
+        yield ("config_reloads_total", "counter", "Yapılandırma yeniden yüklemeleri.",
+               [({"result": "ok"}, config_stats["reloads"]), ({"result": "error"}, config_stats["failed_reloads"])])
+        if self.db:
+            db = self.db.stats()
+            yield ("db_pool_connections", "gauge", "Veritabanı havuzundaki bağlantılar.",
+                   [({"state": "in_use"}, db["in_use"]), ({"state": "idle"}, db["idle"])])
+            yield ("db_pool_acquisitions_total", "counter", "Havuzdan bağlantı ödünç alma sayısı.", [({}, db["acquisitions"])])
+            yield ("db_pool_contended_acquisitions_total", "counter", "Beklemeli bağlantı ödünç alma sayısı.", [({}, db["contended_acquisitions"])])
+            yield ("db_pool_acquire_timeouts_total", "counter", "Zaman aşımına uğrayan ödünç alma sayısı.", [({}, db["acquire_timeouts"])])
+        if self.discord_log_handler:
+            logs = self.discord_log_handler.stats()
+            yield ("discord_log_queued", "gauge", "Discord log kuyruğunda bekleyen kayıtlar.", [({}, logs["queued"])])
+            yield ("discord_log_dropped_total", "counter", "Kuyruk dolduğu için atılan log kayıtları.", [({}, logs["dropped"])])
+        leveling = self.get_cog("LevelingCog")
+        if leveling:
+            cooldowns = leveling.cooldowns.stats()
+            yield ("xp_cooldown_entries", "gauge", "Bellekteki XP bekleme süresi kayıtları.", [({}, cooldowns["size"])])
+            yield ("xp_cooldown_max_entries", "gauge", "XP bekleme süresi kayıt sınırı.", [({}, cooldowns["max_entries"])])
+            yield ("xp_cooldown_removed_total", "counter", "Silinen XP bekleme süresi kayıtları.",
+                   [({"reason": "expired"}, cooldowns["expired"]), ({"reason": "evicted"}, cooldowns["evicted"])])
+            journal = leveling.journal.stats()
+            yield ("xp_journal_appends_total", "counter", "XP günlüğüne eklenen artışlar.", [({}, journal["appended"])])
+            yield ("xp_journal_syncs_total", "counter", "XP günlüğü fsync sayısı.",
+                   [({"result": "ok"}, journal["syncs"]), ({"result": "error"}, journal["sync_errors"])])
+            yield ("xp_journal_pending_segments", "gauge", "Veritabanı onayı bekleyen günlük parçaları.", [({}, journal["sealed_segments"])])
+            pacer = leveling.role_pacer.stats()
+            yield ("level_role_changes_total", "counter", "Hız sınırlı seviye rolü değişiklikleri.",
+                   [({"result": "ok"}, pacer["applied"]), ({"result": "error"}, pacer["failed"])])
+            yield ("level_role_rate_limited_total", "counter", "Rol değişikliklerinde alınan 429 yanıtları.", [({}, pacer["rate_limited"])])
+            updates = leveling.role_updates.stats()
+            yield ("level_role_queue_pending", "gauge", "Rol güncellemesi bekleyen seviye atlayanlar.", [({}, updates["pending"])])
+            yield ("level_role_queue_dropped_total", "counter", "Kuyruk dolu olduğu için atılan rol güncellemeleri.", [({}, updates["dropped"])])
+            cards = leveling.rank_cards.stats()
+            yield ("rank_card_requests_total", "counter", "Seviye kartı istekleri.",
+                   [({"cache": "hit"}, cards["render_cache_hits"]), ({"cache": "miss"}, cards["rendered"])])
+            yield ("rank_card_render_seconds_total", "counter", "Seviye kartı çizimlerinde geçen toplam süre.", [({}, cards["render_seconds"])])
+            yield ("rank_card_avatar_fetches_total", "counter", "Seviye kartı avatar istekleri.",
+                   [({"cache": "hit"}, cards["avatar_cache_hits"]), ({"cache": "miss"}, cards["avatar_cache_misses"])])
+            if leveling.role_sync:
+                yield ("level_role_sync_running", "gauge", "Çalışan seviye rolü senkronizasyonları.",
+                       [({}, sum(1 for guild_id in leveling.role_sync.jobs if leveling.role_sync.is_running(guild_id)))])
+        yield ("event_loop_stalls_total", "counter", "Eşiği aşan olay döngüsü tıkanmaları.", [({}, self.loop_monitor.stall_count)])
+        yield ("cached_members", "gauge", "Önbellekteki üye sayısı.", [({"policy": MEMBER_CACHE_POLICY}, self.cached_member_count())])
+        rss = process_rss_bytes()
+        if rss:
+            yield ("process_resident_memory_bytes", "gauge", "Sürecin bellek kullanımı (RSS).", [({}, rss)])
+        if self.ready_seconds is not None:
+            yield ("startup_ready_seconds", "gauge", "Açılıştan ilk hazır olmaya kadar geçen süre.", [({"policy": MEMBER_CACHE_POLICY}, self.ready_seconds)])
+        yield ("guilds", "gauge", "Botun bulunduğu sunucu sayısı.", [({}, len(self.guilds))])
+        yield ("gateway_latency_seconds", "gauge", "Gateway gecikmesi.", [({}, self.latency)])
+
     async def on_command_error(self, ctx: commands.Context, error):
+        if ctx.command:
+            original = getattr(error, 'original', error)
+            self.metrics.command_failed(ctx.command.qualified_name, type(original).__name__)
         if hasattr(ctx.command, 'on_error'):
             return
         if isinstance(error, commands.CommandNotFound):
@@ -142,7 +620,9 @@ class YataMisakiBot(commands.Bot):
         if isinstance(error, commands.CommandOnCooldown):
             await ctx.send(f"⏳ Lütfen bu komutu tekrar kullanmadan önce {error.retry_after:.1f} saniye bekleyin.", delete_after=5)
         elif isinstance(error, commands.MissingRequiredArgument):
-            await ctx.send(f"❌ Eksik argüman: `{error.param.name}`. Yardım için `{DEFAULT_PREFIX}yardim {ctx.command.name}` yazın.")
+            await ctx.send(f"❌ Eksik argüman: `{error.param.name}`. Yardım için `{ctx.clean_prefix}yardim {ctx.command.name}` yazın.")
+        elif isinstance(error, commands.BadArgument):
+            await ctx.send(f"❌ Geçersiz argüman: {error}")
         elif isinstance(error, commands.CheckFailure):
             await ctx.send("❌ Bu komutu kullanma yetkiniz yok!")
         elif isinstance(error, commands.CommandInvokeError):
@@ -151,30 +631,92 @@ class YataMisakiBot(commands.Bot):
         else:
             logger.error(f"Beklenmedik bir komut hatası: {error}", exc_info=True)
 
+    @staticmethod
+    def discover_extensions() -> List[str]:
+        cogs_dir = BASE_DIR / "commands"
+        return sorted(
+            ".".join(path.relative_to(BASE_DIR).parts).replace(".py", "")
+            for path in cogs_dir.rglob("*.py")
+            if path.name != "__init__.py"
+        )
+
+    @staticmethod
+    def _extension_waves(names: List[str]) -> List[List[str]]:
+        """Eklentileri bağımlılıklarına göre katmanlara ayırır; aynı katmandakiler birbirinden bağımsızdır."""
+        pending = set(names)
+        waves = []
+        while pending:
+            wave = sorted(
+                name for name in pending
+                if not (EXTENSION_DEPENDENCIES.get(name, set()) & pending)
+            )
+            if not wave:
+                logger.error(f"Eklenti bağımlılıklarında döngü var, kalanlar sırayla yüklenecek: {sorted(pending)}")
+                wave = sorted(pending)
+            waves.append(wave)
+            pending.difference_update(wave)
+        return waves
+
+    async def _load_extension_timed(self, name: str) -> Tuple[str, float, bool]:
+        start = time.perf_counter()
+        try:
+            await self.load_extension(name)
+            ok = True
+        except Exception:
+            logger.error(f"'{name}' yüklenemedi.", exc_info=True)
+            ok = False
+        return name, (time.perf_counter() - start) * 1000, ok
+
+    @staticmethod
+    def _log_extension_report(title: str, results: List[Tuple[str, float, bool]], wall_ms: float):
+        """Eklenti başına içe aktarma + setup süresini tablo halinde loglar."""
+        width = max((len(name) for name, _, _ in results), default=10)
+        lines = [f"{title} ({len(results)} eklenti, toplam {wall_ms:.1f} ms):"]
+        for name, elapsed_ms, ok in sorted(results, key=lambda r: r[1], reverse=True):
+            lines.append(f"  {name:<{width}}  {elapsed_ms:8.1f} ms  {'OK' if ok else 'HATA'}")
+        logger.info("\n".join(lines))
+
     async def load_all_extensions(self):
         logger.info("-" * 30)
         logger.info("Cog'lar yükleniyor...")
-        cogs_dir = BASE_DIR / "commands"
-        for path in cogs_dir.rglob("*.py"):
-            if path.name != "__init__.py":
-                extension_path = ".".join(path.relative_to(BASE_DIR).parts).replace(".py", "")
-                try:
-                    await self.load_extension(extension_path)
-                    logger.info(f"'{extension_path}' başarıyla yüklendi.")
-                except Exception:
-                    logger.error(f"'{extension_path}' yüklenemedi.", exc_info=True)
+        names = self.discover_extensions()
+        eager = [name for name in names if name not in DEFERRED_EXTENSIONS]
+        deferred = [name for name in names if name in DEFERRED_EXTENSIONS]
+
+        start = time.perf_counter()
+        results = []
+        for wave in self._extension_waves(eager):
+            results.extend(await asyncio.gather(*(self._load_extension_timed(name) for name in wave)))
+        self._log_extension_report("Başlangıç eklentileri yüklendi", results, (time.perf_counter() - start) * 1000)
+
+        if deferred:
+            self.loop.create_task(self._load_deferred_extensions(deferred))
         logger.info("-" * 30)
 
+    async def _load_deferred_extensions(self, names: List[str]):
+        await self.wait_until_ready()
+        start = time.perf_counter()
+        results = []
+        for wave in self._extension_waves(names):
+            results.extend(await asyncio.gather(*(self._load_extension_timed(name) for name in wave)))
+        self._log_extension_report("Ertelenmiş eklentiler yüklendi", results, (time.perf_counter() - start) * 1000)
+
 # --- Bot Başlatma ---
 intents = discord.Intents.default()
 intents.members = True
 intents.message_content = True
 
+shard_options = {}
+if SHARD_COUNT:
+    shard_options = {"shard_count": SHARD_COUNT, "shard_ids": SHARD_IDS}
+
 bot = YataMisakiBot(
     command_prefix=get_prefix,
     intents=intents,
     help_command=None,
-    case_insensitive=True
+    case_insensitive=True,
+    **member_cache_options(MEMBER_CACHE_POLICY),
+    **shard_options
 )
 
 async def main():
@@ -187,7 +729,14 @@ async def main():
         logger.critical("Bot başlatılırken kritik bir hata oluştu!", exc_info=True)
 
 if __name__ == "__main__":
+    install_loop_policy(LOOP_IMPL)
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Bot manuel olarak durduruldu.")
+    finally:
+        log_listener.stop()
+    if bot.exit_code == RESTART_EXIT_CODE and CLUSTER_ID is None:
+        # Tek süreçte yeniden başlatmayı yapacak bir başlatıcı yok; süreç kendini yeniden çalıştırır.
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+    sys.exit(bot.exit_code)
@@ -0,0 +1,3 @@
+# utils/__init__.py
+# Bot genelinde paylaşılan altyapı (önbellekler, veritabanı katmanı vb.).
+# Not: Bu klasör bilerek 'commands/' dışında tutulur; oradaki her .py dosyası eklenti olarak yüklenir.
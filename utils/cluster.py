@@ -0,0 +1,114 @@
+# utils/cluster.py
+import asyncio
+import json
+import logging
+import os
+from typing import Awaitable, Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+# Çocuk süreç bu kodla çıkarsa başlatıcı (launcher.py) onu yeniden başlatır
+RESTART_EXIT_CODE = 75
+DEFAULT_IPC_HOST = "127.0.0.1"
+DEFAULT_IPC_PORT = 47820
+
+Handler = Callable[[dict], Awaitable[None]]
+
+
+def encode(op: str, data: Optional[dict] = None, **extra) -> bytes:
+    """Küme mesajını satır sonlu JSON olarak kodlar."""
+    return (json.dumps({"op": op, "data": data or {}, **extra}, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class ClusterClient:
+    """
+    Bir küme sürecinin başlatıcıyla konuştuğu yerel koordinasyon kanalı.
+
+    Mesajlar satır başına bir JSON nesnesidir: {"op": ..., "data": {...}}.
+    `broadcast` ile gönderilen mesaj başlatıcı tarafından gönderen dahil bütün
+    kümelere iletilir; her küme kayıtlı handler'ları çalıştırır.
+    """
+
+    def __init__(self, cluster_id: int, cluster_count: int, shard_ids: List[int], shard_count: int,
+                 host: str = DEFAULT_IPC_HOST, port: int = DEFAULT_IPC_PORT):
+        self.cluster_id = cluster_id
+        self.cluster_count = cluster_count
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.host = host
+        self.port = port
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["ClusterClient"]:
+        """Başlatıcı tarafından ayarlanan çevresel değişkenlerden istemci oluşturur; küme modu kapalıysa None döner."""
+        cluster_id = os.getenv("CLUSTER_ID")
+        if cluster_id is None:
+            return None
+        shard_ids = [int(s) for s in os.getenv("SHARD_IDS", "").split(",") if s.strip()]
+        return cls(
+            cluster_id=int(cluster_id),
+            cluster_count=int(os.getenv("CLUSTER_COUNT", "1")),
+            shard_ids=shard_ids,
+            shard_count=int(os.getenv("SHARD_COUNT", "1")),
+            host=os.getenv("CLUSTER_IPC_HOST", DEFAULT_IPC_HOST),
+            port=int(os.getenv("CLUSTER_IPC_PORT", str(DEFAULT_IPC_PORT))),
+        )
+
+    def on(self, op: str, handler: Handler):
+        """Belirli bir işlem kodu için handler kaydeder."""
+        self._handlers.setdefault(op, []).append(handler)
+
+    def off(self, op: str, handler: Handler):
+        handlers = self._handlers.get(op, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._writer.write(encode("hello", {"cluster_id": self.cluster_id}))
+        await self._writer.drain()
+        self._task = asyncio.get_running_loop().create_task(self._read_loop())
+        log.info(f"Küme #{self.cluster_id} başlatıcıya bağlandı ({self.host}:{self.port}), shard'lar: {self.shard_ids}")
+
+    async def broadcast(self, op: str, **data):
+        """Mesajı tüm kümelere (kendisi dahil) iletilmek üzere başlatıcıya gönderir."""
+        if not self._writer:
+            raise RuntimeError("Küme koordinasyon kanalı bağlı değil.")
+        self._writer.write(encode("broadcast", data, target_op=op, origin=self.cluster_id))
+        await self._writer.drain()
+
+    async def _read_loop(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    log.warning(f"Küme #{self.cluster_id}: başlatıcı bağlantısı kapandı.")
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    log.error(f"Küme #{self.cluster_id}: geçersiz koordinasyon mesajı alındı: {line!r}")
+                    continue
+                for handler in self._handlers.get(message.get("op"), []):
+                    asyncio.get_running_loop().create_task(self._run_handler(handler, message.get("data", {})))
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._writer = None
+
+    async def _run_handler(self, handler: Handler, data: dict):
+        try:
+            await handler(data)
+        except Exception:
+            log.error(f"Küme #{self.cluster_id}: koordinasyon handler'ı hata verdi.", exc_info=True)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+        if self._writer:
+            self._writer.close()
+            self._writer = None
@@ -0,0 +1,398 @@
+# utils/config.py
+import asyncio
+import copy
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+
+import discord
+
+from utils.leveling_curve import CURVES, DEFAULT_CURVE
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PREFIX = "!"
+DEFAULT_EMBED_COLOR = 0xFF0000
+WATCH_INTERVAL = 5.0  # Dosya değişikliği kontrol aralığı (saniye)
+
+# Hoş geldin mesajında bağlantısı verilen kanallar (yapılandırma anahtarı sırasıyla)
+WELCOME_LINK_KEYS = (
+    "RULES_CHANNEL_ID",
+    "COLOR_ROLE_CHANNEL_ID",
+    "GENERAL_ROLES_CHANNEL_ID",
+    "EVENTS_CHANNEL_ID",
+    "GIVEAWAYS_CHANNEL_ID",
+    "PARTNERSHIP_RULES_CHANNEL_ID",
+)
+
+LEVELING_DEFAULTS = {
+    "xp_range": {"min": 5, "max": 10},
+    "xp_cooldown_seconds": 60,
+    "level_roles": {},
+    "blacklisted_channels": [],
+    "xp_boosts": {},
+    "congratulations_channel_id": None,
+    "level_curve": DEFAULT_CURVE, # utils/leveling_curve.CURVES içindeki bir eğri adı
+    "level_up_digest_limit": 20, # Bir boşaltmada tek tek adı yazılan en fazla seviye atlayan
+    "rank_card": False, # `seviye` görsel kartla mı yanıtlasın (Pillow gerekir)
+    "stack_roles": False # Rollerin yığılıp yığılmayacağı
+}
+
+
+class ConfigError(Exception):
+    """Yapılandırma dosyası okunamadığında veya geçerli JSON olmadığında fırlatılır."""
+
+
+@dataclass(frozen=True)
+class BotSettings:
+    """config.json'ın doğrulanmış hali; ID'ler int, renkler discord.Color olarak gelir."""
+    prefix: str = DEFAULT_PREFIX
+    bot_log_channel_id: Optional[int] = None
+    welcome_channel_id: Optional[int] = None
+    partner_channel_id: Optional[int] = None
+    bot_role_id: Optional[int] = None
+    welcome_role_id: Optional[int] = None
+    welcome_embed_color: discord.Color = field(default_factory=lambda: discord.Color(DEFAULT_EMBED_COLOR))
+    welcome_image_url: str = ""
+    partner_image_url: str = ""
+    welcome_links: Dict[str, str] = field(default_factory=dict)  # Anahtar -> hazır kanal bahsi (<#id>)
+    raw: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+
+@dataclass(frozen=True)
+class LevelingSettings:
+    """leveling_config.json'ın doğrulanmış hali."""
+    xp_min: int = 5
+    xp_max: int = 10
+    cooldown_seconds: float = 60.0
+    level_roles: Tuple[Tuple[int, int], ...] = ()  # (seviye, rol ID), seviyeye göre sıralı
+    stack_roles: bool = False
+    blacklisted_channels: FrozenSet[int] = frozenset()
+    xp_boosts: Dict[int, float] = field(default_factory=dict)  # Rol ID -> yüzde
+    congratulations_channel_id: Optional[int] = None
+    level_curve: str = DEFAULT_CURVE
+    level_up_digest_limit: int = 20
+    rank_card: bool = False
+    raw: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+
+@dataclass(frozen=True)
+class Settings:
+    bot: BotSettings
+    leveling: LevelingSettings
+    problems: Tuple[str, ...] = ()  # Doğrulamada varsayılana düşülen alanlar
+    loaded_at: float = field(default_factory=time.time)
+
+
+# --- Doğrulama ---
+class _Validator:
+    """Hatalı alanları varsayılana düşürür ve her sorunu kaydeder."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.problems: List[str] = []
+
+    def problem(self, key: str, message: str):
+        self.problems.append(f"{self.source}: '{key}' {message}")
+
+    def snowflake(self, data: dict, key: str) -> Optional[int]:
+        raw = data.get(key)
+        if raw is None or raw == "":
+            return None
+        if isinstance(raw, bool):
+            self.problem(key, f"geçerli bir ID değil: {raw!r}")
+            return None
+        try:
+            value = int(raw)
+        except (TypeError, ValueError):
+            self.problem(key, f"geçerli bir ID değil: {raw!r}")
+            return None
+        if value <= 0:
+            self.problem(key, f"geçerli bir ID değil: {raw!r}")
+            return None
+        return value
+
+    def color(self, data: dict, key: str, default: int) -> discord.Color:
+        raw = data.get(key)
+        if raw is None:
+            return discord.Color(default)
+        if isinstance(raw, int) and not isinstance(raw, bool):
+            value = raw
+        elif isinstance(raw, str):
+            text = raw.strip().lower()
+            for prefix in ("0x", "#"):
+                if text.startswith(prefix):
+                    text = text[len(prefix):]
+                    break
+            try:
+                value = int(text, 16)
+            except ValueError:
+                self.problem(key, f"geçersiz hex renk: {raw!r}, varsayılan kullanılıyor")
+                return discord.Color(default)
+        else:
+            self.problem(key, f"geçersiz renk tipi: {type(raw).__name__}")
+            return discord.Color(default)
+        if not 0 <= value <= 0xFFFFFF:
+            self.problem(key, f"renk aralık dışında: {raw!r}")
+            return discord.Color(default)
+        return discord.Color(value)
+
+    def string(self, data: dict, key: str, default: str = "") -> str:
+        raw = data.get(key, default)
+        if raw is None:
+            return default
+        if not isinstance(raw, str):
+            self.problem(key, f"metin olmalı, {type(raw).__name__} bulundu")
+            return default
+        return raw
+
+    def channel_mention(self, data: dict, key: str, default: str = "#?") -> str:
+        """Kanal ID'sini hazır bir bahse (<#id>) çevirir; '#kanal' gibi düz metinler olduğu gibi kalır."""
+        raw = data.get(key)
+        if raw is None or raw == "":
+            return default
+        if isinstance(raw, str) and raw.startswith("#"):
+            return raw
+        channel_id = self.snowflake(data, key)
+        return f"<#{channel_id}>" if channel_id else default
+
+    def number(self, data: dict, key: str, default: Union[int, float], minimum: float = 0, cast=int):
+        raw = data.get(key, default)
+        if isinstance(raw, bool):
+            self.problem(key, f"sayı olmalı: {raw!r}")
+            return default
+        try:
+            value = cast(raw)
+        except (TypeError, ValueError):
+            self.problem(key, f"sayı olmalı: {raw!r}")
+            return default
+        if value < minimum:
+            self.problem(key, f"en az {minimum} olmalı: {raw!r}")
+            return default
+        return value
+
+
+def parse_bot_settings(data: dict, validator: _Validator) -> BotSettings:
+    prefix = validator.string(data, "PREFIX", DEFAULT_PREFIX)
+    if not prefix.strip():
+        validator.problem("PREFIX", "boş olamaz")
+        prefix = DEFAULT_PREFIX
+    return BotSettings(
+        prefix=prefix,
+        bot_log_channel_id=validator.snowflake(data, "BOT_LOG_CHANNEL_ID"),
+        welcome_channel_id=validator.snowflake(data, "WELCOME_CHANNEL_ID"),
+        partner_channel_id=validator.snowflake(data, "PARTNER_CHANNEL_ID"),
+        bot_role_id=validator.snowflake(data, "BOT_ROLE_ID"),
+        welcome_role_id=validator.snowflake(data, "WELCOME_ROLE_ID"),
+        welcome_embed_color=validator.color(data, "WELCOME_EMBED_COLOR", DEFAULT_EMBED_COLOR),
+        welcome_image_url=validator.string(data, "WELCOME_IMAGE_URL"),
+        partner_image_url=validator.string(data, "PARTNER_IMAGE_URL"),
+        welcome_links={key: validator.channel_mention(data, key) for key in WELCOME_LINK_KEYS},
+        raw=data,
+    )
+
+
+def parse_leveling_settings(data: dict, validator: _Validator) -> LevelingSettings:
+    merged = copy.deepcopy(LEVELING_DEFAULTS)
+    merged.update(data)
+
+    xp_range = merged.get("xp_range")
+    if not isinstance(xp_range, dict):
+        validator.problem("xp_range", "{'min': .., 'max': ..} biçiminde olmalı")
+        xp_range = LEVELING_DEFAULTS["xp_range"]
+    xp_min = validator.number(xp_range, "min", LEVELING_DEFAULTS["xp_range"]["min"])
+    xp_max = validator.number(xp_range, "max", LEVELING_DEFAULTS["xp_range"]["max"])
+    if xp_min > xp_max:
+        validator.problem("xp_range", f"min ({xp_min}) max'tan ({xp_max}) büyük olamaz")
+        xp_min, xp_max = LEVELING_DEFAULTS["xp_range"]["min"], LEVELING_DEFAULTS["xp_range"]["max"]
+
+    level_roles = []
+    raw_roles = merged.get("level_roles") or {}
+    if not isinstance(raw_roles, dict):
+        validator.problem("level_roles", "seviye -> rol ID eşlemesi olmalı")
+        raw_roles = {}
+    for level_str, role_id in raw_roles.items():
+        try:
+            level = int(level_str)
+        except (TypeError, ValueError):
+            validator.problem("level_roles", f"geçersiz seviye: {level_str!r}")
+            continue
+        role = validator.snowflake({f"level_roles.{level_str}": role_id}, f"level_roles.{level_str}")
+        if role:
+            level_roles.append((level, role))
+    level_roles.sort()
+
+    blacklisted = set()
+    for index, channel_id in enumerate(merged.get("blacklisted_channels") or []):
+        parsed = validator.snowflake({f"blacklisted_channels[{index}]": channel_id}, f"blacklisted_channels[{index}]")
+        if parsed:
+            blacklisted.add(parsed)
+
+    xp_boosts = {}
+    for role_id, percent in (merged.get("xp_boosts") or {}).items():
+        key = f"xp_boosts.{role_id}"
+        parsed = validator.snowflake({key: role_id}, key)
+        boost = validator.number({key: percent}, key, 0.0, cast=float)
+        if parsed and boost:
+            xp_boosts[parsed] = boost
+
+    level_curve = validator.string(merged, "level_curve", DEFAULT_CURVE)
+    if level_curve not in CURVES:
+        validator.problem("level_curve", f"bilinmeyen eğri: {level_curve!r} (geçerli: {', '.join(CURVES)})")
+        level_curve = DEFAULT_CURVE
+
+    return LevelingSettings(
+        xp_min=xp_min,
+        xp_max=xp_max,
+        cooldown_seconds=validator.number(merged, "xp_cooldown_seconds", 60.0, cast=float),
+        level_roles=tuple(level_roles),
+        stack_roles=bool(merged.get("stack_roles")),
+        blacklisted_channels=frozenset(blacklisted),
+        xp_boosts=xp_boosts,
+        congratulations_channel_id=validator.snowflake(merged, "congratulations_channel_id"),
+        level_curve=level_curve,
+        level_up_digest_limit=validator.number(merged, "level_up_digest_limit", LEVELING_DEFAULTS["level_up_digest_limit"], minimum=1),
+        rank_card=bool(merged.get("rank_card")),
+        raw=merged,
+    )
+
+
+def _read_json(path: Path) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        raise ConfigError(f"{path.name} bulunamadı.")
+    except (OSError, json.JSONDecodeError) as e:
+        raise ConfigError(f"{path.name} okunamadı: {e}")
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path.name} bir JSON nesnesi içermeli.")
+    return data
+
+
+Listener = Callable[[Settings], Union[None, Awaitable[None]]]
+
+
+class ConfigManager:
+    """
+    config.json ve leveling_config.json'ı bir kez ayrıştırıp tek bir `Settings` nesnesinde tutar.
+
+    Ayarlar değişmezdir (frozen); yeniden yüklemede yeni bir nesne kurulur ve
+    `current` tek atamayla değiştirilir. Okuyanlar ya eski ya yeni ayarları
+    bütünüyle görür. Dosyalar `WATCH_INTERVAL` aralığıyla izlenir; değişiklik
+    görüldüğünde (veya `reload` çağrıldığında) kayıtlı dinleyicilere haber verilir.
+    Bozuk bir dosya yeniden yüklemeyi iptal eder, mevcut ayarlar korunur.
+    """
+
+    def __init__(self, bot_path: Path, leveling_path: Path, watch_interval: float = WATCH_INTERVAL):
+        self.bot_path = Path(bot_path)
+        self.leveling_path = Path(leveling_path)
+        self.watch_interval = watch_interval
+        self.current = Settings(BotSettings(), parse_leveling_settings({}, _Validator(self.leveling_path.name)))
+        self._listeners: List[Listener] = []
+        self._mtimes: Tuple[Optional[int], Optional[int]] = (None, None)
+        self._watch_task: Optional[asyncio.Task] = None
+        self.reloads = 0
+        self.failed_reloads = 0
+
+    # --- Yükleme ---
+    def _build(self) -> Settings:
+        bot_validator = _Validator(self.bot_path.name)
+        leveling_validator = _Validator(self.leveling_path.name)
+        bot_data = _read_json(self.bot_path)
+        # Seviye dosyası yoksa varsayılanlar kullanılır (seviye sistemi dosyayı ilk kayıtta oluşturur)
+        leveling_data = _read_json(self.leveling_path) if self.leveling_path.exists() else {}
+        return Settings(
+            bot=parse_bot_settings(bot_data, bot_validator),
+            leveling=parse_leveling_settings(leveling_data, leveling_validator),
+            problems=tuple(bot_validator.problems + leveling_validator.problems),
+        )
+
+    def load(self) -> Settings:
+        """Başlangıç yüklemesi: dosya okunamazsa varsayılanlarla devam eder."""
+        self._mtimes = self._stat()
+        try:
+            self.current = self._build()
+        except ConfigError as e:
+            log.error(f"Yapılandırma yüklenemedi, varsayılanlar kullanılıyor (prefix '{DEFAULT_PREFIX}'): {e}")
+            return self.current
+        for problem in self.current.problems:
+            log.warning(f"Yapılandırma: {problem}")
+        return self.current
+
+    async def reload(self) -> Settings:
+        """Dosyaları yeniden okur ve ayarları atomik olarak değiştirir. Bozuk dosyada ConfigError fırlatır."""
+        self._mtimes = self._stat()
+        try:
+            settings = self._build()
+        except ConfigError as e:
+            self.failed_reloads += 1
+            log.error(f"Yapılandırma yeniden yüklenemedi, mevcut ayarlar korunuyor: {e}")
+            raise
+        self.current = settings
+        self.reloads += 1
+        for problem in settings.problems:
+            log.warning(f"Yapılandırma: {problem}")
+        log.info(f"Yapılandırma yeniden yüklendi ({len(settings.problems)} uyarı).")
+
+        for listener in list(self._listeners):
+            try:
+                result = listener(settings)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception:
+                log.error(f"Yapılandırma dinleyicisi '{getattr(listener, '__qualname__', listener)}' hata verdi.", exc_info=True)
+        return settings
+
+    # --- Dinleyiciler ---
+    def add_listener(self, listener: Listener):
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    # --- Dosya İzleme ---
+    def _stat(self) -> Tuple[Optional[int], Optional[int]]:
+        def mtime(path: Path) -> Optional[int]:
+            try:
+                return os.stat(path).st_mtime_ns
+            except OSError:
+                return None
+        return mtime(self.bot_path), mtime(self.leveling_path)
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            if self._stat() == self._mtimes:
+                continue
+            try:
+                await self.reload()
+            except ConfigError:
+                pass  # Hata kaydedildi; dosya tekrar değişene kadar yeniden denenmez
+
+    def start(self):
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.get_running_loop().create_task(self._watch())
+
+    async def stop(self):
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "reloads": self.reloads,
+            "failed_reloads": self.failed_reloads,
+            "loaded_at": self.current.loaded_at,
+            "problems": len(self.current.problems),
+        }
@@ -0,0 +1,111 @@
+# utils/cooldowns.py
+import heapq
+import math
+from typing import Dict, Iterator, List, Tuple
+
+DEFAULT_MAX_ENTRIES = 500_000  # Kayıt başına ~150 bayt; en fazla ~75 MB
+DEFAULT_RESOLUTION = 1.0       # Zaman çarkı dilim genişliği (saniye)
+
+_USER_BITS = 64
+_USER_MASK = (1 << _USER_BITS) - 1
+
+
+def _pack(guild_id: int, user_id: int) -> int:
+    """(sunucu, kullanıcı) çiftini tek bir tamsayı anahtara çevirir; demetten daha az yer kaplar."""
+    return (guild_id << _USER_BITS) | user_id
+
+
+class CooldownStore:
+    """
+    (sunucu, kullanıcı) başına süresi dolan bekleme süreleri; sınırlı bellekli zaman çarkı.
+
+    Her anahtar için yalnızca bekleme süresinin bittiği an tutulur, bu yüzden kontrol
+    tek bir sözlük okumasıdır (O(1)). Anahtarlar ayrıca bitiş anlarına göre
+    `resolution` genişliğinde dilimlere konur; süresi dolan dilimler ara sıra
+    bütün olarak silinir, böylece bir daha yazmayan kullanıcılar bellekte kalmaz.
+
+    Kayıt sayısı `max_entries`'i aşarsa bitişine en az süre kalan dilimler erkenden
+    atılır (tahliye). Bu kullanıcılar bekleme süresini birkaç saniye erken tamamlamış
+    olur; bellek ise hiçbir durumda sınırı aşmaz.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, resolution: float = DEFAULT_RESOLUTION):
+        self.max_entries = max_entries
+        self.resolution = resolution
+        self._expiry: Dict[int, float] = {}       # anahtar -> bekleme süresinin bittiği an
+        self._slots: Dict[int, List[int]] = {}    # dilim numarası -> o dilimde biten anahtarlar
+        self._slot_heap: List[int] = []           # dolu dilim numaraları (en erken bitiş başta)
+        self._next_sweep = 0.0
+        # İstatistikler
+        self.expired = 0   # Süresi dolduğu için silinen kayıtlar
+        self.evicted = 0   # Bellek sınırı yüzünden erken silinen kayıtlar
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def try_acquire(self, guild_id: int, user_id: int, cooldown: float, now: float) -> bool:
+        """Bekleme süresi dolmuşsa yeni süreyi başlatıp True, dolmamışsa False döndürür."""
+        if now >= self._next_sweep:
+            self._sweep(now)
+        key = _pack(guild_id, user_id)
+        if self._expiry.get(key, 0.0) > now:
+            return False
+        self._arm(key, now + cooldown)
+        return True
+
+    def restore(self, guild_id: int, user_id: int, expires_at: float):
+        """Anlık görüntüden gelen bir bekleme süresini geri yükler."""
+        self._arm(_pack(guild_id, user_id), expires_at)
+
+    def items(self, now: float) -> Iterator[Tuple[int, int, float]]:
+        """Hâlâ geçerli olan (sunucu, kullanıcı, bitiş anı) kayıtları."""
+        for key, expires_at in self._expiry.items():
+            if expires_at > now:
+                yield key >> _USER_BITS, key & _USER_MASK, expires_at
+
+    def clear(self):
+        self._expiry.clear()
+        self._slots.clear()
+        self._slot_heap.clear()
+
+    def _arm(self, key: int, expires_at: float):
+        self._expiry[key] = expires_at
+        slot = math.floor(expires_at / self.resolution)
+        keys = self._slots.get(slot)
+        if keys is None:
+            keys = self._slots[slot] = []
+            heapq.heappush(self._slot_heap, slot)
+        keys.append(key)
+        if len(self._expiry) > self.max_entries:
+            self._evict()
+
+    def _drop_slot(self, slot: int) -> int:
+        """Dilimdeki, hâlâ bu dilimde biten anahtarları siler (sonradan yeniden kurulanlar kalır)."""
+        removed = 0
+        for key in self._slots.pop(slot, ()):
+            expires_at = self._expiry.get(key)
+            if expires_at is not None and math.floor(expires_at / self.resolution) == slot:
+                del self._expiry[key]
+                removed += 1
+        return removed
+
+    def _sweep(self, now: float):
+        current = math.floor(now / self.resolution)
+        while self._slot_heap and self._slot_heap[0] < current:
+            self.expired += self._drop_slot(heapq.heappop(self._slot_heap))
+        self._next_sweep = (current + 1) * self.resolution
+
+    def _evict(self):
+        # Sınırın biraz altına inilir; her yeni kayıtta tahliye tetiklenmesin
+        target = self.max_entries - max(1, self.max_entries // 100)
+        while self._slot_heap and len(self._expiry) > target:
+            self.evicted += self._drop_slot(heapq.heappop(self._slot_heap))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._expiry),
+            "max_entries": self.max_entries,
+            "slots": len(self._slots),
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
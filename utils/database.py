@@ -0,0 +1,136 @@
+# utils/database.py
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import asyncpg
+
+log = logging.getLogger(__name__)
+
+# Havuz bağlantısı beklemesi bu süreyi aşarsa "çekişmeli" sayılır (saniye)
+CONTENDED_WAIT_THRESHOLD = 0.010
+
+
+class Database:
+    """
+    Tüm cog'ların paylaştığı tek asyncpg havuzu etrafındaki veri erişim katmanı.
+
+    Havuzun sahibi bottur (`bot.db`); cog'lar yalnızca ödünç alır, kapatmaz.
+    Hazırlanmış sorgular asyncpg'nin bağlantı başına LRU önbelleğinde tutulur:
+    aynı SQL metni bir bağlantıda ikinci kez çalıştığında yeniden hazırlanmaz.
+    Önbellek boyutu `statement_cache_size` ile ayarlanır.
+    """
+
+    def __init__(self, dsn: str, *, min_size: int = 2, max_size: int = 10,
+                 statement_cache_size: int = 512, max_cached_statement_lifetime: int = 0,
+                 command_timeout: Optional[float] = 60.0):
+        if min_size > max_size:
+            raise ValueError(f"Havuz boyutu geçersiz: min_size ({min_size}) > max_size ({max_size})")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.max_cached_statement_lifetime = max_cached_statement_lifetime
+        self.command_timeout = command_timeout
+        self.pool: Optional[asyncpg.Pool] = None
+
+        # Bağlantı bekleme metrikleri
+        self.acquisitions = 0
+        self.contended_acquisitions = 0
+        self.acquire_timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @classmethod
+    def from_env(cls) -> "Database":
+        """Ayarları çevresel değişkenlerden okur (DATABASE_URL, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_STATEMENT_CACHE_SIZE)."""
+        dsn = os.getenv("DATABASE_URL")
+        if not dsn:
+            raise ValueError("DATABASE_URL çevresel değişkeni eksik.")
+        return cls(
+            dsn,
+            min_size=int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", "512")),
+        )
+
+    async def connect(self):
+        self.pool = await asyncpg.create_pool(
+            dsn=self.dsn,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            statement_cache_size=self.statement_cache_size,
+            max_cached_statement_lifetime=self.max_cached_statement_lifetime,
+            command_timeout=self.command_timeout,
+        )
+        log.info(f"Veritabanı havuzu oluşturuldu (min={self.min_size}, max={self.max_size}, sorgu önbelleği={self.statement_cache_size}).")
+
+    async def close(self):
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+
+    # --- Bağlantı Ödünç Alma ---
+    @contextlib.asynccontextmanager
+    async def acquire(self, timeout: Optional[float] = None) -> AsyncIterator[asyncpg.Connection]:
+        """Havuzdan bir bağlantı ödünç alır ve bekleme süresini ölçer."""
+        start = time.perf_counter()
+        try:
+            conn = await self.pool.acquire(timeout=timeout)
+        except asyncio.TimeoutError:
+            self.acquire_timeouts += 1
+            raise
+        self._record_wait(time.perf_counter() - start)
+        try:
+            yield conn
+        finally:
+            await self.pool.release(conn)
+
+    def _record_wait(self, waited: float):
+        self.acquisitions += 1
+        self.total_wait += waited
+        if waited > self.max_wait:
+            self.max_wait = waited
+        if waited >= CONTENDED_WAIT_THRESHOLD:
+            self.contended_acquisitions += 1
+
+    # --- Kısa Yollar ---
+    async def fetch(self, query: str, *args, timeout: Optional[float] = None) -> List[asyncpg.Record]:
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args, timeout=timeout)
+
+    async def fetchrow(self, query: str, *args, timeout: Optional[float] = None) -> Optional[asyncpg.Record]:
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args, timeout=timeout)
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout: Optional[float] = None) -> Any:
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args, column=column, timeout=timeout)
+
+    async def execute(self, query: str, *args, timeout: Optional[float] = None) -> str:
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args, timeout=timeout)
+
+    async def executemany(self, command: str, args, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.executemany(command, args, timeout=timeout)
+
+    # --- Metrikler ---
+    def stats(self) -> Dict[str, Any]:
+        size = self.pool.get_size() if self.pool else 0
+        idle = self.pool.get_idle_size() if self.pool else 0
+        return {
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "acquisitions": self.acquisitions,
+            "contended_acquisitions": self.contended_acquisitions,
+            "acquire_timeouts": self.acquire_timeouts,
+            "avg_wait_ms": (self.total_wait / self.acquisitions * 1000) if self.acquisitions else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+        }
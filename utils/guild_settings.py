@@ -0,0 +1,444 @@
+# utils/guild_settings.py
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, FrozenSet, Optional, Set, Tuple
+
+import asyncpg
+
+from utils.config import Settings
+from utils.database import Database
+from utils.leveling_curve import LevelCurve, get_curve
+
+log = logging.getLogger(__name__)
+
+# guild_settings tablosunda bir satır değiştiğinde tetikleyicinin bildirim gönderdiği kanal
+NOTIFY_CHANNEL = "guild_settings_changed"
+
+# Sütun -> Postgres tipi. Tüm sütunlar boş bırakılabilir; NULL "genel ayarı kullan" demektir.
+COLUMNS: Dict[str, str] = {
+    "prefix": "TEXT",
+    "partner_channel_id": "BIGINT",
+    "welcome_channel_id": "BIGINT",
+    "welcome_role_id": "BIGINT",
+    "welcome_message": "TEXT",
+    "xp_min": "INTEGER",
+    "xp_max": "INTEGER",
+    "xp_cooldown_seconds": "REAL",
+    "level_roles": "JSONB",
+    "stack_roles": "BOOLEAN",
+    "blacklisted_channels": "BIGINT[]",
+    "congratulations_channel_id": "BIGINT",
+    "level_curve": "TEXT",
+    "level_up_digest_limit": "INTEGER",
+    "rank_card": "BOOLEAN",
+}
+_SELECT_COLUMNS = ", ".join(COLUMNS)
+
+
+@dataclass(frozen=True)
+class GuildOverrides:
+    """Bir sunucunun guild_settings satırı; None olan alanlar genel ayardan gelir."""
+    prefix: Optional[str] = None
+    partner_channel_id: Optional[int] = None
+    welcome_channel_id: Optional[int] = None
+    welcome_role_id: Optional[int] = None
+    welcome_message: Optional[str] = None
+    xp_min: Optional[int] = None
+    xp_max: Optional[int] = None
+    xp_cooldown_seconds: Optional[float] = None
+    level_roles: Optional[Tuple[Tuple[int, int], ...]] = None  # (seviye, rol ID), seviyeye göre sıralı
+    stack_roles: Optional[bool] = None
+    blacklisted_channels: Optional[FrozenSet[int]] = None
+    congratulations_channel_id: Optional[int] = None
+    level_curve: Optional[str] = None
+    level_up_digest_limit: Optional[int] = None
+    rank_card: Optional[bool] = None
+
+    @classmethod
+    def from_row(cls, row) -> "GuildOverrides":
+        values = {name: row[name] for name in COLUMNS}
+        if values["level_roles"] is not None:
+            raw = values["level_roles"]
+            raw = json.loads(raw) if isinstance(raw, str) else raw
+            values["level_roles"] = tuple(sorted((int(level), int(role_id)) for level, role_id in raw.items()))
+        if values["blacklisted_channels"] is not None:
+            values["blacklisted_channels"] = frozenset(values["blacklisted_channels"])
+        return cls(**values)
+
+    def is_empty(self) -> bool:
+        return all(getattr(self, f.name) is None for f in fields(self))
+
+
+def _to_db(name: str, value: Any) -> Any:
+    """Bellek içi değeri sütunun veritabanı biçimine çevirir."""
+    if value is None:
+        return None
+    if name == "level_roles":
+        return json.dumps({str(level): role_id for level, role_id in value})
+    if name == "blacklisted_channels":
+        return sorted(value)
+    return value
+
+
+@dataclass(frozen=True)
+class GuildSettings:
+    """Bir sunucu için çözümlenmiş, kullanıma hazır ayarlar (satır + genel varsayılanlar)."""
+    guild_id: int
+    prefix: str
+    partner_channel_id: Optional[int]
+    welcome_channel_id: Optional[int]
+    welcome_role_id: Optional[int]
+    welcome_message: Optional[str]
+    xp_min: int
+    xp_max: int
+    cooldown_seconds: float
+    level_roles: Tuple[Tuple[int, int], ...]
+    stack_roles: bool
+    blacklisted_channels: FrozenSet[int]
+    congratulations_channel_id: Optional[int]
+    level_curve: str
+    level_up_digest_limit: int
+    rank_card: bool
+    overrides: GuildOverrides = field(default_factory=GuildOverrides, repr=False)
+
+    @property
+    def curve(self) -> LevelCurve:
+        return get_curve(self.level_curve)
+
+
+def resolve(guild_id: int, overrides: GuildOverrides, defaults: Settings) -> GuildSettings:
+    def pick(value, default):
+        return default if value is None else value
+
+    bot, leveling = defaults.bot, defaults.leveling
+    return GuildSettings(
+        guild_id=guild_id,
+        prefix=pick(overrides.prefix, bot.prefix),
+        partner_channel_id=pick(overrides.partner_channel_id, bot.partner_channel_id),
+        welcome_channel_id=pick(overrides.welcome_channel_id, bot.welcome_channel_id),
+        welcome_role_id=pick(overrides.welcome_role_id, bot.welcome_role_id),
+        welcome_message=overrides.welcome_message,
+        xp_min=pick(overrides.xp_min, leveling.xp_min),
+        xp_max=pick(overrides.xp_max, leveling.xp_max),
+        cooldown_seconds=pick(overrides.xp_cooldown_seconds, leveling.cooldown_seconds),
+        level_roles=pick(overrides.level_roles, leveling.level_roles),
+        stack_roles=pick(overrides.stack_roles, leveling.stack_roles),
+        blacklisted_channels=pick(overrides.blacklisted_channels, leveling.blacklisted_channels),
+        congratulations_channel_id=pick(overrides.congratulations_channel_id, leveling.congratulations_channel_id),
+        level_curve=pick(overrides.level_curve, leveling.level_curve),
+        level_up_digest_limit=pick(overrides.level_up_digest_limit, leveling.level_up_digest_limit),
+        rank_card=pick(overrides.rank_card, leveling.rank_card),
+        overrides=overrides,
+    )
+
+
+class GuildSettingsStore:
+    """
+    Sunucu başına ayarları (prefix, partner/hoş geldin kanalları, XP ayarları) bellekte tutan depo.
+
+    Başlangıçta guild_settings tablosunun tamamı tek sorguyla yüklenir; mesaj yolu
+    yalnızca bellekten okur. Satırda boş bırakılan alanlar config.json ve
+    leveling_config.json'daki genel ayarlardan gelir. Çözümlenmiş ayarlar sunucu
+    başına önbelleğe alınır ve genel ayarlar yenilendiğinde yeniden hesaplanır.
+
+    Yönetici değişiklikleri `update` ile önce veritabanına yazılır, ardından bellek
+    güncellenir (write-through). Başka süreçlerden veya elle SQL ile yapılan
+    değişiklikler Postgres LISTEN/NOTIFY ile ilgili sunucuyu bayat olarak işaretler;
+    bir sonraki istek satırı arka planda yeniden okutur ve o sırada bellekteki
+    ayarlarla yanıtlanır. Bayat kayıtlar için veritabanına tek bir yükleme görevi
+    gider; aynı anda gelen istekler bu görevi beklemez.
+    """
+
+    def __init__(self, defaults: Settings):
+        self._defaults = defaults
+        self._overrides: Dict[int, GuildOverrides] = {}
+        self._resolved: Dict[int, GuildSettings] = {}
+        self._stale: Set[int] = set()
+        self._loaded = False      # Bellekte en az bir kez yüklenmiş tablo var mı
+        self._all_stale = False   # Dinleyici koptu vb.; tablonun tamamı yeniden yüklenecek
+        self._load_task: Optional[asyncio.Task] = None
+        self._refreshing: Dict[int, asyncio.Task] = {}
+        # Yazım sayacı: `update` sonucu, yazımdan önce başlamış bir yüklemenin eski satırıyla ezilmesin
+        self._generation = 0
+        self._written: Dict[int, int] = {}
+        self._pool: Optional[Database] = None
+        self._listen_conn: Optional[asyncpg.Connection] = None
+        self._dsn: Optional[str] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closing = False
+        # Kendi yazdığımız satırların bildirimleri (sunucu süreci PID'i, guild_id); bunlar için satır yeniden okunmaz
+        self._own_writes: Set[Tuple[int, int]] = set()
+        # İstatistikler: mesaj işleme yolunun havuza dokunup dokunmadığını doğrulamak için
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.writes = 0
+
+    # --- Şema ---
+    @staticmethod
+    async def ensure_schema(conn: asyncpg.Connection):
+        """guild_settings tablosunu, eksik sütunları ve değişiklik bildirimi tetikleyicisini oluşturur."""
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS guild_settings (
+                guild_id BIGINT PRIMARY KEY,
+                prefix TEXT
+            )
+        """)
+        # Eski kurulumlarda yalnızca prefix sütunu vardır
+        await conn.execute(
+            "ALTER TABLE guild_settings " +
+            ", ".join(f"ADD COLUMN IF NOT EXISTS {name} {sql_type}" for name, sql_type in COLUMNS.items())
+        )
+        # Tabloya hangi yoldan yazılırsa yazılsın (bot, elle SQL, başka bir süreç) önbellekler haberdar olur.
+        await conn.execute(f"""
+            CREATE OR REPLACE FUNCTION notify_guild_settings_changed() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('{NOTIFY_CHANNEL}', COALESCE(NEW.guild_id, OLD.guild_id)::text);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        await conn.execute("DROP TRIGGER IF EXISTS guild_settings_notify ON guild_settings")
+        await conn.execute("""
+            CREATE TRIGGER guild_settings_notify
+            AFTER INSERT OR UPDATE OR DELETE ON guild_settings
+            FOR EACH ROW EXECUTE PROCEDURE notify_guild_settings_changed()
+        """)
+
+    # --- Yükleme ---
+    async def load(self, pool: Database):
+        """Tüm sunucu ayarlarını tek sorguyla belleğe alır; süren bir yükleme varsa onu bekler."""
+        self._pool = pool
+        task = self._load_task
+        if task is None or task.done():
+            task = self._load_task = asyncio.get_running_loop().create_task(self._load())
+        await asyncio.shield(task)
+
+    def _reload_in_background(self):
+        if self._load_task is None or self._load_task.done():
+            self._load_task = asyncio.get_running_loop().create_task(self._load())
+            self._load_task.add_done_callback(self._log_failure)
+
+    async def _load(self):
+        started = self._generation
+        stale = set(self._stale)
+        # Yükleme sürerken gelen tam geçersiz kılma yeni bir yüklemeyi tetiklesin
+        self._all_stale = False
+        try:
+            rows = await self._pool.fetch(f"SELECT guild_id, {_SELECT_COLUMNS} FROM guild_settings")
+        except Exception:
+            self._all_stale = True
+            raise
+        overrides = {}
+        for row in rows:
+            try:
+                overrides[row['guild_id']] = GuildOverrides.from_row(row)
+            except (TypeError, ValueError) as e:
+                log.error(f"Sunucu ayarları okunamadı, genel ayarlar kullanılacak (Sunucu: {row['guild_id']}): {e}")
+        # Yükleme başladıktan sonra `update` ile yazılan sunucuların bellekteki değeri daha yenidir
+        for guild_id, generation in self._written.items():
+            if generation > started:
+                if guild_id in self._overrides:
+                    overrides[guild_id] = self._overrides[guild_id]
+                else:
+                    overrides.pop(guild_id, None)
+        self._overrides = overrides
+        self._resolved.clear()
+        # Yükleme sırasında gelen bildirimler bayat kalır
+        self._stale -= stale
+        self._loaded = True
+        log.info(f"Sunucu ayarları yüklendi: {len(self._overrides)} sunucu için özel ayar bulundu.")
+
+    async def _refresh(self, guild_id: int):
+        """Tek bir sunucunun satırını veritabanından yeniler."""
+        started = self._generation
+        self._stale.discard(guild_id)
+        try:
+            row = await self._pool.fetchrow(f"SELECT guild_id, {_SELECT_COLUMNS} FROM guild_settings WHERE guild_id = $1", guild_id)
+        except Exception:
+            self._stale.add(guild_id)
+            raise
+        finally:
+            self._refreshing.pop(guild_id, None)
+        if self._written.get(guild_id, 0) > started:
+            return  # Bu sırada `update` daha yeni satırı yazdı
+        self._store(guild_id, GuildOverrides.from_row(row) if row else None)
+
+    def _refresh_in_background(self, guild_id: int):
+        if guild_id not in self._refreshing:
+            task = self._refreshing[guild_id] = asyncio.get_running_loop().create_task(self._refresh(guild_id))
+            task.add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            log.error(f"Sunucu ayarları yenilenemedi: {task.exception()}")
+
+    def _store(self, guild_id: int, overrides: Optional[GuildOverrides]):
+        if overrides is None or overrides.is_empty():
+            self._overrides.pop(guild_id, None)
+        else:
+            self._overrides[guild_id] = overrides
+        self._resolved.pop(guild_id, None)
+        self._stale.discard(guild_id)
+
+    def set_defaults(self, defaults: Settings):
+        """Genel ayarlar yenilendiğinde çağrılır; çözümlenmiş ayarlar yeniden hesaplanır."""
+        self._defaults = defaults
+        self._resolved.clear()
+
+    # --- Okuma ---
+    def cached(self, guild_id: int) -> GuildSettings:
+        """Veritabanına gitmeden bellekteki ayarları döndürür (bayat olsa bile)."""
+        settings = self._resolved.get(guild_id)
+        if settings is None:
+            settings = self._resolved[guild_id] = resolve(guild_id, self._overrides.get(guild_id, GuildOverrides()), self._defaults)
+        return settings
+
+    async def get(self, guild_id: int) -> GuildSettings:
+        """
+        Sunucunun ayarlarını döndürür. Depo yüklüyse veritabanına gidilmez; bayat kayıtlar
+        arka planda yenilenirken bellekteki ayarlar döner.
+        """
+        if self._loaded and not self._all_stale and guild_id not in self._stale:
+            self.hits += 1
+            return self.cached(guild_id)
+
+        self.misses += 1
+        if not self._pool:
+            return self.cached(guild_id)
+        if not self._loaded:
+            # Henüz hiç yüklenmedi: ilk yüklemeyi (tüm istekler aynı görevi) bekle
+            try:
+                await self.load(self._pool)
+            except Exception as e:
+                log.error(f"Sunucu ayarları yüklenemedi (Sunucu: {guild_id}): {e}")
+        elif self._all_stale:
+            self._reload_in_background()
+        else:
+            self._refresh_in_background(guild_id)
+        return self.cached(guild_id)
+
+    async def get_prefix(self, guild_id: int) -> str:
+        return (await self.get(guild_id)).prefix
+
+    # --- Yazma ---
+    async def update(self, guild_id: int, **changes) -> GuildSettings:
+        """
+        Verilen alanları veritabanına yazar ve belleği hemen günceller (None = genel ayara dön).
+
+        Örnek: `await store.update(guild_id, prefix="?", xp_cooldown_seconds=30)`
+        """
+        unknown = set(changes) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Bilinmeyen sunucu ayarı: {', '.join(sorted(unknown))}")
+        if not self._pool:
+            raise RuntimeError("Sunucu ayarları deposu veritabanına bağlı değil.")
+
+        names = list(changes)
+        placeholders = ", ".join(
+            f"${i}::jsonb" if name == "level_roles" else f"${i}" for i, name in enumerate(names, start=2)
+        )
+        assignments = ", ".join(f"{name} = EXCLUDED.{name}" for name in names)
+        query = (
+            f"INSERT INTO guild_settings (guild_id, {', '.join(names)}) VALUES ($1, {placeholders}) "
+            f"ON CONFLICT (guild_id) DO UPDATE SET {assignments} "
+            f"RETURNING guild_id, {_SELECT_COLUMNS}"
+        )
+        async with self._pool.acquire() as conn:
+            # Tetikleyici bu yazım için de bildirim gönderir; kendi yazımımızı tanıyıp satırı yeniden okumayız
+            own_write = (conn.get_server_pid(), guild_id) if self._listen_conn else None
+            if own_write:
+                self._own_writes.add(own_write)
+            try:
+                row = await conn.fetchrow(query, guild_id, *(_to_db(name, changes[name]) for name in names))
+            except Exception:
+                self._own_writes.discard(own_write)
+                raise
+        self.writes += 1
+        self._generation += 1
+        self._written[guild_id] = self._generation
+        self._store(guild_id, GuildOverrides.from_row(row))
+        return self.cached(guild_id)
+
+    async def reset(self, guild_id: int, *names: str) -> GuildSettings:
+        """Verilen alanları (hiçbiri verilmezse tümünü) genel ayara döndürür."""
+        return await self.update(guild_id, **{name: None for name in (names or COLUMNS)})
+
+    # --- Geçersiz Kılma ---
+    def invalidate(self, guild_id: Optional[int] = None):
+        """Bir sunucunun (veya guild_id verilmezse tümünün) kaydını bayat olarak işaretler."""
+        self.invalidations += 1
+        if guild_id is None:
+            self._all_stale = True
+        else:
+            self._stale.add(guild_id)
+
+    # --- LISTEN/NOTIFY ---
+    async def start_listener(self, dsn: str):
+        """Diğer süreçlerden/SQL'den gelen değişiklikleri dinlemek için ayrı bir bağlantı açar."""
+        self._dsn = dsn
+        try:
+            self._listen_conn = await asyncpg.connect(dsn)
+            await self._listen_conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+            self._listen_conn.add_termination_listener(self._on_listener_lost)
+            log.info(f"Sunucu ayarları deposu '{NOTIFY_CHANNEL}' kanalını dinliyor.")
+        except Exception as e:
+            log.error(f"Sunucu ayarları dinleyicisi başlatılamadı: {e}")
+            self._listen_conn = None
+            self._schedule_reconnect()
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            guild_id = int(payload)
+        except (TypeError, ValueError):
+            self.invalidate()
+            return
+        if (pid, guild_id) in self._own_writes:
+            self._own_writes.discard((pid, guild_id))
+            return
+        self.invalidate(guild_id)
+
+    def _on_listener_lost(self, connection):
+        if self._closing:
+            return
+        log.warning("Sunucu ayarları dinleyici bağlantısı koptu. Depo yenilenecek ve yeniden bağlanılacak.")
+        # Bağlantı kopukken kaçırılan bildirimler olabilir; tamamını bayat say.
+        self.invalidate()
+        self._own_writes.clear()
+        self._listen_conn = None
+        self._schedule_reconnect()
+
+    def _schedule_reconnect(self):
+        if self._closing or (self._reconnect_task and not self._reconnect_task.done()):
+            return
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 5
+        while not self._closing and self._listen_conn is None:
+            await asyncio.sleep(delay)
+            await self.start_listener(self._dsn)
+            delay = min(delay * 2, 300)
+
+    async def close(self):
+        self._closing = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+        for task in [self._load_task, *self._refreshing.values()]:
+            if task and not task.done():
+                task.cancel()
+        if self._listen_conn:
+            await self._listen_conn.close()
+            self._listen_conn = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "writes": self.writes,
+            "cached_guilds": len(self._overrides),
+        }
@@ -0,0 +1,67 @@
+# utils/leveling_curve.py
+import bisect
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+MAX_LEVEL = 1000  # Eşik tablosunun üst sınırı; bu seviyeden sonra XP son seviyede birikir
+DEFAULT_CURVE = "varsayilan"
+
+
+@dataclass(frozen=True)
+class LevelCurve:
+    """
+    Bir seviye eğrisi: seviye L için gereken XP `a*L² + b*L + c`.
+
+    Seviye 1..MAX_LEVEL için kümülatif XP tablosu bir kez hesaplanır; toplam XP'den
+    seviye ve seviye içi ilerleme bu tablo üzerinde ikili arama ile bulunur. Veritabanında
+    yalnızca total_xp gerçek veridir, seviye ve seviye içi XP her zaman eğriden türetilir.
+    """
+    name: str
+    description: str
+    a: int
+    b: int
+    c: int
+    thresholds: Tuple[int, ...] = field(init=False, repr=False, compare=False)  # thresholds[L-1]: L'ye ulaşmak için kümülatif XP
+
+    def __post_init__(self):
+        total, thresholds = 0, []
+        for level in range(1, MAX_LEVEL + 1):
+            total += self.xp_for_level(level)
+            thresholds.append(total)
+        object.__setattr__(self, "thresholds", tuple(thresholds))
+
+    def xp_for_level(self, level: int) -> int:
+        """Bir önceki seviyeden `level` seviyesine geçmek için gereken XP."""
+        return self.a * level * level + self.b * level + self.c
+
+    def cumulative(self, level: int) -> int:
+        """`level` seviyesine ulaşmak için gereken toplam XP (seviye 0 için 0)."""
+        return self.thresholds[min(level, MAX_LEVEL) - 1] if level > 0 else 0
+
+    def level_for(self, total_xp: int) -> int:
+        return bisect.bisect_right(self.thresholds, total_xp)
+
+    def progress(self, total_xp: int) -> Tuple[int, int, int]:
+        """Toplam XP'den (seviye, seviye içi XP, sonraki seviye için gereken XP) döndürür."""
+        level = self.level_for(total_xp)
+        return level, total_xp - self.cumulative(level), self.xp_for_level(level + 1)
+
+    def levels_for(self, totals: Iterable[int]) -> List[int]:
+        """Toplu yeniden hesaplama: her toplam XP için seviyeyi tek geçişte bulur."""
+        thresholds = self.thresholds
+        return [bisect.bisect_right(thresholds, total_xp) for total_xp in totals]
+
+
+CURVES: Dict[str, LevelCurve] = {
+    curve.name: curve for curve in (
+        LevelCurve(DEFAULT_CURVE, "Varsayılan eğri (50L² + 100L + 200)", 50, 100, 200),
+        LevelCurve("kolay", "Yarı yarıya daha az XP (25L² + 50L + 100)", 25, 50, 100),
+        LevelCurve("zor", "İki kat daha fazla XP (100L² + 200L + 400)", 100, 200, 400),
+        LevelCurve("dogrusal", "Her seviye sabit artışla (300L + 200)", 0, 300, 200),
+    )
+}
+
+
+def get_curve(name: str) -> LevelCurve:
+    """Adı verilen eğriyi döndürür; bilinmeyen adlar için varsayılan eğri kullanılır."""
+    return CURVES.get(name) or CURVES[DEFAULT_CURVE]
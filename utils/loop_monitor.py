@@ -0,0 +1,158 @@
+# utils/loop_monitor.py
+import asyncio
+import bisect
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from utils.metrics import Histogram
+
+log = logging.getLogger(__name__)
+
+# Olay döngüsü gecikmesi için daha ince kovalar (saniye)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Stall:
+    """Eşiği aşan tek bir döngü tıkanması ve (yakalanabildiyse) o anki yığın örneği."""
+
+    __slots__ = ("started_at", "duration", "stack")
+
+    def __init__(self, started_at: float, duration: float, stack: Optional[List[str]]):
+        self.started_at = started_at  # time.time()
+        self.duration = duration      # saniye
+        self.stack = stack
+
+    @property
+    def location(self) -> str:
+        """Yığının en üstündeki (döngüyü tutan) çerçeve; yığın yakalanamadıysa '?'."""
+        return self.stack[-1].strip().splitlines()[0] if self.stack else "?"
+
+
+class LoopMonitor:
+    """
+    Olay döngüsünün zamanlama gecikmesini sürekli ölçer.
+
+    Döngü üzerinde düzenli uyanan bir kalp atışı görevi, planlanan ve gerçek
+    uyanma zamanı arasındaki farkı kaydeder. Ayrı bir bekçi thread'i son kalp
+    atışının ne kadar geciktiğine bakar; döngü eşikten uzun süre takılı kalırsa
+    döngü thread'inin o anki yığınını `sys._current_frames()` ile örnekler.
+    En kötü tıkanmalar yığınlarıyla birlikte saklanır.
+    """
+
+    def __init__(self, interval: float = 0.25, threshold: float = 0.1, keep: int = 10):
+        self.interval = interval
+        self.threshold = threshold
+        self.keep = keep
+        self.lag = Histogram(LAG_BUCKETS)
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.stall_count = 0
+        self.worst: List[Stall] = []  # Süreye göre azalan sırada
+        self._last_beat = time.monotonic()
+        self._pending_stack: Optional[List[str]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watchdog, name="loop-monitor", daemon=True)
+        self._thread.start()
+        log.info(f"Olay döngüsü izleyicisi başlatıldı (aralık {self.interval * 1000:.0f}ms, eşik {self.threshold * 1000:.0f}ms, döngü: {loop_implementation()}).")
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # --- Döngü Tarafı ---
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._last_beat = now
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.lag.observe(lag)
+            if lag >= self.threshold:
+                self._record_stall(lag)
+
+    def _record_stall(self, lag: float):
+        with self._lock:
+            stack, self._pending_stack = self._pending_stack, None
+        self.stall_count += 1
+        stall = Stall(time.time() - lag, lag, stack)
+        durations = [-s.duration for s in self.worst]
+        index = bisect.bisect_right(durations, -lag)
+        if index < self.keep:
+            self.worst.insert(index, stall)
+            del self.worst[self.keep:]
+        log.warning(f"Olay döngüsü {lag * 1000:.0f}ms boyunca tıkandı. Konum: {stall.location}")
+
+    # --- Bekçi Thread'i ---
+    def _watchdog(self):
+        check_every = max(self.threshold / 2, 0.01)
+        sampled_beat = None
+        while not self._stop.wait(check_every):
+            beat = self._last_beat
+            overdue = time.monotonic() - beat - self.interval
+            # Her tıkanma için yalnızca bir örnek al; döngü tıkanıklığın ortasındayken yığın suçluyu gösterir.
+            if overdue >= self.threshold and sampled_beat != beat:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    stack = traceback.format_stack(frame, limit=15)
+                    with self._lock:
+                        self._pending_stack = stack
+                sampled_beat = beat
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "last_lag_ms": self.last_lag * 1000,
+            "max_lag_ms": self.max_lag * 1000,
+            "p50_ms": self.lag.quantile(0.50) * 1000,
+            "p99_ms": self.lag.quantile(0.99) * 1000,
+            "stalls": self.stall_count,
+            "threshold_ms": self.threshold * 1000,
+        }
+
+
+def loop_implementation() -> str:
+    """Çalışan olay döngüsünün türünü döndürür (ör. 'uvloop' ya da 'asyncio')."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return "?"
+    return type(loop).__module__.split(".")[0]
+
+
+def install_loop_policy(name: str) -> str:
+    """
+    LOOP_IMPL ayarına göre olay döngüsü politikasını kurar; kurulan türü döndürür.
+
+    'uvloop' istenip paket yüklü değilse (veya Windows'taysak) standart asyncio döngüsüyle devam edilir.
+    """
+    if name == "uvloop":
+        try:
+            import uvloop
+        except ImportError:
+            log.warning("LOOP_IMPL=uvloop ayarlı ancak uvloop yüklü değil. Standart asyncio döngüsü kullanılacak.")
+            return "asyncio"
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return "uvloop"
+    return "asyncio"
@@ -0,0 +1,146 @@
+# utils/members.py
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import discord
+
+log = logging.getLogger(__name__)
+
+# full: tüm üyeler açılışta yüklenir (discord.py varsayılanı)
+# on_demand: açılışta yükleme yok; bir sunucunun tam listesi gerektiğinde o sunucu bir kez yüklenir ve önbellekte kalır
+# voice: yalnızca ses kanalındaki üyeler önbellekte tutulur; gereken üyeler her seferinde Discord'dan sorgulanır
+MEMBER_CACHE_POLICIES = ("full", "on_demand", "voice")
+QUERY_BATCH_SIZE = 100  # query_members(user_ids=...) tek istekte en fazla 100 ID kabul eder
+# voice politikasında sunucu/rol sayımlarının tüm listeyi yeniden indirmeden kullanıldığı süre (sn)
+MEMBER_COUNTS_TTL = int(os.getenv("MEMBER_COUNTS_TTL", "600"))
+
+
+def member_cache_options(policy: str) -> Dict:
+    """Politikaya karşılık gelen Bot(...) anahtar argümanlarını döndürür."""
+    if policy == "voice":
+        return {"member_cache_flags": discord.MemberCacheFlags(voice=True, joined=False), "chunk_guilds_at_startup": False}
+    if policy == "on_demand":
+        return {"member_cache_flags": discord.MemberCacheFlags.all(), "chunk_guilds_at_startup": False}
+    return {"member_cache_flags": discord.MemberCacheFlags.all(), "chunk_guilds_at_startup": True}
+
+
+@dataclass(frozen=True)
+class MemberCounts:
+    """`sunucu` ve `rolbilgi` komutlarının ihtiyaç duyduğu özet; üye listesini tutmaz."""
+    online: int
+    humans: int
+    bots: int
+    roles: Dict[int, int]  # rol ID'si -> üye sayısı
+
+    @classmethod
+    def from_members(cls, members: Iterable[discord.Member]) -> "MemberCounts":
+        online = humans = bots = 0
+        roles = Counter()
+        for member in members:
+            if member.status != discord.Status.offline:
+                online += 1
+            if member.bot:
+                bots += 1
+            else:
+                humans += 1
+            roles.update(role.id for role in member.roles)
+        return cls(online, humans, bots, dict(roles))
+
+
+class MemberResolver:
+    """
+    Cog'ların üye listesine erişimi için ortak nokta.
+
+    Önbellekte bulunan üyeler doğrudan döndürülür; bulunmayanlar politikaya göre
+    Discord'dan sorgulanır. Böylece cog'lar üyelerin önbellekte olduğunu varsaymaz.
+    """
+
+    def __init__(self, policy: str):
+        self.policy = policy
+        # voice politikasında sorgulanan üyeler önbelleğe eklenmez (bellek sınırlı kalır)
+        self.cache = policy != "voice"
+        self._chunking: Dict[int, asyncio.Task] = {}
+        self._counts: Dict[int, Tuple[float, MemberCounts]] = {}
+        self.chunk_requests = 0
+        self.queried_members = 0
+
+    async def all_members(self, guild: discord.Guild) -> List[discord.Member]:
+        """Sunucunun tam üye listesini döndürür; gerekirse sunucuyu bir kez yükler."""
+        if guild.chunked:
+            return list(guild.members)
+        # Aynı sunucu için eşzamanlı istekler tek bir chunk isteğini paylaşır
+        task = self._chunking.get(guild.id)
+        if task is None:
+            self.chunk_requests += 1
+            task = asyncio.get_running_loop().create_task(guild.chunk(cache=self.cache))
+            self._chunking[guild.id] = task
+            task.add_done_callback(lambda _: self._chunking.pop(guild.id, None))
+        members = await asyncio.shield(task)
+        return list(guild.members) if self.cache else members
+
+    async def member_counts(self, guild: discord.Guild) -> MemberCounts:
+        """
+        Çevrimiçi/insan/bot ve rol başına üye sayılarını döndürür.
+
+        voice politikasında yüklenen liste önbelleğe girmediği için sayımlar
+        MEMBER_COUNTS_TTL boyunca saklanır; her komut tüm üye listesini yeniden indirmez.
+        """
+        if not self.cache:
+            entry = self._counts.get(guild.id)
+            if entry and time.monotonic() - entry[0] < MEMBER_COUNTS_TTL:
+                return entry[1]
+        counts = MemberCounts.from_members(await self.all_members(guild))
+        if not self.cache:
+            self._counts[guild.id] = (time.monotonic(), counts)
+        return counts
+
+    async def resolve(self, guild: discord.Guild, user_ids: Iterable[int]) -> Dict[int, discord.Member]:
+        """Verilen ID'lerden sunucuda bulunanları döndürür; önbellekte olmayanları toplu sorgular."""
+        found: Dict[int, discord.Member] = {}
+        missing = []
+        for user_id in user_ids:
+            member = guild.get_member(user_id)
+            if member:
+                found[user_id] = member
+            else:
+                missing.append(user_id)
+
+        if missing and not guild.chunked:
+            for start in range(0, len(missing), QUERY_BATCH_SIZE):
+                batch = missing[start:start + QUERY_BATCH_SIZE]
+                try:
+                    members = await guild.query_members(user_ids=batch, limit=len(batch), cache=self.cache)
+                except (asyncio.TimeoutError, discord.HTTPException) as e:
+                    log.warning(f"{guild.id}: {len(batch)} üye sorgulanamadı: {e}")
+                    continue
+                self.queried_members += len(members)
+                found.update((member.id, member) for member in members)
+        return found
+
+    async def get(self, guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+        return (await self.resolve(guild, [user_id])).get(user_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {"chunk_requests": self.chunk_requests, "queried_members": self.queried_members}
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Sürecin bellekte kapladığı alanı (RSS) döndürür; ölçülemiyorsa None."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # ru_maxrss anlık değil en yüksek değerdir; Linux'ta KB, macOS'ta bayt cinsindendir
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,81 @@
+# utils/message_pipeline.py
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+import discord
+
+from utils.guild_settings import GuildSettings
+
+log = logging.getLogger(__name__)
+
+
+class MessageContext:
+    """Bir mesaj için bir kez hesaplanan ve tüm abonelere verilen sınıflandırma."""
+
+    __slots__ = ("message", "prefixes", "settings", "is_command", "in_partner_channel", "xp_blacklisted")
+
+    def __init__(self, message: discord.Message, prefixes: List[str], settings: Optional[GuildSettings],
+                 is_command: bool, in_partner_channel: bool, xp_blacklisted: bool):
+        self.message = message
+        self.prefixes = prefixes              # get_prefix sonucu (bahsetme dahil)
+        self.settings = settings              # Sunucunun çözümlenmiş ayarları (DM'de None)
+        self.is_command = is_command          # Mesaj bir prefix ile başlıyor mu
+        self.in_partner_channel = in_partner_channel
+        self.xp_blacklisted = xp_blacklisted  # XP verilmeyen kanalda mı
+
+    @property
+    def guild_id(self) -> int:
+        return self.message.guild.id
+
+
+Subscriber = Callable[[MessageContext], Awaitable[None]]
+
+
+class MessagePipeline:
+    """
+    Sunucu mesajlarını bir kez sınıflandırıp abone cog'lara dağıtan ortak ön işleme hattı.
+
+    Bot ve DM kontrolü, prefix çözümlemesi ve kanal ayarları burada mesaj başına
+    bir kez yapılır. Kanal ayarları sunucu başına `GuildSettings` üzerinden okunur;
+    cog'lar ayrı ayrı on_message dinleyicisi tanımlamak yerine
+    `subscribe` ile kaydolur ve hazır `MessageContext` alır.
+    """
+
+    def __init__(self):
+        self.subscribers: List[Subscriber] = []
+
+    # --- Abonelik ---
+    def subscribe(self, handler: Subscriber):
+        if handler not in self.subscribers:
+            self.subscribers.append(handler)
+
+    def unsubscribe(self, handler: Subscriber):
+        if handler in self.subscribers:
+            self.subscribers.remove(handler)
+
+    # --- Sınıflandırma ve Dağıtım ---
+    def classify(self, message: discord.Message, prefixes: List[str],
+                 settings: Optional[GuildSettings]) -> MessageContext:
+        channel_id = message.channel.id
+        return MessageContext(
+            message=message,
+            prefixes=prefixes,
+            settings=settings,
+            is_command=message.content.startswith(tuple(prefixes)),
+            in_partner_channel=settings is not None and channel_id == settings.partner_channel_id,
+            xp_blacklisted=settings is not None and channel_id in settings.blacklisted_channels,
+        )
+
+    async def dispatch(self, ctx: MessageContext):
+        """
+        Mesajı abonelere sırayla iletir; bir abonenin hatası diğerlerini etkilemez.
+
+        Aboneler mesaj başına görev açmaz: ilgisiz mesajlarda hemen döndükleri için
+        sıralı çağrı, her mesajda görev oluşturup zamanlamaktan çok daha ucuzdur.
+        Uzun sürecek işi olan abone bunu kendi görevine taşımalıdır.
+        """
+        for handler in self.subscribers:
+            try:
+                await handler(ctx)
+            except Exception:
+                log.error(f"Mesaj abonesi '{getattr(handler, '__qualname__', handler)}' hata verdi.", exc_info=True)
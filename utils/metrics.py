@@ -0,0 +1,187 @@
+# utils/metrics.py
+import bisect
+import logging
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+
+log = logging.getLogger(__name__)
+
+# Saniye cinsinden histogram kovaları (Prometheus varsayılanlarına yakın)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Bir toplayıcının döndürdüğü örnek: (metrik adı, tip, yardım metni, [(etiketler, değer), ...])
+Sample = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+class Histogram:
+    """Sabit kovalı gecikme histogramı; yüzdelikler kovalardan doğrusal interpolasyonla tahmin edilir."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Son kova: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Prometheus'un histogram_quantile fonksiyonuyla aynı yöntemle q yüzdeliğini tahmin eder."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]  # +Inf kovası: bilinen en yüksek sınır
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i]
+                return lower + (upper - lower) * ((rank - cumulative) / bucket_count)
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def cumulative(self) -> Iterable[Tuple[str, int]]:
+        running = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            running += bucket_count
+            yield (repr(bound), running)
+        yield ("+Inf", running + self.counts[-1])
+
+
+class CommandStats:
+    """Tek bir komutun gecikme, hata ve eşzamanlılık istatistikleri."""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.errors: Dict[str, int] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+class MetricsRegistry:
+    """Komut metriklerini tutar ve diğer bileşenlerin toplayıcılarıyla birlikte Prometheus metnine dönüştürür."""
+
+    def __init__(self, prefix: str = "yata"):
+        self.prefix = prefix
+        self.commands: Dict[str, CommandStats] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._histograms: Dict[str, Tuple[str, Histogram]] = {}
+
+    def _stats(self, command: str) -> CommandStats:
+        stats = self.commands.get(command)
+        if stats is None:
+            stats = self.commands[command] = CommandStats()
+        return stats
+
+    # --- Komut Kancaları ---
+    def command_started(self, command: str):
+        stats = self._stats(command)
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+
+    def command_finished(self, command: str, elapsed: float):
+        stats = self._stats(command)
+        stats.in_flight = max(0, stats.in_flight - 1)
+        stats.latency.observe(elapsed)
+
+    def command_failed(self, command: str, error_type: str):
+        errors = self._stats(command).errors
+        errors[error_type] = errors.get(error_type, 0) + 1
+
+    # --- Toplayıcılar ---
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]):
+        """Her /metrics isteğinde çağrılacak bir toplayıcı ekler."""
+        self._collectors.append(collector)
+
+    def register_histogram(self, metric: str, help_text: str, histogram: Histogram):
+        """Başka bir bileşenin tuttuğu etiketsiz bir histogramı dışa açar."""
+        self._histograms[metric] = (help_text, histogram)
+
+    def render(self) -> str:
+        """Tüm metrikleri Prometheus metin formatında döndürür."""
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_command_duration_seconds Komut çalışma süresi.",
+            f"# TYPE {p}_command_duration_seconds histogram",
+        ]
+        for name, stats in sorted(self.commands.items()):
+            label = _escape(name)
+            for bound, running in stats.latency.cumulative():
+                lines.append(f'{p}_command_duration_seconds_bucket{{command="{label}",le="{bound}"}} {running}')
+            lines.append(f'{p}_command_duration_seconds_sum{{command="{label}"}} {stats.latency.sum}')
+            lines.append(f'{p}_command_duration_seconds_count{{command="{label}"}} {stats.latency.count}')
+
+        lines += [f"# HELP {p}_command_errors_total Komut hataları.", f"# TYPE {p}_command_errors_total counter"]
+        for name, stats in sorted(self.commands.items()):
+            for error_type, count in sorted(stats.errors.items()):
+                lines.append(f'{p}_command_errors_total{{command="{_escape(name)}",error="{_escape(error_type)}"}} {count}')
+
+        lines += [f"# HELP {p}_command_in_flight Şu anda çalışan komut sayısı.", f"# TYPE {p}_command_in_flight gauge"]
+        for name, stats in sorted(self.commands.items()):
+            lines.append(f'{p}_command_in_flight{{command="{_escape(name)}"}} {stats.in_flight}')
+
+        for metric, (help_text, histogram) in self._histograms.items():
+            lines.append(f"# HELP {p}_{metric} {help_text}")
+            lines.append(f"# TYPE {p}_{metric} histogram")
+            for bound, running in histogram.cumulative():
+                lines.append(f'{p}_{metric}_bucket{{le="{bound}"}} {running}')
+            lines.append(f"{p}_{metric}_sum {histogram.sum}")
+            lines.append(f"{p}_{metric}_count {histogram.count}")
+
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception:
+                log.error("Metrik toplayıcısı hata verdi.", exc_info=True)
+                continue
+            for metric, metric_type, help_text, values in samples:
+                lines.append(f"# HELP {p}_{metric} {help_text}")
+                lines.append(f"# TYPE {p}_{metric} {metric_type}")
+                for labels, value in values:
+                    label_str = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+                    lines.append(f"{p}_{metric}{{{label_str}}} {_format_value(value)}" if label_str else f"{p}_{metric} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Prometheus'un kazıyacağı /metrics uç noktasını sunan hafif aiohttp sunucusu."""
+
+    def __init__(self, registry: MetricsRegistry, host: str, port: int):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.registry.render(), content_type="text/plain", charset="utf-8")
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        log.info(f"Prometheus metrik uç noktası http://{self.host}:{self.port}/metrics adresinde.")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+    return str(value)
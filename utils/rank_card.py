@@ -0,0 +1,333 @@
+# utils/rank_card.py
+import asyncio
+import functools
+import io
+import logging
+import math
+import os
+import pickle
+import struct
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import discord
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # İsteğe bağlı bağımlılık; yoksa `seviye` metin kartıyla devam eder
+    Image = ImageDraw = ImageFont = None
+
+log = logging.getLogger(__name__)
+
+AVAILABLE = Image is not None
+
+DEFAULT_WORKERS = min(2, os.cpu_count() or 1)
+DEFAULT_AVATAR_CACHE_SIZE = 512   # Avatar başına ~10-20 KB (128 px PNG)
+DEFAULT_RENDER_CACHE_SIZE = 256   # Kart başına ~30-80 KB
+PROGRESS_BUCKETS = 100            # İlerleme halkası %1 adımlarla çizilir; aynı dilimdeki XP aynı kartı paylaşır
+AVATAR_FETCH_SIZE = 128
+FONT_FILE = os.getenv("RANK_CARD_FONT", "DejaVuSans-Bold.ttf")
+
+# İşçi süreçle (utils/rank_card_worker.py) konuşma: her mesaj 4 baytlık uzunluk önekiyle gönderilir
+FRAME_HEADER = struct.Struct("!I")
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# --- Kart Düzeni ---
+CARD_SIZE = (900, 250)
+AVATAR_CENTER = (125, 125)
+AVATAR_RADIUS = 88
+RING_RADIUS = 104
+RING_WIDTH = 12
+BACKGROUND = (35, 39, 42, 255)
+RING_BACKGROUND = (72, 77, 84, 255)
+TEXT_COLOR = (255, 255, 255, 255)
+MUTED_TEXT = (185, 187, 190, 255)
+DEFAULT_ACCENT = 0xF1C40F  # discord.Color.gold()
+
+
+@dataclass(frozen=True)
+class RankCardData:
+    """Çizim için gereken her şey; işçi sürece gönderildiği için yalnızca basit tipler içerir."""
+    name: str
+    level: int
+    progress: int            # 0..PROGRESS_BUCKETS
+    rank: int
+    avatar: Optional[bytes]  # PNG; indirilemediyse None (yer tutucu daire çizilir)
+    accent: int = DEFAULT_ACCENT
+
+
+# --- Çizim (işçi süreçte çalışır) ---
+@functools.lru_cache(maxsize=8)
+def _font(size: int):
+    try:
+        return ImageFont.truetype(FONT_FILE, size)
+    except OSError:
+        # Sistemde DejaVu yoksa Pillow'un gömülü yazı tipi (Türkçe karakterlerin bir kısmı eksik olabilir)
+        return ImageFont.load_default(size=size)
+
+
+def _rgb(value: int) -> Tuple[int, int, int, int]:
+    return (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF, 255
+
+
+def _fit(draw, text: str, font, width: int) -> str:
+    """Metni genişliğe sığana kadar kısaltır."""
+    if draw.textlength(text, font=font) <= width:
+        return text
+    while text and draw.textlength(text + "…", font=font) > width:
+        text = text[:-1]
+    return text + "…"
+
+
+def render_rank_card(data: RankCardData) -> bytes:
+    """Seviye kartını çizer ve PNG olarak döndürür (engelleyici; işçi süreçte çağrılır)."""
+    card = Image.new("RGBA", CARD_SIZE, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(card)
+    draw.rounded_rectangle((0, 0, CARD_SIZE[0] - 1, CARD_SIZE[1] - 1), radius=24, fill=BACKGROUND)
+    accent = _rgb(data.accent)
+
+    # Avatar: dairesel maske
+    cx, cy = AVATAR_CENTER
+    diameter = AVATAR_RADIUS * 2
+    box = (cx - AVATAR_RADIUS, cy - AVATAR_RADIUS, cx + AVATAR_RADIUS, cy + AVATAR_RADIUS)
+    avatar = None
+    if data.avatar:
+        try:
+            avatar = Image.open(io.BytesIO(data.avatar)).convert("RGBA").resize((diameter, diameter), Image.LANCZOS)
+        except OSError:
+            avatar = None
+    if avatar is not None:
+        mask = Image.new("L", (diameter, diameter), 0)
+        ImageDraw.Draw(mask).ellipse((0, 0, diameter - 1, diameter - 1), fill=255)
+        card.paste(avatar, box[:2], mask)
+    else:
+        draw.ellipse(box, fill=RING_BACKGROUND)
+
+    # İlerleme halkası: saat 12'den başlayıp saat yönünde dolar
+    ring = (cx - RING_RADIUS, cy - RING_RADIUS, cx + RING_RADIUS, cy + RING_RADIUS)
+    draw.arc(ring, 0, 360, fill=RING_BACKGROUND, width=RING_WIDTH)
+    if data.progress > 0:
+        end = -90 + 360 * data.progress / PROGRESS_BUCKETS
+        draw.arc(ring, -90, end, fill=accent, width=RING_WIDTH)
+
+    # Metinler
+    left, right = 270, CARD_SIZE[0] - 40
+    name_font, label_font, value_font = _font(40), _font(24), _font(52)
+    draw.text((left, 42), _fit(draw, data.name, name_font, right - left), font=name_font, fill=TEXT_COLOR)
+    draw.line((left, 100, right, 100), fill=RING_BACKGROUND, width=2)
+
+    columns = (("SIRA", f"#{data.rank}"), ("SEVİYE", str(data.level)), ("İLERLEME", f"%{data.progress}"))
+    column_width = (right - left) // len(columns)
+    for index, (label, value) in enumerate(columns):
+        x = left + index * column_width
+        draw.text((x, 120), label, font=label_font, fill=MUTED_TEXT)
+        draw.text((x, 150), value, font=value_font, fill=accent if index == 1 else TEXT_COLOR)
+
+    output = io.BytesIO()
+    # Düşük sıkıştırma: dosya biraz büyür ama çizim süresinin yarısından fazlası PNG kodlamasıdır
+    card.save(output, format="PNG", compress_level=1)
+    return output.getvalue()
+
+
+# --- Önbellek ---
+class LRUCache:
+    """En son kullanılanı tutan, kayıt sayısıyla sınırlı basit önbellek."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_entries <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+class RankCardRenderer:
+    """
+    Seviye kartlarını işçi süreçlerde çizer; olay döngüsü hiçbir görüntü işlemi yapmaz.
+
+    Avatarlar avatar hash'ine göre önbelleğe alınır (hash değişmedikçe yeniden
+    indirilmez). Çizilen kartlar (sunucu, kullanıcı, seviye, ilerleme dilimi) ve
+    kartta görünen diğer alanlarla (sıra, ad, avatar, renk) anahtarlanır; bunlar
+    değişmedikçe aynı PNG yeniden kullanılır. Aynı kart için eşzamanlı istekler tek
+    bir çizimi bekler.
+
+    İşçiler gerektikçe `python -m utils.rank_card_worker` ile açılır. Çalışan botu fork
+    etmek, o anda başka bir iş parçacığının (döngü izleyicisi, log dinleyicisi,
+    to_thread işçileri) tuttuğu kilidi çocuğa kilitli olarak kopyalayabilirdi;
+    multiprocessing'in spawn/forkserver yolları ise her işçide main.py'nin üst düzey
+    kodunu (log kurulumu, bot nesnesi) yeniden çalıştırırdı. Ölen veya yarıda kalan
+    işçi atılır, yerine yenisi açılır.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, avatar_cache_size: int = DEFAULT_AVATAR_CACHE_SIZE,
+                 render_cache_size: int = DEFAULT_RENDER_CACHE_SIZE):
+        self.workers = max(1, workers)
+        self.avatars = LRUCache(avatar_cache_size)
+        self.renders = LRUCache(render_cache_size)
+        self._processes: List[asyncio.subprocess.Process] = []
+        self._idle: Optional[asyncio.Queue] = None  # Boştaki işçiler; None = ölen işçinin yeri boşaldı
+        self._starting = 0
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # İstatistikler
+        self.rendered = 0
+        self.render_seconds = 0.0
+        self.avatar_errors = 0
+
+    @property
+    def available(self) -> bool:
+        return AVAILABLE
+
+    # --- İşçi Süreçler ---
+    async def _acquire(self) -> asyncio.subprocess.Process:
+        """Boştaki bir işçiyi verir; sınıra ulaşılmadıysa yenisini açar, ulaşıldıysa bekler."""
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        while True:
+            if self._idle.empty() and len(self._processes) + self._starting < self.workers:
+                self._starting += 1
+                try:
+                    process = await asyncio.create_subprocess_exec(
+                        sys.executable, "-m", "utils.rank_card_worker",
+                        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, cwd=str(PROJECT_ROOT),
+                    )
+                finally:
+                    self._starting -= 1
+                self._processes.append(process)
+                return process
+            process = await self._idle.get()
+            if process is not None:
+                return process
+
+    def _discard(self, process: asyncio.subprocess.Process):
+        if process in self._processes:
+            self._processes.remove(process)
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        if self._idle is not None:
+            self._idle.put_nowait(None)  # Bekleyen varsa uyansın ve yerine yeni işçi açsın
+
+    async def _run(self, data: RankCardData) -> bytes:
+        process = await self._acquire()
+        healthy = False
+        try:
+            payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            process.stdin.write(FRAME_HEADER.pack(len(payload)) + payload)
+            await process.stdin.drain()
+            size, = FRAME_HEADER.unpack(await process.stdout.readexactly(FRAME_HEADER.size))
+            ok, result = pickle.loads(await process.stdout.readexactly(size))
+            healthy = True
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            raise RuntimeError(f"Seviye kartı işçisi beklenmedik şekilde kapandı (çıkış kodu: {process.returncode})") from e
+        finally:
+            # Yanıtı okunmamış işçi (hata/iptal) yeniden kullanılamaz; sıradaki istek yenisini açar
+            if healthy and self._idle is not None:
+                self._idle.put_nowait(process)
+            else:
+                self._discard(process)
+        if not ok:
+            raise RuntimeError(f"Seviye kartı çizilemedi: {result}")
+        return result
+
+    async def avatar_bytes(self, asset: discord.Asset) -> Optional[bytes]:
+        """Avatarı hash'ine göre önbellekten verir ya da küçük boyutta indirir."""
+        cached = self.avatars.get(asset.key)
+        if cached is not None:
+            return cached
+        try:
+            data = await asset.replace(size=AVATAR_FETCH_SIZE, format="png").read()
+        except discord.DiscordException as e:
+            self.avatar_errors += 1
+            log.warning(f"Avatar indirilemedi ({asset.key}): {e}")
+            return None
+        self.avatars.put(asset.key, data)
+        return data
+
+    async def render(self, member: discord.Member, level: int, progress: float, rank: int) -> bytes:
+        """Üyenin seviye kartını PNG olarak döndürür (`progress` 0..1 arası seviye içi ilerleme)."""
+        bucket = max(0, min(PROGRESS_BUCKETS, math.floor(progress * PROGRESS_BUCKETS)))
+        asset = member.display_avatar
+        accent = member.color.value or DEFAULT_ACCENT
+        key = (member.guild.id, member.id, level, bucket, rank, member.display_name, asset.key, accent)
+        cached = self.renders.get(key)
+        if cached is not None:
+            return cached
+        avatar = await self.avatar_bytes(asset)
+        return await self._render(key, RankCardData(member.display_name, level, bucket, rank, avatar, accent))
+
+    async def render_data(self, key: Hashable, data: RankCardData) -> bytes:
+        """Hazır kart verisini önbellek ve havuz üzerinden çizer."""
+        cached = self.renders.get(key)
+        if cached is not None:
+            return cached
+        return await self._render(key, data)
+
+    async def _render(self, key: Hashable, data: RankCardData) -> bytes:
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            started = time.perf_counter()
+            image = await self._run(data)
+            self.render_seconds += time.perf_counter() - started
+            self.rendered += 1
+            self.renders.put(key, image)
+            future.set_result(image)
+            return image
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Bekleyen yoksa "alınmamış hata" uyarısı çıkmasın
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def close(self):
+        for process in list(self._processes):
+            self._discard(process)
+        self._idle = None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "rendered": self.rendered,
+            "render_seconds": self.render_seconds,
+            "render_cache_hits": self.renders.hits,
+            "render_cache_size": len(self.renders),
+            "avatar_cache_hits": self.avatars.hits,
+            "avatar_cache_misses": self.avatars.misses,
+            "avatar_cache_size": len(self.avatars),
+            "avatar_errors": self.avatar_errors,
+        }
@@ -0,0 +1,34 @@
+# utils/rank_card_worker.py
+"""
+Seviye kartı çizim işçisi (`python -m utils.rank_card_worker`).
+
+RankCardRenderer bu modülü ayrı bir süreç olarak başlatır. İşçi botun hiçbir
+durumunu devralmaz (iş parçacıkları, tutulan kilitler, main.py'nin üst düzey kodu);
+yalnızca çizim kodunu yükler.
+
+Protokol: stdin'den uzunluk önekli pickle(RankCardData) okunur, stdout'a uzunluk
+önekli pickle((True, png) veya (False, hata metni)) yazılır. stdin kapanınca çıkar.
+"""
+import pickle
+import sys
+
+from utils.rank_card import FRAME_HEADER as HEADER, render_rank_card
+
+
+def serve(stdin, stdout):
+    while True:
+        header = stdin.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return  # Ana süreç kapandı
+        data = pickle.loads(stdin.read(HEADER.unpack(header)[0]))
+        try:
+            result = (True, render_rank_card(data))
+        except Exception as e:
+            result = (False, f"{type(e).__name__}: {e}")
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        stdout.write(HEADER.pack(len(payload)) + payload)
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    serve(sys.stdin.buffer, sys.stdout.buffer)
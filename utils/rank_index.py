@@ -0,0 +1,186 @@
+# utils/rank_index.py
+import asyncio
+import bisect
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.database import Database
+
+log = logging.getLogger(__name__)
+
+
+class GuildRanking:
+    """
+    Bir sunucunun (-toplam XP, kullanıcı) sıralı dizisi.
+
+    Sıra ve yüzdelik ikili aramayla O(log n) bulunur. Güncellemede eski anahtar
+    ikili aramayla bulunup silinir ve yenisi araya eklenir; liste kaydırması
+    bellek kopyası olduğundan 200 bin üyede bile mikro saniyeler sürer.
+    """
+
+    __slots__ = ("keys", "totals")
+
+    def __init__(self, rows: List[Tuple[int, int]] = ()):
+        self.totals: Dict[int, int] = dict(rows)  # user_id -> toplam XP
+        self.keys: List[Tuple[int, int]] = sorted((-total, user_id) for user_id, total in self.totals.items())
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def total(self, user_id: int) -> Optional[int]:
+        return self.totals.get(user_id)
+
+    def rank(self, total_xp: int) -> int:
+        """Bu toplamdan kesin olarak fazla XP'si olanların sayısı + 1 (eşitler aynı sırayı paylaşır)."""
+        return bisect.bisect_left(self.keys, (-total_xp,)) + 1
+
+    def percentile(self, total_xp: int) -> float:
+        """Bu toplamın geride bıraktığı üyelerin yüzdesi (0-100)."""
+        if not self.keys:
+            return 0.0
+        behind = len(self.keys) - bisect.bisect_right(self.keys, (-total_xp, float("inf")))
+        return behind / len(self.keys) * 100
+
+    # --- Sayfalama ---
+    # Sayfalar sıra numarasıyla değil anahtarla (-toplam XP, kullanıcı) ilerler: iki tıklama arasında
+    # sıralama değişse de bir sonraki sayfa son gösterilen kaydın hemen ardından başlar.
+    def key_for(self, user_id: int) -> Optional[Tuple[int, int]]:
+        total = self.totals.get(user_id)
+        return None if total is None else (-total, user_id)
+
+    def position(self, key: Tuple[int, int]) -> int:
+        """Anahtarın sıralı dizideki yeri (0'dan başlar)."""
+        return bisect.bisect_left(self.keys, key)
+
+    def page_after(self, cursor: Optional[Tuple[int, int]], size: int) -> List[Tuple[int, int]]:
+        start = 0 if cursor is None else bisect.bisect_right(self.keys, cursor)
+        return self.keys[start:start + size]
+
+    def page_before(self, cursor: Tuple[int, int], size: int) -> List[Tuple[int, int]]:
+        end = bisect.bisect_left(self.keys, cursor)
+        return self.keys[max(0, end - size):end]
+
+    def page_at(self, index: int, size: int) -> List[Tuple[int, int]]:
+        """`index` sırasını içeren sayfa (sayfa sınırlarına hizalı)."""
+        start = max(0, min(index, len(self.keys) - 1)) // size * size
+        return self.keys[start:start + size]
+
+    def set(self, user_id: int, total_xp: int):
+        old = self.totals.get(user_id)
+        if old is not None:
+            index = bisect.bisect_left(self.keys, (-old, user_id))
+            del self.keys[index]
+        self.totals[user_id] = total_xp
+        bisect.insort(self.keys, (-total_xp, user_id))
+
+    def add(self, user_id: int, gained: int):
+        self.set(user_id, self.totals.get(user_id, 0) + gained)
+
+    def remove(self, user_id: int):
+        old = self.totals.pop(user_id, None)
+        if old is not None:
+            del self.keys[bisect.bisect_left(self.keys, (-old, user_id))]
+
+
+class RankIndex:
+    """
+    Sunucu başına bellek içi XP sıralaması.
+
+    Bir sunucunun sıralaması ilk istendiğinde tek sorguyla yüklenir, ardından her
+    XP boşaltmasında yazılan artışlar eklenerek güncel tutulur; `seviye` komutu
+    veritabanına hiç gitmez. Küme modunda her sunucu tek bir süreçte olduğundan
+    o sunucunun XP'sini yalnızca bu süreç yazar.
+
+    Yükleme sürerken gelen güncellemeler yüklemenin hangi anı gördüğü bilinmediği
+    için yüklenen sonucu geçersiz kılar; sıralama bir sonraki istekte yeniden okunur.
+    XP yazımı `begin` ile yazımdan önce bildirilir: yazım işlenmiş ama `apply` henüz
+    çalışmamışken yapılan bir yükleme artışları zaten içerebilir, bu yüzden yazımla
+    çakışan hiçbir yükleme saklanmaz (aksi halde aynı XP iki kez eklenirdi).
+    """
+
+    def __init__(self, pool: Database):
+        self.pool = pool
+        self._guilds: Dict[int, GuildRanking] = {}
+        self._loading: Dict[int, asyncio.Task] = {}
+        self._dirty: Set[int] = set()
+        self._writing: Dict[int, int] = {}  # guild_id -> süren XP yazımı sayısı
+        # İstatistikler
+        self.loads = 0
+        self.hits = 0
+
+    async def get(self, guild_id: int) -> GuildRanking:
+        ranking = self._guilds.get(guild_id)
+        if ranking is not None:
+            self.hits += 1
+            return ranking
+        # Aynı sunucu için eşzamanlı istekler tek bir yüklemeyi paylaşır
+        task = self._loading.get(guild_id)
+        if task is None:
+            task = self._loading[guild_id] = asyncio.create_task(self._load(guild_id))
+        return await asyncio.shield(task)
+
+    async def _load(self, guild_id: int) -> GuildRanking:
+        self._dirty.discard(guild_id)
+        try:
+            rows = await self.pool.fetch("SELECT user_id, total_xp FROM users WHERE guild_id = $1", guild_id)
+        finally:
+            self._loading.pop(guild_id, None)
+        ranking = GuildRanking([(row['user_id'], row['total_xp']) for row in rows])
+        self.loads += 1
+        if guild_id in self._dirty or self._writing.get(guild_id):
+            self._dirty.discard(guild_id)
+        else:
+            self._guilds[guild_id] = ranking
+        return ranking
+
+    def begin(self, guild_ids: Iterable[int]):
+        """Bu sunuculara XP yazılmak üzere; `apply` veya `abort` gelene kadar yüklemeler saklanmaz."""
+        for guild_id in guild_ids:
+            self._writing[guild_id] = self._writing.get(guild_id, 0) + 1
+            if guild_id in self._loading:
+                self._dirty.add(guild_id)
+
+    def _end(self, guild_id: int):
+        remaining = self._writing.get(guild_id, 0) - 1
+        if remaining > 0:
+            self._writing[guild_id] = remaining
+        else:
+            self._writing.pop(guild_id, None)
+        if guild_id in self._loading:
+            self._dirty.add(guild_id)
+
+    def abort(self, guild_ids: Iterable[int]):
+        """`begin` ile bildirilen yazım başarısız oldu; sıralamalar değişmez."""
+        for guild_id in guild_ids:
+            self._end(guild_id)
+
+    def apply(self, deltas: Dict[int, Dict[int, int]]):
+        """Veritabanına yazılmış (`begin` ile bildirilmiş) XP artışlarını yüklü sıralamalara ekler."""
+        for guild_id, users in deltas.items():
+            self._end(guild_id)
+            ranking = self._guilds.get(guild_id)
+            if ranking is None:
+                continue
+            for user_id, gained in users.items():
+                ranking.add(user_id, gained)
+
+    def set(self, guild_id: int, user_id: int, total_xp: int):
+        if guild_id in self._loading:
+            self._dirty.add(guild_id)
+        ranking = self._guilds.get(guild_id)
+        if ranking is not None:
+            ranking.set(user_id, total_xp)
+
+    def invalidate(self, guild_id: int):
+        """Sunucunun sıralamasını bellekten atar; bir sonraki istekte yeniden yüklenir."""
+        self._guilds.pop(guild_id, None)
+        if guild_id in self._loading:
+            self._dirty.add(guild_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "guilds": len(self._guilds),
+            "entries": sum(len(ranking) for ranking in self._guilds.values()),
+            "loads": self.loads,
+            "hits": self.hits,
+        }
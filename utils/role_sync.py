@@ -0,0 +1,373 @@
+# utils/role_sync.py
+import asyncio
+import bisect
+import functools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+from utils.database import Database
+
+log = logging.getLogger(__name__)
+
+DEFAULT_ROLE_RATE = 2.0    # Saniyede en fazla rol değişikliği (tüm sunucular)
+DEFAULT_ROLE_BURST = 5     # Beklemeden yapılabilecek ardışık değişiklik
+RATE_LIMIT_BACKOFF = 10.0  # 429 alındığında tüm değişikliklerin bekleyeceği süre (saniye)
+SYNC_PAGE_SIZE = 500       # Bir seferde okunan users satırı
+DEFAULT_QUEUE_SIZE = 10_000  # Rol güncellemesi bekleyen en fazla üye
+DEFAULT_ROLE_WORKERS = 2
+PROGRESS_SAVE_INTERVAL = 5.0
+
+
+@dataclass(frozen=True)
+class RolePlan:
+    """
+    Bir sunucunun seviye rolleri için hazır arama tablosu.
+
+    Seviye eşikleri bir kez sıralanır; bir seviyenin hak ettiği roller ikili aramayla
+    bulunur ve üyenin mevcut rolleriyle tek geçişte karşılaştırılır.
+    """
+    levels: Tuple[int, ...]
+    role_ids: Tuple[int, ...]
+    stack_roles: bool
+    managed: FrozenSet[int] = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "managed", frozenset(self.role_ids))
+
+    def target(self, level: int) -> FrozenSet[int]:
+        """Bu seviyedeki bir üyenin taşıması gereken seviye rolleri."""
+        reached = bisect.bisect_right(self.levels, level)
+        if not reached:
+            return frozenset()
+        if self.stack_roles:
+            return frozenset(self.role_ids[:reached])
+        return frozenset((self.role_ids[reached - 1],))
+
+    def diff(self, current: Iterable[int], level: int) -> Tuple[Set[int], Set[int]]:
+        """(eklenecek, kaldırılacak) rol ID'leri; seviye rolü olmayan rollere dokunulmaz."""
+        held = self.managed.intersection(current)
+        target = self.target(level)
+        return set(target - held), set(held - target)
+
+
+@functools.lru_cache(maxsize=1024)
+def role_plan(level_roles: Tuple[Tuple[int, int], ...], stack_roles: bool) -> RolePlan:
+    """Sunucu ayarlarındaki (seviye, rol ID) dizisinden plan oluşturur; aynı ayarlar için önbellekten döner."""
+    return RolePlan(tuple(level for level, _ in level_roles), tuple(role_id for _, role_id in level_roles), stack_roles)
+
+
+def guild_role_plan(guild: discord.Guild, level_roles: Tuple[Tuple[int, int], ...], stack_roles: bool) -> RolePlan:
+    """
+    Sunucuda var olan ve botun yönetebildiği seviye rolleriyle plan oluşturur.
+
+    Yönetilemeyen roller plana hiç girmez: üyelerden alınmaz ve yığınlama kapalıyken
+    "en yüksek rol" yönetilebilir roller arasından seçilir.
+    """
+    top_position = guild.me.top_role.position
+    usable = tuple(
+        (level, role_id) for level, role_id in level_roles
+        if (role := guild.get_role(role_id)) is not None and role.position < top_position
+    )
+    return role_plan(usable, stack_roles)
+
+
+class RolePacer:
+    """
+    Rol değişikliklerini hız sınırına uygun aralıklarla uygulayan jeton kovası.
+
+    discord.py tek tek istekleri 429'a göre zaten bekletir; toplu işlerde ise
+    sınıra hiç çarpmamak için değişiklikler önceden aralıklandırılır. Bir 429
+    yine de gelirse tüm değişiklikler bir süre durdurulur.
+    """
+
+    def __init__(self, rate: float = DEFAULT_ROLE_RATE, burst: int = DEFAULT_ROLE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        # İstatistikler
+        self.applied = 0
+        self.failed = 0
+        self.rate_limited = 0
+
+    async def _acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def apply(self, member: discord.Member, add: Iterable[discord.Role], remove: Iterable[discord.Role], reason: str) -> bool:
+        """Rolleri sırası gelince ekler/kaldırır; başarılıysa True döner."""
+        add, remove = list(add), list(remove)
+        for roles, method in ((add, member.add_roles), (remove, member.remove_roles)):
+            if not roles:
+                continue
+            await self._acquire()
+            try:
+                await method(*roles, reason=reason)
+                self.applied += 1
+            except discord.HTTPException as e:
+                self.failed += 1
+                if e.status == 429:
+                    self.rate_limited += 1
+                    self._paused_until = time.monotonic() + RATE_LIMIT_BACKOFF
+                log.warning(f"{member.guild.id}/{member.id}: seviye rolleri güncellenemedi: {e}")
+                return False
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        return {"rate": self.rate, "applied": self.applied, "failed": self.failed, "rate_limited": self.rate_limited}
+
+
+class RoleUpdateQueue:
+    """
+    Seviye atlamalarından gelen rol güncellemeleri için sınırlı iş kuyruğu.
+
+    Her seviye atlama için ayrı görev açmak yerine güncellemeler kuyruğa girer ve
+    sabit sayıda işçi tarafından (RolePacer hızında) uygulanır. Aynı üye kuyruktayken
+    yeniden seviye atlarsa kayıt birleşir; yalnızca son seviye uygulanır. Kuyruk
+    doluysa güncelleme atılır; üyenin rolleri bir sonraki seviye atlamasında ya da
+    rol senkronizasyonunda düzelir.
+    """
+
+    def __init__(self, apply: Callable[[discord.Member, int], Awaitable], maxsize: int = DEFAULT_QUEUE_SIZE, workers: int = DEFAULT_ROLE_WORKERS):
+        self.apply = apply
+        self.maxsize = maxsize
+        self.worker_count = workers
+        self._pending: Dict[Tuple[int, int], Tuple[discord.Member, int]] = {}  # (guild_id, user_id) -> (üye, seviye)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        # İstatistikler
+        self.submitted = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, member: discord.Member, level: int) -> bool:
+        """Üyenin rol güncellemesini sıraya koyar; kuyruk doluysa False döner."""
+        key = (member.guild.id, member.id)
+        if key in self._pending:
+            self._pending[key] = (member, level)
+            self.coalesced += 1
+            return True
+        if len(self._pending) >= self.maxsize:
+            self.dropped += 1
+            return False
+        self._pending[key] = (member, level)
+        self._queue.put_nowait(key)
+        self.submitted += 1
+        return True
+
+    def start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def _worker(self):
+        while True:
+            key = await self._queue.get()
+            member, level = self._pending.pop(key)
+            try:
+                await self.apply(member, level)
+            except Exception as e:
+                log.error(f"{key[0]}/{key[1]}: seviye rolleri güncellenemedi: {e}")
+
+    async def stop(self):
+        """İşçileri durdurur; bekleyen güncellemeler atılır (rol senkronizasyonu düzeltir)."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._pending:
+            log.info(f"Kapanışta {len(self._pending)} bekleyen seviye rolü güncellemesi atıldı.")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "maxsize": self.maxsize,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+        }
+
+
+@dataclass
+class RoleSyncProgress:
+    guild_id: int
+    cursor: int = 0          # İşlenen son user_id (sonraki sayfa bundan büyüklerle başlar)
+    processed: int = 0       # Okunan users satırı
+    changed: int = 0         # Rolü değiştirilen üye
+    failed: int = 0
+    total: int = 0           # İş başladığında sunucudaki users satırı
+    status: str = "running"  # running, done, cancelled, failed
+    started_at: float = field(default_factory=time.time)
+
+    @property
+    def percent(self) -> float:
+        return min(100.0, self.processed / self.total * 100) if self.total else 100.0
+
+
+class RoleSyncManager:
+    """
+    Seviye rollerini sunucudaki tüm üyeler için toplu olarak uzlaştıran arka plan işleri.
+
+    users tablosu sunucu başına user_id sırasıyla sayfa sayfa okunur; her üyenin
+    seviyesi toplam XP'den türetilir ve rolleri hedef kümeyle tek geçişte
+    karşılaştırılır. Yalnızca gereken değişiklikler RolePacer üzerinden uygulanır.
+    İlerleme role_sync_jobs tablosuna yazılır; süreç yeniden başlarsa yarım kalan iş
+    kaldığı yerden devam eder.
+    """
+
+    def __init__(self, bot, pool: Database, pacer: RolePacer, level_for: Callable[[int, int], int]):
+        self.bot = bot
+        self.pool = pool
+        self.pacer = pacer
+        self.level_for = level_for  # (guild_id, total_xp) -> seviye
+        self.jobs: Dict[int, RoleSyncProgress] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    @staticmethod
+    async def ensure_schema(conn):
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS role_sync_jobs (
+                guild_id BIGINT PRIMARY KEY,
+                cursor_user_id BIGINT NOT NULL DEFAULT 0,
+                processed INTEGER NOT NULL DEFAULT 0,
+                changed INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL,
+                started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """)
+
+    def progress(self, guild_id: int) -> Optional[RoleSyncProgress]:
+        return self.jobs.get(guild_id)
+
+    def is_running(self, guild_id: int) -> bool:
+        task = self._tasks.get(guild_id)
+        return task is not None and not task.done()
+
+    async def start(self, guild: discord.Guild) -> RoleSyncProgress:
+        """Sunucu için işi baştan başlatır; çalışan bir iş varsa iptal edilip yeniden başlar."""
+        await self.cancel(guild.id, status=None)
+        total = await self.pool.fetchval("SELECT COUNT(*) FROM users WHERE guild_id = $1", guild.id) or 0
+        progress = RoleSyncProgress(guild.id, total=total)
+        await self._save(progress)
+        self._launch(guild, progress)
+        return progress
+
+    async def resume(self):
+        """Önceki süreçten yarım kalan ve bu süreçteki sunuculara ait işleri sürdürür."""
+        rows = await self.pool.fetch("SELECT * FROM role_sync_jobs WHERE status = 'running'")
+        for row in rows:
+            guild = self.bot.get_guild(row['guild_id'])
+            if not guild or self.is_running(guild.id):
+                continue
+            progress = RoleSyncProgress(
+                guild.id, cursor=row['cursor_user_id'], processed=row['processed'], changed=row['changed'],
+                failed=row['failed'], total=row['total'], started_at=row['started_at'].timestamp()
+            )
+            log.info(f"Rol senkronizasyonu sürdürülüyor: {guild.name} ({progress.processed}/{progress.total}).")
+            self._launch(guild, progress)
+
+    async def cancel(self, guild_id: int, status: Optional[str] = "cancelled"):
+        task = self._tasks.pop(guild_id, None)
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            progress = self.jobs.get(guild_id)
+            if progress and status:
+                progress.status = status
+                await self._save(progress)
+
+    async def stop(self):
+        """Kapanışta işleri durdurur; durumları 'running' kalır ve sonraki açılışta sürdürülür."""
+        for guild_id in list(self._tasks):
+            await self.cancel(guild_id, status=None)
+
+    def _launch(self, guild: discord.Guild, progress: RoleSyncProgress):
+        self.jobs[guild.id] = progress
+        self._tasks[guild.id] = asyncio.create_task(self._run(guild, progress))
+
+    async def _run(self, guild: discord.Guild, progress: RoleSyncProgress):
+        last_save = time.monotonic()
+        try:
+            while True:
+                rows = await self.pool.fetch(
+                    "SELECT user_id, total_xp FROM users WHERE guild_id = $1 AND user_id > $2 ORDER BY user_id LIMIT $3",
+                    guild.id, progress.cursor, SYNC_PAGE_SIZE
+                )
+                if not rows:
+                    break
+                await self._sync_page(guild, rows, progress)
+                progress.cursor = rows[-1]['user_id']
+                progress.processed += len(rows)
+                if time.monotonic() - last_save >= PROGRESS_SAVE_INTERVAL:
+                    await self._save(progress)
+                    last_save = time.monotonic()
+            progress.status = "done"
+            log.info(f"Rol senkronizasyonu tamamlandı: {guild.name} ({progress.changed} üye güncellendi, {progress.failed} hata).")
+        except asyncio.CancelledError:
+            await self._save(progress)
+            raise
+        except Exception as e:
+            progress.status = "failed"
+            log.error(f"Rol senkronizasyonu başarısız oldu ({guild.name}): {e}")
+        await self._save(progress)
+
+    async def _sync_page(self, guild: discord.Guild, rows, progress: RoleSyncProgress):
+        settings = await self.bot.guild_settings.get(guild.id)
+        plan = guild_role_plan(guild, settings.level_roles, settings.stack_roles)
+        if not plan.managed:
+            return
+        members = await self.bot.member_resolver.resolve(guild, [row['user_id'] for row in rows])
+        for row in rows:
+            member = members.get(row['user_id'])
+            if not member:
+                continue  # Sunucudan ayrılmış
+            level = self.level_for(guild.id, row['total_xp'])
+            add_ids, remove_ids = plan.diff((role.id for role in member.roles), level)
+            if not add_ids and not remove_ids:
+                continue
+            add, remove = map(guild.get_role, add_ids), map(guild.get_role, remove_ids)
+            if await self.pacer.apply(member, add, remove, reason="Seviye rolleri senkronize edildi."):
+                progress.changed += 1
+            else:
+                progress.failed += 1
+
+    async def _save(self, progress: RoleSyncProgress):
+        try:
+            await self.pool.execute(
+                """
+                INSERT INTO role_sync_jobs (guild_id, cursor_user_id, processed, changed, failed, total, status, started_at, updated_at)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, to_timestamp($8), now())
+                ON CONFLICT (guild_id) DO UPDATE SET
+                    cursor_user_id = EXCLUDED.cursor_user_id, processed = EXCLUDED.processed,
+                    changed = EXCLUDED.changed, failed = EXCLUDED.failed, total = EXCLUDED.total,
+                    status = EXCLUDED.status, started_at = EXCLUDED.started_at, updated_at = now()
+                """,
+                progress.guild_id, progress.cursor, progress.processed, progress.changed,
+                progress.failed, progress.total, progress.status, progress.started_at
+            )
+        except Exception as e:
+            log.error(f"Rol senkronizasyonu ilerlemesi kaydedilemedi ({progress.guild_id}): {e}")
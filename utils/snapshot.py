@@ -0,0 +1,67 @@
+# utils/snapshot.py
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+# Bu süreden eski anlık görüntüler yok sayılır (bekleme süreleri ve müzik konumu artık anlamsızdır)
+SNAPSHOT_MAX_AGE = 300.0
+
+
+def write_snapshot(path: Path, cogs: Dict[str, Any]):
+    """
+    Cog durumlarını JSON olarak atomik biçimde diske yazar.
+
+    Önce aynı klasörde geçici bir dosyaya yazılır, ardından os.replace ile yerine
+    konur; yeniden başlatma yarıda kesilse bile yarım yazılmış bir dosya kalmaz.
+    """
+    payload = {"version": SNAPSHOT_VERSION, "created_at": time.time(), "cogs": cogs}
+    fd, tmp_path = tempfile.mkstemp(prefix=path.name, suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def consume_snapshot(path: Path, max_age: float = SNAPSHOT_MAX_AGE) -> Dict[str, Any]:
+    """
+    Anlık görüntüyü okur ve siler; yalnızca bir kez geri yüklenir.
+
+    Dosya yoksa, bozuksa, sürümü uyuşmuyorsa veya çok eskiyse boş sözlük döner.
+    """
+    if not path.exists():
+        return {}
+    payload: Optional[dict] = None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        log.error(f"Yeniden başlatma anlık görüntüsü okunamadı: {e}")
+    finally:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    if not payload or payload.get("version") != SNAPSHOT_VERSION:
+        return {}
+    age = time.time() - payload.get("created_at", 0)
+    if age > max_age:
+        log.warning(f"Yeniden başlatma anlık görüntüsü çok eski ({age:.0f} sn), yok sayılıyor.")
+        return {}
+    log.info(f"Yeniden başlatma anlık görüntüsü bulundu ({age:.1f} sn önce, {len(payload.get('cogs', {}))} cog).")
+    return payload.get("cogs", {})
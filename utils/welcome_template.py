@@ -0,0 +1,28 @@
+# utils/welcome_template.py
+import re
+from typing import List
+
+import discord
+
+# Şablonda kullanılabilen yer tutucular
+PLACEHOLDERS = ("uye", "sunucu", "uye_sayisi")
+MAX_RENDERED_LENGTH = 4096  # Embed açıklama sınırı
+
+_PLACEHOLDER_PATTERN = re.compile(r"\{(" + "|".join(PLACEHOLDERS) + r")\}")
+_ANY_PLACEHOLDER_PATTERN = re.compile(r"\{([^{}]*)\}")
+
+
+def render_welcome_template(template: str, member: discord.Member, member_count: int) -> str:
+    """
+    Sunucuya özel hoş geldin şablonunu doldurur.
+
+    Yer tutucular düz metin olarak değiştirilir; `str.format` biçim belirteçleri
+    (`{uye:>1000000}` gibi) yorumlanmaz. Bilinmeyen yer tutucular olduğu gibi kalır.
+    """
+    values = {"uye": member.mention, "sunucu": member.guild.name, "uye_sayisi": str(member_count)}
+    return _PLACEHOLDER_PATTERN.sub(lambda match: values[match.group(1)], template)[:MAX_RENDERED_LENGTH]
+
+
+def unknown_placeholders(template: str) -> List[str]:
+    """Şablondaki desteklenmeyen yer tutucuları döndürür (ayar komutunda doğrulama için)."""
+    return sorted({name for name in _ANY_PLACEHOLDER_PATTERN.findall(template) if name not in PLACEHOLDERS})
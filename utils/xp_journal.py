@@ -0,0 +1,211 @@
+# utils/xp_journal.py
+import asyncio
+import logging
+import os
+import secrets
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SYNC_INTERVAL = 1.0  # Grup halinde fsync aralığı (saniye); çökmede kaybolabilecek en uzun süre
+ACTIVE_FILE = "active.xpj"
+SEGMENT_SUFFIX = ".seg"
+
+# Kayıt: guild_id, user_id, xp (sabit 20 bayt; yarım yazılmış son kayıt okunurken atlanır)
+RECORD = struct.Struct("<QQi")
+
+XPDeltas = Dict[int, Dict[int, int]]  # guild_id -> {user_id: xp}
+
+
+def read_segment(path: Path) -> XPDeltas:
+    """Bir günlük dosyasındaki XP artışlarını sunucu/kullanıcı başına toplar."""
+    deltas: XPDeltas = {}
+    data = path.read_bytes()
+    usable = len(data) - len(data) % RECORD.size
+    if usable != len(data):
+        log.warning(f"{path.name} sonunda yarım kayıt bulundu ({len(data) - usable} bayt), atlanıyor.")
+    for guild_id, user_id, xp in RECORD.iter_unpack(data[:usable]):
+        guild = deltas.setdefault(guild_id, {})
+        guild[user_id] = guild.get(user_id, 0) + xp
+    return deltas
+
+
+def _fsync_dir(directory: Path):
+    """Yeniden adlandırmaların kalıcı olması için klasörü diske yazar (Windows'ta desteklenmez)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class XPJournal:
+    """
+    Henüz veritabanına yazılmamış XP artışlarının yalnızca eklemeli yerel günlüğü.
+
+    Her artış önce bellekteki tampona eklenir; tampon `sync_interval` aralıklarla tek
+    bir write + fsync ile diske yazılır (grup commit), böylece mesaj başına disk
+    işlemi yapılmaz. Boşaltma başlarken etkin dosya mühürlenir ve benzersiz adlı bir
+    parçaya dönüşür; parça ancak veritabanı yazımı onaylandıktan sonra silinir.
+    Parça adları aynı işlemde xp_flush_log tablosuna yazıldığından, onay ile silme
+    arasında çöken bir süreç açılışta aynı parçayı ikinci kez uygulamaz.
+    """
+
+    def __init__(self, directory: Path, sync_interval: float = DEFAULT_SYNC_INTERVAL):
+        self.directory = Path(directory)
+        self.sync_interval = sync_interval
+        self.enabled = True  # Klasör kullanılamıyorsa kapatılır; XP yalnızca bellekte tutulur
+        self._buffer = bytearray()
+        self._file = None
+        self._sealed: List[str] = []  # Onay bekleyen parçalar (eskiden yeniye)
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        # İstatistikler
+        self.appended = 0
+        self.syncs = 0
+        self.sync_errors = 0
+        self.replayed_segments = 0
+
+    # --- Açılış ---
+    def recover(self) -> List[Tuple[str, XPDeltas]]:
+        """
+        Önceki süreçten kalan günlükleri okur (engelleyici; asyncio.to_thread ile çağrılır).
+
+        Yarım kalan etkin dosya önce parçaya çevrilir. Dönen parçaların hangilerinin
+        zaten veritabanına yazıldığına çağıran karar verir (`confirm`).
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        active = self.directory / ACTIVE_FILE
+        if active.exists():
+            if active.stat().st_size:
+                os.replace(active, self.directory / self._new_segment_name())
+                _fsync_dir(self.directory)
+            else:
+                active.unlink()
+        segments = sorted(path.name for path in self.directory.glob(f"*{SEGMENT_SUFFIX}"))
+        self._sealed = list(segments)
+        self.replayed_segments = len(segments)
+        return [(name, read_segment(self.directory / name)) for name in segments]
+
+    # --- Yazım ---
+    def append(self, guild_id: int, user_id: int, xp: int):
+        if not self.enabled:
+            return
+        self._buffer += RECORD.pack(guild_id, user_id, xp)
+        self.appended += 1
+
+    def _write(self, data: bytes):
+        if self._file is None:
+            self._file = open(self.directory / ACTIVE_FILE, "ab")
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    async def sync(self):
+        """Tampondaki artışları tek bir write + fsync ile diske yazar."""
+        data, self._buffer = self._buffer, bytearray()
+        async with self._lock:
+            if not data:
+                return
+            try:
+                await asyncio.to_thread(self._write, bytes(data))
+                self.syncs += 1
+            except OSError as e:
+                # Bir sonraki turda yeniden denenir; sıra korunur
+                self._buffer[:0] = data
+                self.sync_errors += 1
+                log.error(f"XP günlüğü diske yazılamadı: {e}")
+
+    async def seal(self) -> List[str]:
+        """
+        Şu ana kadarki tüm artışları parçaya mühürler ve onay bekleyen parça adlarını döndürür.
+
+        Tampon ilk `await`'ten önce alınır; XP önbelleğiyle aynı anda (arada `await`
+        olmadan) çağrıldığında parçalar önbellekten alınan artışlarla birebir örtüşür.
+        """
+        data, self._buffer = self._buffer, bytearray()
+        if not self.enabled:
+            return []
+        async with self._lock:
+            try:
+                await asyncio.to_thread(self._seal, bytes(data))
+            except OSError as e:
+                # Bu artışlar yalnızca bellekte kalır; boşaltma başarılı olursa zaten veritabanındadır
+                self.sync_errors += 1
+                log.error(f"XP günlüğü mühürlenemedi: {e}")
+            return list(self._sealed)
+
+    def _seal(self, data: bytes):
+        if data:
+            self._write(data)
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        name = self._new_segment_name()
+        os.replace(self.directory / ACTIVE_FILE, self.directory / name)
+        _fsync_dir(self.directory)
+        self._sealed.append(name)
+
+    def confirm(self, names: Iterable[str]):
+        """Veritabanına yazıldığı onaylanan parçaları siler."""
+        for name in names:
+            try:
+                (self.directory / name).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log.error(f"XP günlüğü parçası silinemedi ({name}): {e}")
+            if name in self._sealed:
+                self._sealed.remove(name)
+
+    @staticmethod
+    def _new_segment_name() -> str:
+        # Küme süreçleri aynı xp_flush_log tablosunu paylaşır; ad süreçler arasında da benzersiz olmalı
+        return f"{time.time_ns():020d}-{secrets.token_hex(4)}{SEGMENT_SUFFIX}"
+
+    # --- Arka Plan Görevi ---
+    def start(self):
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._sync_loop())
+
+    async def _sync_loop(self):
+        # İptal yerine olayla durur; yarıda kesilen bir yazım kilidi erken bırakmasın
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.sync_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.sync()
+
+    async def stop(self):
+        """Arka plan görevini durdurur, kalan tamponu yazar ve dosyayı kapatır."""
+        if self._task:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.sync()
+        async with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "appended": self.appended,
+            "syncs": self.syncs,
+            "sync_errors": self.sync_errors,
+            "pending_bytes": len(self._buffer),
+            "sealed_segments": len(self._sealed),
+            "replayed_segments": self.replayed_segments,
+        }